@@ -0,0 +1,185 @@
+# backtest/engine.py
+import numpy as np
+import pandas as pd
+
+from strategies.basic_strategy import sma_signals
+
+# Try loading numba if installed (compiles the simulation loop)
+try:
+    from numba import njit
+    USE_NUMBA = True
+except ImportError:
+    USE_NUMBA = False
+
+
+# -----------------------------
+# SIMULATION CORE
+# -----------------------------
+
+def _simulate(close, signal, initial_cash, position_out, cash_out, portfolio_out):
+    """
+    All-in / all-out portfolio walk over preallocated arrays.
+
+    Fills position_out, cash_out and portfolio_out in place and returns the
+    running statistics gathered on the way:
+    (max drawdown, sum of values, traded notional, number of trades,
+     return count, mean return, M2 of returns).
+    """
+    n = close.shape[0]
+    cash = initial_cash
+    position = 0.0
+
+    peak = 0.0
+    max_drawdown = 0.0
+    value_sum = 0.0
+    traded = 0.0
+    trades = 0
+
+    # Welford accumulators for per-bar returns
+    ret_count = 0
+    ret_mean = 0.0
+    ret_m2 = 0.0
+    prev_total = 0.0
+
+    for i in range(n):
+        price = close[i]
+        decision = signal[i]
+
+        # naive fixed-size trading for demonstration
+        if decision == 1 and cash >= price:
+            qty = (cash // price)
+            if qty > 0:
+                position += qty
+                cash -= qty * price
+                traded += qty * price
+                trades += 1
+        elif decision == -1 and position > 0:
+            traded += position * price
+            trades += 1
+            cash += position * price
+            position = 0.0
+
+        total = cash + position * price
+        position_out[i] = position
+        cash_out[i] = cash
+        portfolio_out[i] = total
+
+        if total > peak:
+            peak = total
+        if peak > 0:
+            drawdown = (peak - total) / peak
+            if drawdown > max_drawdown:
+                max_drawdown = drawdown
+
+        if i > 0 and prev_total != 0:
+            r = total / prev_total - 1.0
+            ret_count += 1
+            delta = r - ret_mean
+            ret_mean += delta / ret_count
+            ret_m2 += delta * (r - ret_mean)
+        prev_total = total
+        value_sum += total
+
+    return max_drawdown, value_sum, traded, trades, ret_count, ret_mean, ret_m2
+
+
+if USE_NUMBA:
+    _simulate = njit(cache=True)(_simulate)
+
+
+# -----------------------------
+# PUBLIC API
+# -----------------------------
+
+def summarize_portfolio(portfolio, initial_cash, traded=0.0, trades=0, periods_per_year=252):
+    """Same summary stats as run_backtest for any portfolio value series."""
+    portfolio = np.asarray(portfolio, dtype=np.float64)
+    n = portfolio.shape[0]
+    if n == 0:
+        return _summarize(float(initial_cash), initial_cash, 0, 0.0, 0.0, traded, trades,
+                          0, 0.0, 0.0, periods_per_year)
+
+    peak = np.maximum.accumulate(np.maximum(portfolio, 0.0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown = np.where(peak > 0, (peak - portfolio) / peak, 0.0)
+        returns = portfolio[1:] / portfolio[:-1] - 1.0
+    returns = returns[portfolio[:-1] != 0]
+    ret_mean = float(returns.mean()) if len(returns) else 0.0
+    ret_m2 = float(((returns - ret_mean) ** 2).sum()) if len(returns) else 0.0
+
+    return _summarize(
+        portfolio[-1], initial_cash, n, float(drawdown.max()), float(portfolio.sum()),
+        traded, trades, len(returns), ret_mean, ret_m2, periods_per_year
+    )
+
+
+def rolling_mean(close, window):
+    """Rolling mean with the same numerics as pandas' rolling().mean()."""
+    return pd.Series(close, copy=False).rolling(window).mean().to_numpy()
+
+
+def run_backtest(close, sma=None, window=20, initial_cash=10000, periods_per_year=252):
+    """
+    Array backtest of the all-in/all-out SMA strategy.
+
+    close is a 1-D price array (ascending in time). If sma is None it is
+    computed as a rolling mean over `window` bars.
+    Returns a results dict with signal, position, cash and portfolio arrays
+    plus a 'stats' dict (CAGR, Sharpe, max drawdown, turnover).
+    """
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    if sma is None:
+        sma = rolling_mean(close, window)
+
+    n = close.shape[0]
+    signal = sma_signals(close, sma)
+    position = np.empty(n, dtype=np.float64)
+    cash = np.empty(n, dtype=np.float64)
+    portfolio = np.empty(n, dtype=np.float64)
+
+    max_drawdown, value_sum, traded, trades, ret_count, ret_mean, ret_m2 = _simulate(
+        close, signal, float(initial_cash), position, cash, portfolio
+    )
+
+    stats = _summarize(
+        portfolio[-1] if n else float(initial_cash), initial_cash, n,
+        max_drawdown, value_sum, traded, trades,
+        ret_count, ret_mean, ret_m2, periods_per_year
+    )
+
+    return {
+        "signal": signal,
+        "position": position,
+        "cash": cash,
+        "portfolio": portfolio,
+        "stats": stats,
+    }
+
+
+def _summarize(final_value, initial_cash, n, max_drawdown, value_sum, traded, trades,
+               ret_count, ret_mean, ret_m2, periods_per_year):
+    """Turn the accumulators gathered by _simulate into summary stats."""
+    years = n / periods_per_year if periods_per_year else 0.0
+    if years > 0 and initial_cash > 0 and final_value > 0:
+        cagr = (final_value / initial_cash) ** (1.0 / years) - 1.0
+    else:
+        cagr = np.nan
+
+    if ret_count > 1:
+        std = np.sqrt(ret_m2 / (ret_count - 1))
+        sharpe = ret_mean / std * np.sqrt(periods_per_year) if std > 0 else np.nan
+    else:
+        sharpe = np.nan
+
+    avg_value = value_sum / n if n else np.nan
+    turnover = traded / avg_value if n and avg_value > 0 else np.nan
+
+    return {
+        "final_value": float(final_value),
+        "total_return": float(final_value / initial_cash - 1.0) if initial_cash else np.nan,
+        "cagr": float(cagr),
+        "sharpe": float(sharpe),
+        "max_drawdown": float(max_drawdown),
+        "turnover": float(turnover),
+        "trades": int(trades),
+    }
@@ -0,0 +1,174 @@
+# backtest/event_backtest.py
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from backtest.engine import summarize_portfolio
+from data.bar_store import DEFAULT_TIMEFRAME, BarStore, ensure_bars
+from strategies.basic_strategy import SmaStrategy
+from trading.execute import submit_order
+from trading.sim_broker import SimulatedBroker
+
+BUY_SIDE = 1
+SELL_SIDE = -1
+
+
+# -----------------------------
+# EVENT QUEUE
+# -----------------------------
+
+def load_events(symbols, store=None, timeframe=DEFAULT_TIMEFRAME, start=None, end=None, data_dir="data"):
+    """
+    Every bar of every symbol as one time-ordered event queue.
+
+    Returns preallocated arrays (timestamps int64 ns, symbol index int32,
+    close float64), merged across symbols by timestamp (ties in symbol order).
+    """
+    columns = []
+    for i, symbol in enumerate(symbols):
+        store = ensure_bars(symbol, timeframe, store, data_dir)
+        bars = store.read(symbol, timeframe, start, end, columns=["close"])
+        columns.append((i, bars["timestamp"], bars["close"]))
+
+    n = sum(len(ts) for _, ts, _ in columns)
+    timestamps = np.empty(n, dtype=np.int64)
+    symbol_idx = np.empty(n, dtype=np.int32)
+    close = np.empty(n, dtype=np.float64)
+    offset = 0
+    for i, ts, values in columns:
+        timestamps[offset:offset + len(ts)] = ts
+        symbol_idx[offset:offset + len(ts)] = i
+        close[offset:offset + len(ts)] = values
+        offset += len(ts)
+
+    order = np.lexsort((symbol_idx, timestamps))
+    return timestamps[order], symbol_idx[order], close[order]
+
+
+# -----------------------------
+# REPLAY
+# -----------------------------
+
+def run_event_backtest(symbols, strategy=None, broker=None, qty=1, initial_cash=10000,
+                       slippage_bps=0.0, timeframe=DEFAULT_TIMEFRAME, start=None, end=None,
+                       store=None, data_dir="data", periods_per_year=252):
+    """
+    Replay stored bars through the live decision → order → fill path.
+
+    Each bar is committed to the strategy (the same SmaStrategy main.py
+    uses), and BUY/SELL decisions go through trading.execute.submit_order
+    for `qty` shares, filled by a SimulatedBroker at the bar's close plus
+    slippage. Orders the broker rejects (no cash, nothing to sell) are
+    counted, as they would fail live. Fills and the per-timestamp equity
+    curve are written into preallocated arrays.
+
+    Returns {"equity": DataFrame, "fills": DataFrame, "stats": dict}.
+    """
+    symbols = [s.upper() for s in symbols]
+    store = store or BarStore()
+    strategy = strategy or SmaStrategy()
+    broker = broker or SimulatedBroker(store, timeframe, initial_cash, slippage_bps, data_dir=data_dir)
+    initial_cash = broker.cash
+
+    timestamps, symbol_idx, close = load_events(symbols, store, timeframe, start, end, data_dir)
+    n = len(timestamps)
+
+    # Preallocated outputs: at most one fill per event, one equity point per timestamp
+    fill_event = np.empty(n, dtype=np.int64)
+    fill_side = np.empty(n, dtype=np.int8)
+    fill_price = np.empty(n, dtype=np.float64)
+    n_fills = 0
+    rejected = 0
+    traded = 0.0
+
+    boundaries = np.flatnonzero(np.diff(timestamps)) + 1
+    is_last = np.zeros(n, dtype=bool)
+    is_last[boundaries - 1] = True
+    if n:
+        is_last[-1] = True
+    equity = np.empty(int(is_last.sum()), dtype=np.float64)
+    equity_ts = timestamps[is_last]
+    n_equity = 0
+
+    last_price = np.zeros(len(symbols), dtype=np.float64)
+    shares = np.zeros(len(symbols), dtype=np.float64)
+
+    started = time.perf_counter()
+    for i in range(n):
+        s = symbol_idx[i]
+        symbol = symbols[s]
+        price = float(close[i])
+        last_price[s] = price
+
+        decision = strategy.on_bar(symbol, price)
+        if decision == "BUY" or decision == "SELL":
+            broker.set_price(symbol, price)
+            try:
+                order = submit_order(symbol, qty, decision.lower(), client=broker)
+            except Exception:
+                rejected += 1
+            else:
+                side = BUY_SIDE if decision == "BUY" else SELL_SIDE
+                fill_event[n_fills] = i
+                fill_side[n_fills] = side
+                fill_price[n_fills] = order.filled_avg_price
+                n_fills += 1
+                shares[s] += side * qty
+                traded += qty * order.filled_avg_price
+
+        if is_last[i]:
+            equity[n_equity] = broker.cash + float(shares @ last_price)
+            n_equity += 1
+    elapsed = time.perf_counter() - started
+
+    fills = pd.DataFrame({
+        "timestamp": pd.to_datetime(timestamps[fill_event[:n_fills]]),
+        "symbol": np.array(symbols, dtype=object)[symbol_idx[fill_event[:n_fills]]],
+        "side": np.where(fill_side[:n_fills] == BUY_SIDE, "buy", "sell"),
+        "qty": qty,
+        "price": fill_price[:n_fills],
+    })
+    curve = pd.DataFrame({"timestamp": pd.to_datetime(equity_ts), "equity": equity})
+
+    stats = summarize_portfolio(equity, initial_cash, traded, n_fills, periods_per_year)
+    stats.update({
+        "events": n,
+        "rejected": rejected,
+        "elapsed_s": elapsed,
+        "events_per_s": n / elapsed if elapsed else float("nan"),
+    })
+    return {"equity": curve, "fills": fills, "stats": stats}
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Event-driven backtest of the live strategy.")
+    parser.add_argument("--symbols", nargs="+", default=["AAPL"])
+    parser.add_argument("--timeframe", default=DEFAULT_TIMEFRAME)
+    parser.add_argument("--start")
+    parser.add_argument("--end")
+    parser.add_argument("--qty", type=int, default=1)
+    parser.add_argument("--initial-cash", type=float, default=10000)
+    parser.add_argument("--slippage-bps", type=float, default=0.0)
+    parser.add_argument("--ma", default="ma_20", help="moving-average feature the price is compared against")
+    args = parser.parse_args(argv)
+
+    result = run_event_backtest(
+        args.symbols, SmaStrategy(args.ma), qty=args.qty, initial_cash=args.initial_cash,
+        slippage_bps=args.slippage_bps, timeframe=args.timeframe, start=args.start, end=args.end
+    )
+    stats = result["stats"]
+    print(result["equity"].tail())
+    print(f"✅ {stats['events']} bars in {stats['elapsed_s']:.2f}s "
+          f"({stats['events_per_s']:,.0f} bars/s), {stats['trades']} fills, {stats['rejected']} rejected")
+    print({k: v for k, v in stats.items() if k not in ("events", "elapsed_s", "events_per_s")})
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+# backtest/portfolio.py
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from backtest.engine import summarize_portfolio
+from data.bar_store import DEFAULT_TIMEFRAME, BarStore, ensure_bars
+
+
+# -----------------------------
+# PRICE MATRIX
+# -----------------------------
+
+def load_price_matrix(symbols, store=None, timeframe=DEFAULT_TIMEFRAME, start=None, end=None, data_dir="data"):
+    """
+    Wide (dates × symbols) close matrix from the bar store.
+
+    Rows are the union of every symbol's timestamps; a symbol is NaN on
+    dates it has no bar (before listing, after delisting, missing days).
+    """
+    symbols = [s.upper() for s in symbols]
+    series = []
+    for symbol in symbols:
+        store = ensure_bars(symbol, timeframe, store, data_dir)
+        bars = store.read(symbol, timeframe, start, end, columns=["close"])
+        series.append((bars["timestamp"], bars["close"]))
+
+    dates = np.unique(np.concatenate([ts for ts, _ in series])) if series else np.empty(0, np.int64)
+    prices = np.full((len(dates), len(symbols)), np.nan)
+    for j, (ts, close) in enumerate(series):
+        prices[np.searchsorted(dates, ts), j] = close
+
+    return pd.DataFrame(prices, index=pd.to_datetime(dates), columns=symbols)
+
+
+# -----------------------------
+# TARGET WEIGHTS
+# -----------------------------
+
+def equal_weights(prices):
+    """1/N across the symbols that have a price on each date."""
+    valid = prices.notna().to_numpy()
+    counts = valid.sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weights = np.where(valid, 1.0 / counts, 0.0)
+    return pd.DataFrame(weights, index=prices.index, columns=prices.columns)
+
+
+def sma_weights(prices, window=20):
+    """
+    Cross-sectional SMA rule: equal weight across the symbols trading above
+    their `window`-bar moving average, cash when none are.
+    """
+    above = (prices > prices.rolling(window).mean()).to_numpy()
+    counts = above.sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weights = np.where(above, 1.0 / counts, 0.0)
+    return pd.DataFrame(weights, index=prices.index, columns=prices.columns)
+
+
+def rebalance_mask(index, rebalance=1):
+    """
+    Boolean array marking the bars on which the portfolio trades.
+
+    `rebalance` is a bar count (every k-th bar) or a pandas period alias
+    ("W", "M", "Q", ...) for the last bar of each period. The first bar
+    always trades.
+    """
+    n = len(index)
+    if isinstance(rebalance, str):
+        periods = pd.DatetimeIndex(index).to_period(rebalance).asi8
+        mask = np.ones(n, dtype=bool)
+        mask[:-1] = periods[:-1] != periods[1:]
+    else:
+        mask = np.arange(n) % int(rebalance) == 0
+    if n:
+        mask[0] = True
+    return mask
+
+
+# -----------------------------
+# SIMULATION
+# -----------------------------
+
+def run_portfolio_backtest(prices, weights, initial_cash=10000, cost_bps=0.0, rebalance=1,
+                           periods_per_year=252):
+    """
+    Cross-sectional portfolio backtest on a (dates × symbols) price matrix.
+
+    `weights` (same shape) are target weights of portfolio value, decided
+    and traded at each rebalance bar's close; the rest is cash earning
+    nothing. Between rebalances the share counts are fixed, so weights
+    drift with prices. Each rebalance pays `cost_bps` on the traded notional
+    (sum of |target - drifted weight| × value). Symbols without a price
+    on a date get weight 0.
+
+    Everything is computed with whole-matrix operations: the holdings in
+    force on each bar are gathered from the last rebalance row, so there
+    is no per-symbol (or per-bar) Python loop.
+
+    Returns {"equity": Series, "weights": DataFrame (post-trade, drifted),
+    "turnover": Series, "costs": Series, "stats": dict}.
+    """
+    index, columns = prices.index, prices.columns
+    raw = prices.to_numpy(dtype=np.float64)
+    valid = ~np.isnan(raw)
+    # Forward-filled prices; never-priced cells get 1.0 (their weight is 0 anyway)
+    filled = prices.ffill().to_numpy(dtype=np.float64, copy=True)
+    filled[np.isnan(filled)] = 1.0
+
+    target = weights.reindex(index=index, columns=columns).to_numpy(dtype=np.float64)
+    target = np.where(valid & ~np.isnan(target), target, 0.0)
+
+    n = len(index)
+    trades_on = rebalance_mask(index, rebalance)
+    rows = np.arange(n)
+    # Last rebalance at or before each bar, and strictly before it
+    held = np.maximum.accumulate(np.where(trades_on, rows, 0))
+    previous = np.empty(n, dtype=np.int64)
+    previous[0] = 0
+    previous[1:] = held[:-1]
+
+    # Drifted pre-trade weights and value growth since the last rebalance
+    held_before = target[previous]
+    ratio = filled / filled[previous]
+    invested = held_before * ratio
+    growth = 1.0 - held_before.sum(axis=1) + invested.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drifted = invested / growth[:, None]
+    growth[0] = 1.0
+    drifted[0] = 0.0
+
+    turnover = np.where(trades_on, np.abs(target - drifted).sum(axis=1), 0.0)
+    cost = turnover * cost_bps / 10_000
+
+    # Value right after each rebalance, chained across rebalances
+    step = np.where(trades_on, growth * (1.0 - cost), 1.0)
+    post_trade = float(initial_cash) * np.cumprod(step)
+    equity = post_trade[held] * np.where(trades_on, 1.0, growth)
+
+    # Weights actually carried on each bar (post-trade on rebalance bars)
+    current = target[held] * (filled / filled[held])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        current /= np.where(trades_on, 1.0, growth)[:, None]
+
+    pre_trade_value = np.where(rows == 0, float(initial_cash), post_trade[previous] * growth)
+    traded = turnover * pre_trade_value
+    costs = traded * cost_bps / 10_000
+    trades = int(np.count_nonzero(np.abs(target - drifted)[trades_on] > 1e-12))
+
+    stats = summarize_portfolio(equity, initial_cash, float(traded.sum()), trades, periods_per_year)
+    stats["costs"] = float(costs.sum())
+    stats["rebalances"] = int(trades_on.sum())
+
+    return {
+        "equity": pd.Series(equity, index=index, name="equity"),
+        "weights": pd.DataFrame(current, index=index, columns=columns),
+        "turnover": pd.Series(turnover, index=index, name="turnover"),
+        "costs": pd.Series(costs, index=index, name="costs"),
+        "stats": stats,
+    }
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+
+def synthetic_prices(n_symbols=500, years=10, periods_per_year=252, seed=0):
+    """Random-walk price matrix for benchmarking."""
+    rng = np.random.default_rng(seed)
+    n = int(years * periods_per_year)
+    returns = rng.normal(0.0003, 0.02, size=(n, n_symbols))
+    prices = 100 * np.exp(np.cumsum(returns, axis=0))
+    index = pd.bdate_range("2015-01-01", periods=n)
+    return pd.DataFrame(prices, index=index, columns=[f"S{i:04d}" for i in range(n_symbols)])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vectorized multi-asset portfolio backtest.")
+    parser.add_argument("--symbols", nargs="*", default=None, help="default: every symbol in the bar store")
+    parser.add_argument("--synthetic", type=int, metavar="N", help="benchmark on N random-walk symbols instead")
+    parser.add_argument("--years", type=float, default=10, help="length of the synthetic data")
+    parser.add_argument("--timeframe", default=DEFAULT_TIMEFRAME)
+    parser.add_argument("--start")
+    parser.add_argument("--end")
+    parser.add_argument("--strategy", choices=["sma", "equal"], default="sma")
+    parser.add_argument("--window", type=int, default=20)
+    parser.add_argument("--rebalance", default="1", help="bar count or period alias (W, M, Q)")
+    parser.add_argument("--cost-bps", type=float, default=5.0)
+    parser.add_argument("--initial-cash", type=float, default=10000)
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        prices = synthetic_prices(args.synthetic, args.years)
+    else:
+        symbols = args.symbols or BarStore().symbols(args.timeframe) or ["AAPL"]
+        prices = load_price_matrix(symbols, timeframe=args.timeframe, start=args.start, end=args.end)
+
+    rebalance = int(args.rebalance) if args.rebalance.isdigit() else args.rebalance
+
+    started = time.perf_counter()
+    weights = sma_weights(prices, args.window) if args.strategy == "sma" else equal_weights(prices)
+    result = run_portfolio_backtest(prices, weights, args.initial_cash, args.cost_bps, rebalance)
+    elapsed = time.perf_counter() - started
+
+    print(result["equity"].tail())
+    print(f"✅ {prices.shape[0]} dates × {prices.shape[1]} symbols in {elapsed:.2f}s")
+    print(result["stats"])
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# backtest/sweep.py
+import argparse
+import itertools
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from backtest.engine import run_backtest
+from data.bar_store import DEFAULT_TIMEFRAME, ensure_bars
+
+DATA_DIR = "data"
+
+# Per-worker read-only price views, filled by _init_worker
+_PRICES = {}
+
+
+# -----------------------------
+# DATA LOADING
+# -----------------------------
+
+def load_close_series(symbol, data_dir=DATA_DIR, store=None, timeframe=DEFAULT_TIMEFRAME):
+    """
+    (timestamps, close) memmap views for a symbol from the bar store
+    (data/{symbol}_5y.csv is imported on first use).
+    Timestamps are int64 nanoseconds, sorted ascending.
+    """
+    store = ensure_bars(symbol, timeframe, store, data_dir)
+    bars = store.read(symbol, timeframe, columns=["close"])
+    return bars["timestamp"], bars["close"]
+
+
+def pack_prices(series, directory):
+    """
+    Write every symbol's arrays into two flat .npy files under `directory`.
+    Returns the layout {symbol: (offset, length)} workers need to slice them.
+    """
+    layout = {}
+    offset = 0
+    for symbol, (timestamps, _) in series.items():
+        layout[symbol] = (offset, len(timestamps))
+        offset += len(timestamps)
+
+    ts_all = np.lib.format.open_memmap(
+        os.path.join(directory, "timestamps.npy"), mode="w+", dtype=np.int64, shape=(offset,)
+    )
+    close_all = np.lib.format.open_memmap(
+        os.path.join(directory, "close.npy"), mode="w+", dtype=np.float64, shape=(offset,)
+    )
+    for symbol, (timestamps, close) in series.items():
+        start, length = layout[symbol]
+        ts_all[start:start + length] = timestamps
+        close_all[start:start + length] = close
+    ts_all.flush()
+    close_all.flush()
+    del ts_all, close_all
+    return layout
+
+
+def _init_worker(directory, layout):
+    """Map the packed price files read-only once per worker process."""
+    ts_all = np.load(os.path.join(directory, "timestamps.npy"), mmap_mode="r")
+    close_all = np.load(os.path.join(directory, "close.npy"), mmap_mode="r")
+    _PRICES.clear()
+    for symbol, (start, length) in layout.items():
+        _PRICES[symbol] = (ts_all[start:start + length], close_all[start:start + length])
+
+
+# -----------------------------
+# SWEEP
+# -----------------------------
+
+def _to_ns(value):
+    if value is None:
+        return None
+    return pd.Timestamp(value).value
+
+
+def _run_task(task):
+    """Run one (symbol, window, start, end, initial_cash) backtest in a worker."""
+    symbol, window, start, end, initial_cash = task
+    timestamps, close = _PRICES[symbol]
+
+    lo = 0 if start is None else int(np.searchsorted(timestamps, _to_ns(start), side="left"))
+    hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, _to_ns(end), side="right"))
+
+    row = {"symbol": symbol, "window": window, "start": start, "end": end, "bars": hi - lo}
+    if hi - lo == 0:
+        return row
+
+    result = run_backtest(close[lo:hi], window=window, initial_cash=initial_cash)
+    row.update(result["stats"])
+    return row
+
+
+def build_grid(symbols, windows, date_ranges=None, initial_cash=10000):
+    """Cartesian product of symbols x windows x date ranges as task tuples."""
+    date_ranges = date_ranges or [(None, None)]
+    return [
+        (symbol, int(window), start, end, initial_cash)
+        for symbol, window, (start, end) in itertools.product(symbols, windows, date_ranges)
+    ]
+
+
+def run_sweep(symbols, windows, date_ranges=None, initial_cash=10000,
+              max_workers=None, rank_by="sharpe", data_dir=DATA_DIR, series=None, store=None):
+    """
+    Backtest every (symbol, window, date range) combination across a process pool.
+
+    Prices are loaded once and shared with workers as read-only memmaps; each
+    task only ships a small tuple. `series` may be passed as
+    {symbol: (timestamps_ns, close)} to skip loading from disk.
+    Returns a DataFrame ranked by `rank_by` (descending).
+    """
+    if series is None:
+        series = {symbol: load_close_series(symbol, data_dir, store) for symbol in symbols}
+
+    tasks = build_grid(symbols, windows, date_ranges, initial_cash)
+    max_workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(tasks) // (max_workers * 4))
+
+    directory = tempfile.mkdtemp(prefix="sma_sweep_")
+    try:
+        layout = pack_prices(series, directory)
+        if max_workers == 1:
+            _init_worker(directory, layout)
+            rows = [_run_task(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_init_worker,
+                initargs=(directory, layout)
+            ) as pool:
+                rows = list(pool.map(_run_task, tasks, chunksize=chunksize))
+    finally:
+        _PRICES.clear()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    results = pd.DataFrame(rows)
+    if rank_by in results.columns:
+        results = results.sort_values(rank_by, ascending=False, na_position="last")
+    return results.reset_index(drop=True)
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+
+def _parse_windows(values):
+    """Accept plain integers or START:STOP[:STEP] ranges (STOP inclusive)."""
+    windows = []
+    for value in values:
+        if ":" in value:
+            parts = [int(p) for p in value.split(":")]
+            start, stop = parts[0], parts[1]
+            step = parts[2] if len(parts) > 2 else 1
+            windows.extend(range(start, stop + 1, step))
+        else:
+            windows.append(int(value))
+    return windows
+
+
+def _parse_ranges(values):
+    """Parse START:END date ranges; either side may be empty."""
+    ranges = []
+    for value in values or []:
+        start, _, end = value.partition(":")
+        ranges.append((start or None, end or None))
+    return ranges or None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel SMA window sweep.")
+    parser.add_argument("--symbols", nargs="+", default=["AAPL"])
+    parser.add_argument("--windows", nargs="+", default=["5:100:5"],
+                        help="window sizes, e.g. 10 20 50 or 5:100:5")
+    parser.add_argument("--ranges", nargs="*", help="date ranges, e.g. 2021-01-01:2022-12-31")
+    parser.add_argument("--initial-cash", type=float, default=10000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--rank-by", default="sharpe")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--out", help="optional CSV path for the full results table")
+    args = parser.parse_args(argv)
+
+    windows = _parse_windows(args.windows)
+    ranges = _parse_ranges(args.ranges)
+
+    started = time.perf_counter()
+    results = run_sweep(
+        args.symbols, windows, ranges,
+        initial_cash=args.initial_cash,
+        max_workers=args.workers,
+        rank_by=args.rank_by,
+        data_dir=args.data_dir
+    )
+    elapsed = time.perf_counter() - started
+
+    print(f"✅ {len(results)} backtests in {elapsed:.2f}s")
+    print(results.head(args.top).to_string(index=False))
+
+    if args.out:
+        results.to_csv(args.out, index=False)
+        print(f"💾 Results saved to {args.out}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,8 @@
 # dashboard/app.py
 import os
 import sys
-import joblib
 import streamlit as st
-import plotly.graph_objs as go
 import pandas as pd
-from datetime import datetime
-from dotenv import load_dotenv
 import numpy as np
 
 # Add project root to Python path
@@ -16,11 +12,29 @@ sys.path.append(ROOT_DIR)
 # ----------------------------
 # Project Imports
 # ----------------------------
-from data.market_data import get_latest_price
+from data.market_data import get_cached_price
+from data.bar_store import DEFAULT_TIMEFRAME, FEATURE_STORE_DIR, load_features
+from data.indicators import IndicatorEngine
 from strategies.basic_strategy import simple_moving_average_decision
-from trading.execute import place_order
-from stable_baselines3 import PPO
+from trading.execute import get_trading_client, place_order
+from trading.journal import TradeJournal
+from trading.positions import PositionBook
 from training.env import TradingEnv
+from training.observations import ObservationBuilder, config_path
+from training.model_registry import ModelRegistry, RegisteredModel, load_artifact
+from inference.client import InferenceClient
+from dashboard.charts import price_figure
+
+# Try loading stable-baselines3 (RL suggestions are skipped without it)
+try:
+    from stable_baselines3 import PPO
+    USE_RL = True
+except ImportError:
+    USE_RL = False
+
+ML_FOLDER = os.path.join(ROOT_DIR, "training", "models", "ml")
+RL_FOLDER = os.path.join(ROOT_DIR, "training", "models", "rl")
+ACCOUNT_REFRESH = 30  # seconds between account fragment refreshes
 
 # ----------------------------
 # Streamlit UI Configuration
@@ -29,219 +43,333 @@ st.set_page_config(page_title="Agentic AI Trading Bot", layout="wide")
 st.title("🧠 Agentic AI Trading Bot (Dashboard)")
 st.write("Monitor prices, simulate trades, and track performance.")
 
+
+# ----------------------------
+# Cached Resources & Data
+# ----------------------------
+# Everything expensive is cached across reruns and sessions, keyed by
+# symbol and the mtime of the files it came from, so a retrained model or
+# re-prepared dataset is picked up while a button click reuses all of it.
+
+def _mtime(*paths):
+    """Latest mtime (ns) among `paths` that exist, 0 if none do."""
+    return max((os.stat(p).st_mtime_ns for p in paths if os.path.exists(p)), default=0)
+
+
+def dataset_mtime(symbol):
+    meta = os.path.join(FEATURE_STORE_DIR, DEFAULT_TIMEFRAME, symbol.upper(), "meta.json")
+    return _mtime(meta, os.path.join("data", f"prepared_{symbol.upper()}.csv"))
+
+
+def models_mtime():
+    registry = ModelRegistry()
+    dirs = [registry.root, ML_FOLDER] + [os.path.join(registry.root, name) for name in registry.names()]
+    return _mtime(*dirs)
+
+
+@st.cache_resource(show_spinner=False)
+def load_dataset(symbol, mtime):
+    """
+    Prepared feature frame for `symbol` (None if it was never prepared).
+    One frame shared by every caller and rerun (cache_data would pickle a
+    copy per call), so it is read-only: derive, never modify in place.
+    """
+    try:
+        return load_features(symbol)
+    except FileNotFoundError:
+        return None
+
+
+@st.cache_resource(show_spinner=False)
+def chart_series(symbol, mtime):
+    """Full-resolution chart columns as NumPy arrays, shared across reruns."""
+    df = load_dataset(symbol, mtime)
+    series = {"Close Price": df['close'].to_numpy()}
+    for ma in ['ma_5', 'ma_20']:
+        if ma in df.columns:
+            series[ma.upper()] = df[ma].to_numpy()
+    return df['timestamp'].to_numpy(), series
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def zoomed_figure(symbol, mtime, start, end, method):
+    """Chart of the visible range, downsampled to screen resolution."""
+    timestamps, series = chart_series(symbol, mtime)
+    return price_figure(timestamps, series, start, end, method=method)
+
+
+@st.cache_resource(show_spinner=False)
+def load_indicator_engine(symbol, mtime):
+    """Incremental indicator state built once per symbol/dataset."""
+    return IndicatorEngine.from_history(load_dataset(symbol, mtime)['close'].to_numpy())
+
+
+@st.cache_resource(show_spinner="Loading ML models...")
+def load_ml_models(mtime):
+    # Registry models are memory-mapped and cached per process as well
+    ml_models = ModelRegistry().load_latest()
+    if not ml_models and os.path.exists(ML_FOLDER):
+        # Legacy .pkl models from before the registry
+        for model_file in os.listdir(ML_FOLDER):
+            if model_file.endswith(".pkl"):
+                name = model_file.replace(".pkl", "")
+                ml_models[name] = load_artifact(os.path.join(ML_FOLDER, model_file))
+    return ml_models
+
+
+@st.cache_resource(show_spinner="Loading RL model...")
+def load_rl_model(symbol, mtime, data_mtime):
+    """(PPO model, TradingEnv) for `symbol`, or (None, None)."""
+    path = os.path.join(RL_FOLDER, f"ppo_{symbol.lower()}_final.zip")
+    df = load_dataset(symbol, data_mtime)
+    if not USE_RL or not os.path.exists(path) or df is None:
+        return None, None
+    rl_env = TradingEnv(df, ObservationBuilder.load(path))  # observations as the agent was trained
+    return PPO.load(path, env=rl_env), rl_env
+
+
+@st.cache_resource
+def trading_client():
+    # One trading client per process, shared with order placement
+    return get_trading_client()
+
+
+@st.cache_resource
+def inference_client(url):
+    return InferenceClient(url)
+
+
+@st.cache_resource
+def trade_journal():
+    # Same SQLite journal main.py appends to
+    return TradeJournal()
+
+
+@st.cache_resource
+def position_book():
+    # Caught up from the journal on each run (only fills it has not seen)
+    return PositionBook()
+
+
+@st.cache_data(ttl=ACCOUNT_REFRESH, show_spinner=False)
+def fetch_account():
+    account = trading_client().get_account()
+    return {
+        "buying_power": float(account.buying_power),
+        "equity": float(account.equity),
+        "cash": float(account.cash),
+    }
+
+
 # ----------------------------
 # Sidebar Controls
 # ----------------------------
 st.sidebar.header("⚙️ Controls")
 symbol = st.sidebar.text_input("Stock Symbol", value="AAPL")
 
-if st.sidebar.button("Fetch Latest Price"):
-    st.session_state["price"] = get_latest_price(symbol)
+data_mtime = dataset_mtime(symbol)
+df = load_dataset(symbol, data_mtime)
+if df is None:
+    st.error(f"Prepared dataset for {symbol} not found.")
+    st.stop()
 
-price = st.session_state.get("price", None)
 
 # ----------------------------
 # Display Latest Price
 # ----------------------------
-st.subheader(f"📈 Current Price for {symbol}")
-if price:
-    st.metric(label="Latest Price", value=f"${price:.2f}")
-else:
-    st.warning("No price available yet. Press 'Fetch Latest Price'.")
+@st.fragment
+def price_section(symbol):
+    st.subheader(f"📈 Current Price for {symbol}")
+    if st.button("Fetch Latest Price"):
+        st.session_state["price"] = get_cached_price(symbol)
+        # Signals depend on the price, so refresh the whole (cached) page
+        st.rerun()
 
-# ----------------------------
-# Load Historical Data for Chart & ML
-# ----------------------------
-try:
-    df = pd.read_csv(f"data/prepared_{symbol}.csv")
-except FileNotFoundError:
-    st.error(f"Prepared dataset for {symbol} not found.")
-    st.stop()
+    price = st.session_state.get("price", None)
+    if price:
+        st.metric(label="Latest Price", value=f"${price:.2f}")
+    else:
+        st.warning("No price available yet. Press 'Fetch Latest Price'.")
 
-closes = df['close'].tolist()
-dates = df['timestamp'].tolist()
 
-fig = go.Figure()
-fig.add_trace(go.Scatter(x=dates, y=closes, mode="lines", name="Close Price"))
-for ma in ['ma_5', 'ma_20']:
-    if ma in df.columns:
-        fig.add_trace(go.Scatter(x=dates, y=df[ma], mode="lines", name=ma.upper()))
-st.subheader("📊 Price History with Moving Averages")
-st.plotly_chart(fig, width='stretch')
+price_section(symbol)
 
 # ----------------------------
-# Load ML Models
+# Price History Chart
 # ----------------------------
-ml_models = {}
-ml_folder = os.path.join(ROOT_DIR, "training", "models", "ml")
-if os.path.exists(ml_folder):
-    for model_file in os.listdir(ml_folder):
-        if model_file.endswith(".pkl"):
-            name = model_file.replace(".pkl", "")
-            ml_models[name] = joblib.load(os.path.join(ml_folder, model_file))
-else:
-    st.warning("ML models folder not found. Train ML models first.")
+@st.fragment
+def chart_section(symbol):
+    st.subheader("📊 Price History with Moving Averages")
+    timestamps, _ = chart_series(symbol, data_mtime)
+    first = pd.Timestamp(timestamps[0]).to_pydatetime()
+    last = pd.Timestamp(timestamps[-1]).to_pydatetime()
+
+    # Zooming re-slices the full-resolution data, so detail comes back
+    # as the range narrows while the point count stays the same
+    left, right = st.columns([4, 1])
+    start, end = left.slider("Date Range", min_value=first, max_value=last, value=(first, last),
+                             key=f"zoom_{symbol}")
+    method = right.selectbox("Downsampling", ["lttb", "minmax"], key="downsampling")
+    st.plotly_chart(zoomed_figure(symbol, data_mtime, start, end, method), width='stretch')
+
+
+chart_section(symbol)
 
 # ----------------------------
-# Load RL Model
+# Load ML & RL Models
 # ----------------------------
-rl_model = None
-rl_env = None
-rl_model_path = os.path.join(ROOT_DIR, "training", "models", "rl", f"ppo_{symbol.lower()}_final.zip")
-if os.path.exists(rl_model_path):
-    rl_env = TradingEnv(df)  # v1 environment
-    rl_model = PPO.load(rl_model_path, env=rl_env)
+ml_models = load_ml_models(models_mtime())
+if not ml_models:
+    st.warning("No ML models found. Train ML models first (training/train_ml_model.py).")
+
+rl_path = os.path.join(RL_FOLDER, f"ppo_{symbol.lower()}_final.zip")
+rl_model, rl_env = load_rl_model(symbol, _mtime(rl_path, config_path(rl_path)), data_mtime)
+if rl_model:
     st.info("✅ RL model loaded and ready.")
 else:
     st.warning("RL model not found. Train RL model in training/train_rl_bot.py")
 
+
 # ----------------------------
 # Trading Signals
 # ----------------------------
-st.subheader("🤖 Trading Decision")
-
-if price:
-    # SMA Signal
-    moving_average = sum(closes[-5:]) / 5 if len(closes) >= 5 else None
-    sma_decision = simple_moving_average_decision(price, moving_average)
-
-    # ML Predictions
-    ml_predictions = {}
-    features = df.iloc[-1:].drop(columns=['timestamp', 'future_return'], errors='ignore')
-    for name, model in ml_models.items():
-        try:
-            pred = model.predict(features)[0]
-        except Exception:
-            pred = np.nan
-        ml_predictions[name] = pred
-
-    st.write(f"**SMA Signal:** {sma_decision}")
-    st.write("**ML Predictions:**")
-    for name, pred in ml_predictions.items():
-        st.write(f"{name}: {pred:.4f}" if not np.isnan(pred) else f"{name}: N/A")
-
-    # Combined Decision (SMA + ML)
-    actions = []
-    if sma_decision == "BUY" or any(pred > price for pred in ml_predictions.values() if not np.isnan(pred)):
-        actions.append("BUY")
-    elif sma_decision == "SELL" or any(pred < price for pred in ml_predictions.values() if not np.isnan(pred)):
-        actions.append("SELL")
-    else:
-        actions.append("HOLD")
-
-    final_decision = max(set(actions), key=actions.count)
-    st.info(f"**Combined Signal (SMA + ML):** {final_decision}")
-
-    # Quantity for ML/SMA
-    qty = st.number_input("Quantity (ML/SMA)", min_value=1, value=1)
-
-    if st.button(f"Execute {final_decision} Order"):
-        if final_decision in ["BUY", "SELL"]:
-            order = place_order(symbol, qty, final_decision.lower())
-            if order:
-                if "trade_logs" not in st.session_state:
-                    st.session_state["trade_logs"] = []
-                st.session_state["trade_logs"].append({
-                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "symbol": symbol,
-                    "action": final_decision,
-                    "qty": qty,
-                    "price": price,
-                    "type": "ML/SMA"
-                })
-                st.success(f"{final_decision} order executed for {qty} shares of {symbol}. Logged automatically.")
+@st.fragment
+def signals_section(symbol):
+    st.subheader("🤖 Trading Decision")
+    price = st.session_state.get("price", None)
+    final_decision = None
+    rl_action_str = None
+
+    if price:
+        # SMA Signal
+        moving_average = load_indicator_engine(symbol, data_mtime).snapshot().get("ma_5")
+        sma_decision = simple_moving_average_decision(price, moving_average)
+
+        # ML Predictions (from the inference server when INFERENCE_URL is set)
+        ml_predictions = {}
+        if os.getenv("INFERENCE_URL"):
+            try:
+                signal = inference_client(os.getenv("INFERENCE_URL")).predict([symbol])[symbol.upper()] or {}
+                ml_predictions = signal.get("ml", {})
+            except Exception as e:
+                st.warning(f"Inference server unavailable, predicting locally: {e}")
+        if not ml_predictions:
+            features = df.iloc[-1:].drop(columns=['timestamp', 'future_return'], errors='ignore')
+            for name, model in ml_models.items():
+                try:
+                    # Registered models pick their own features and scaling
+                    pred = model.predict(df.iloc[-1:] if isinstance(model, RegisteredModel) else features)[0]
+                except Exception:
+                    pred = np.nan
+                ml_predictions[name] = pred
+
+        st.write(f"**SMA Signal:** {sma_decision}")
+        st.write("**ML Predictions:**")
+        for name, pred in ml_predictions.items():
+            st.write(f"{name}: {pred:.4f}" if not np.isnan(pred) else f"{name}: N/A")
+
+        # Combined Decision (SMA + ML)
+        actions = []
+        if sma_decision == "BUY" or any(pred > price for pred in ml_predictions.values() if not np.isnan(pred)):
+            actions.append("BUY")
+        elif sma_decision == "SELL" or any(pred < price for pred in ml_predictions.values() if not np.isnan(pred)):
+            actions.append("SELL")
         else:
-            st.warning("No action (HOLD).")
+            actions.append("HOLD")
+
+        final_decision = max(set(actions), key=actions.count)
+        st.info(f"**Combined Signal (SMA + ML):** {final_decision}")
+
+        # Quantity for ML/SMA
+        qty = st.number_input("Quantity (ML/SMA)", min_value=1, value=1)
+
+        if st.button(f"Execute {final_decision} Order"):
+            if final_decision in ["BUY", "SELL"]:
+                order = place_order(symbol, qty, final_decision.lower(), client=trading_client())
+                if order:
+                    trade_journal().record_order(order, price, source="ML/SMA")
+                    fetch_account.clear()  # balances changed
+                    st.success(f"{final_decision} order executed for {qty} shares of {symbol}. Logged automatically.")
+            else:
+                st.warning("No action (HOLD).")
+
+        # ----------------------------
+        # RL Decision
+        # ----------------------------
+        if rl_model and rl_env:
+            obs = rl_env._get_obs()
+            action, _ = rl_model.predict(obs, deterministic=True)
+            rl_action_str = ["HOLD", "BUY", "SELL"][action]
+            st.write(f"**RL Suggestion:** {rl_action_str}")
+
+            # Quantity for RL
+            qty_rl = st.number_input("Quantity (RL)", min_value=1, value=1, key="rl_qty")
+            if st.button(f"Execute RL {rl_action_str} Order"):
+                if rl_action_str in ["BUY", "SELL"]:
+                    order = place_order(symbol, qty_rl, rl_action_str.lower(), client=trading_client())
+                    if order:
+                        trade_journal().record_order(order, price, source="RL")
+                        fetch_account.clear()
+                        st.success(f"RL {rl_action_str} executed for {qty_rl} shares of {symbol}. Logged automatically.")
 
     # ----------------------------
-    # RL Decision
+    # Compare Signals
     # ----------------------------
-    rl_action_str = None
-    if rl_model and rl_env:
-        obs = rl_env._get_obs()
-        action, _ = rl_model.predict(obs, deterministic=True)
-        rl_action_str = ["HOLD", "BUY", "SELL"][action]
-        st.write(f"**RL Suggestion:** {rl_action_str}")
-
-        # Quantity for RL
-        qty_rl = st.number_input("Quantity (RL)", min_value=1, value=1, key="rl_qty")
-        if st.button(f"Execute RL {rl_action_str} Order"):
-            if rl_action_str in ["BUY", "SELL"]:
-                order = place_order(symbol, qty_rl, rl_action_str.lower())
-                if order:
-                    if "trade_logs" not in st.session_state:
-                        st.session_state["trade_logs"] = []
-                    st.session_state["trade_logs"].append({
-                        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        "symbol": symbol,
-                        "action": rl_action_str,
-                        "qty": qty_rl,
-                        "price": price,
-                        "type": "RL",
-                        "reward": (rl_env.balance + rl_env.shares * price) - 10000  # reward based on initial_balance
-                    })
-                    st.success(f"RL {rl_action_str} executed for {qty_rl} shares of {symbol}. Logged automatically.")
-
-# ----------------------------
-# Compare Signals
-# ----------------------------
-st.subheader("⚖️ Strategy Comparison")
-ml_signal = final_decision if price else "N/A"
-executed_trades = st.session_state.get("trade_logs", [])
-
-st.write(f"- **ML Signal:** {ml_signal}")
-st.write(f"- **RL Signal:** {rl_action_str if rl_action_str else 'N/A'}")
-st.write("- **Executed Trades:**")
-if executed_trades:
-    trades_df = pd.DataFrame(executed_trades)
-    st.dataframe(trades_df)
-else:
-    st.write("No trades executed yet.")
+    st.subheader("⚖️ Strategy Comparison")
+    ml_signal = final_decision if price else "N/A"
+    journal = trade_journal()
+    if not journal.orders(open_only=True).empty:
+        journal.sync_orders(trading_client())  # fills of orders still open at submit
+    # Indexed on (symbol, ts): only the last day's rows are read
+    executed_trades = journal.fills(symbol, start=pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=1))
+
+    st.write(f"- **ML Signal:** {ml_signal}")
+    st.write(f"- **RL Signal:** {rl_action_str if rl_action_str else 'N/A'}")
+    st.write("- **Executed Trades (last 24h):**")
+    if not executed_trades.empty:
+        st.dataframe(executed_trades)
+    else:
+        st.write("No trades executed yet.")
+
+    # Highlight conflicts
+    if rl_action_str and ml_signal != rl_action_str:
+        st.warning("⚠ ML and RL signals disagree! Consider tracking this for reward feedback.")
+
+    # ----------------------------
+    # Positions & P/L (marked to the latest price)
+    # ----------------------------
+    st.subheader("📝 Positions & P/L")
+    book = position_book()
+    book.sync(journal)
+    if price:
+        book.mark(symbol, price)
+    positions = book.snapshot()
+    if not positions.empty:
+        totals = book.totals()
+        st.write(f"Realized: ${totals['realized_pl']:,.2f} · Unrealized: ${totals['unrealized_pl']:,.2f}")
+        st.dataframe(positions)
+    else:
+        st.write("No trades executed yet.")
+
+
+signals_section(symbol)
 
-# Highlight conflicts
-if rl_action_str and ml_signal != rl_action_str:
-    st.warning("⚠ ML and RL signals disagree! Consider tracking this for reward feedback.")
 
 # ----------------------------
 # Account Summary
 # ----------------------------
-st.subheader("💰 Account Summary")
-from alpaca.trading.client import TradingClient
+@st.fragment(run_every=ACCOUNT_REFRESH)
+def account_section():
+    st.subheader("💰 Account Summary")
+    if st.button("Refresh Account"):
+        fetch_account.clear()
+    try:
+        account = fetch_account()
+        st.metric("Buying Power", f"${account['buying_power']:,.2f}")
+        st.metric("Equity", f"${account['equity']:,.2f}")
+        st.metric("Cash", f"${account['cash']:,.2f}")
+    except Exception as e:
+        st.error(f"Could not fetch account info: {e}")
 
-load_dotenv()
-API_KEY = os.getenv("APCA_API_KEY_ID")
-API_SECRET = os.getenv("APCA_API_SECRET_KEY")
-api = TradingClient(API_KEY, API_SECRET, paper=True)
 
-try:
-    account = api.get_account()
-    st.metric("Buying Power", f"${float(account.buying_power):,.2f}")
-    st.metric("Equity", f"${float(account.equity):,.2f}")
-    st.metric("Cash", f"${float(account.cash):,.2f}")
-except Exception as e:
-    st.error(f"Could not fetch account info: {e}")
-# ----------------------------
-# Update P/L for executed trades
-# ----------------------------
-if "trade_logs" in st.session_state and price:
-    updated_logs = []
-    for trade in st.session_state["trade_logs"]:
-        # Calculate current equity
-        if trade["type"] == "RL":
-            # RL reward based on initial balance
-            initial_balance = 10000
-            current_equity = (trade["qty"] if trade["action"]=="BUY" else -trade["qty"]) * price + initial_balance
-            trade["reward"] = current_equity - initial_balance
-        elif trade["type"] == "ML/SMA":
-            # For ML trades, approximate P/L if you want
-            trade["reward"] = (price - trade["price"]) * trade["qty"] if trade["action"]=="BUY" else (trade["price"] - price) * trade["qty"]
-        updated_logs.append(trade)
-    st.session_state["trade_logs"] = updated_logs
-
-# Display updated logs with P/L
-st.subheader("📝 Trade Logs (Updated P/L)")
-logs_df = pd.DataFrame(st.session_state.get("trade_logs", []))
-if not logs_df.empty:
-    st.dataframe(logs_df)
-else:
-    st.write("No trades executed yet.")
+account_section()
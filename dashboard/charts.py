@@ -0,0 +1,33 @@
+# dashboard/charts.py
+import numpy as np
+import plotly.graph_objs as go
+
+from data.downsample import DEFAULT_MAX_POINTS, downsample, visible_slice
+
+
+def price_figure(timestamps, series, start=None, end=None, max_points=DEFAULT_MAX_POINTS, method="lttb"):
+    """
+    Line chart of `series` ({trace name: array}, the first one is the
+    price) over the visible [start, end] window, downsampled to about
+    `max_points` points per trace.
+
+    The rows to draw are picked on the price and reused for every trace,
+    so the overlays stay aligned with it. Traces are built straight from
+    NumPy arrays; the payload is bounded by max_points however long the
+    history is.
+    """
+    window = visible_slice(timestamps, start, end)
+    x = np.asarray(timestamps)[window]
+    columns = {name: np.asarray(values)[window] for name, values in series.items()}
+
+    price = next(iter(columns.values()))
+    if len(price):
+        rows = downsample(x.view(np.int64) if x.dtype.kind == "M" else x, np.nan_to_num(price), max_points, method)
+    else:
+        rows = np.arange(0)
+
+    fig = go.Figure()
+    for name, values in columns.items():
+        fig.add_trace(go.Scatter(x=x[rows], y=values[rows], mode="lines", name=name))
+    fig.update_layout(uirevision="price")  # keep legend/zoom state across reruns
+    return fig
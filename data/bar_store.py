@@ -0,0 +1,329 @@
+# data/bar_store.py
+import argparse
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+STORE_DIR = os.path.join("data", "store")
+FEATURE_STORE_DIR = os.path.join(STORE_DIR, "features")
+DEFAULT_TIMEFRAME = "1Day"
+
+# Column types for standard bar fields; other numeric columns (volume,
+# features) keep their own dtype, non-numeric ones are stored as float64
+BAR_DTYPES = {
+    "timestamp": np.int64,     # nanoseconds since epoch (UTC)
+    "open": np.float64,
+    "high": np.float64,
+    "low": np.float64,
+    "close": np.float64,
+}
+
+
+def _to_ns(values):
+    """Timestamps (strings, datetimes, tz-aware or not) -> int64 ns UTC."""
+    ts = pd.to_datetime(pd.Series(values), utc=True)
+    return ts.dt.tz_localize(None).to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+def _to_columns(bars):
+    """DataFrame or dict of arrays -> dict of typed 1-D NumPy arrays, sorted by time."""
+    if isinstance(bars, pd.DataFrame):
+        frame = bars.reset_index() if "timestamp" not in bars.columns else bars
+        columns = {name: frame[name].to_numpy() for name in frame.columns if name != "index"}
+    else:
+        columns = {name: np.asarray(values) for name, values in bars.items()}
+
+    if "timestamp" not in columns:
+        raise ValueError("bars need a 'timestamp' column")
+
+    if columns["timestamp"].dtype != np.int64:
+        columns["timestamp"] = _to_ns(columns["timestamp"])
+
+    typed = {}
+    for name, values in columns.items():
+        dtype = BAR_DTYPES.get(name)
+        if dtype is None:
+            dtype = values.dtype if values.dtype.kind in "biuf" else np.float64
+        typed[name] = np.ascontiguousarray(values, dtype=dtype)
+
+    order = np.argsort(typed["timestamp"], kind="stable")
+    if not np.all(order[:-1] < order[1:]):
+        typed = {name: values[order] for name, values in typed.items()}
+    return typed
+
+
+class BarStore:
+    """
+    Local columnar bar store keyed by symbol and timeframe.
+
+    Each (timeframe, symbol) lives in its own directory with one raw
+    little-endian binary file per column plus a meta.json holding column
+    dtypes and the committed row count. Reads return read-only memmap
+    views, so a date-range read only touches the pages it needs.
+    Appends write new bytes first and bump the row count last, so a
+    crash mid-append leaves the previous data intact. One writer at a time.
+    """
+
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+
+    # ----------------------------
+    # Paths / metadata
+    # ----------------------------
+    def _dir(self, symbol, timeframe):
+        return os.path.join(self.root, timeframe, symbol.upper())
+
+    def _meta(self, symbol, timeframe):
+        path = os.path.join(self._dir(symbol, timeframe), "meta.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_meta(self, directory, meta):
+        tmp = os.path.join(directory, "meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(directory, "meta.json"))
+
+    def exists(self, symbol, timeframe=DEFAULT_TIMEFRAME):
+        return self._meta(symbol, timeframe) is not None
+
+    def symbols(self, timeframe=DEFAULT_TIMEFRAME):
+        """Symbols stored for a timeframe."""
+        directory = os.path.join(self.root, timeframe)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(
+            name for name in os.listdir(directory)
+            if os.path.exists(os.path.join(directory, name, "meta.json"))
+        )
+
+    def rows(self, symbol, timeframe=DEFAULT_TIMEFRAME):
+        meta = self._meta(symbol, timeframe)
+        return meta["rows"] if meta else 0
+
+    def columns(self, symbol, timeframe=DEFAULT_TIMEFRAME):
+        meta = self._meta(symbol, timeframe)
+        return list(meta["columns"]) if meta else []
+
+    # ----------------------------
+    # Writes
+    # ----------------------------
+    def write(self, symbol, bars, timeframe=DEFAULT_TIMEFRAME):
+        """Replace everything stored for (symbol, timeframe) with `bars`."""
+        columns = _to_columns(bars)
+        directory = self._dir(symbol, timeframe)
+        tmp_dir = directory + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        for name, values in columns.items():
+            values.astype(values.dtype.newbyteorder("<"), copy=False).tofile(
+                os.path.join(tmp_dir, f"{name}.bin")
+            )
+        meta = {
+            "symbol": symbol.upper(),
+            "timeframe": timeframe,
+            "columns": {name: values.dtype.newbyteorder("<").str for name, values in columns.items()},
+            "rows": int(len(columns["timestamp"])),
+        }
+        self._write_meta(tmp_dir, meta)
+
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(os.path.dirname(directory), exist_ok=True)
+        os.replace(tmp_dir, directory)
+        return meta["rows"]
+
+    def append(self, symbol, bars, timeframe=DEFAULT_TIMEFRAME):
+        """
+        Append bars newer than the last stored timestamp.
+        Older or duplicate bars are dropped. Returns the number of rows added.
+        """
+        meta = self._meta(symbol, timeframe)
+        if meta is None:
+            return self.write(symbol, bars, timeframe)
+
+        columns = _to_columns(bars)
+        missing = set(meta["columns"]) - set(columns)
+        if missing:
+            raise ValueError(f"appended bars are missing columns: {sorted(missing)}")
+
+        last = self.last_timestamp_ns(symbol, timeframe)
+        if last is not None:
+            keep = columns["timestamp"] > last
+            if not keep.any():
+                return 0
+            columns = {name: values[keep] for name, values in columns.items()}
+
+        directory = self._dir(symbol, timeframe)
+        rows = meta["rows"]
+        added = len(columns["timestamp"])
+        for name, dtype in meta["columns"].items():
+            path = os.path.join(directory, f"{name}.bin")
+            dtype = np.dtype(dtype)
+            with open(path, "r+b") as f:
+                # Drop any bytes past the committed row count (interrupted append)
+                f.truncate(rows * dtype.itemsize)
+                f.seek(0, os.SEEK_END)
+                f.write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+
+        meta["rows"] = rows + added
+        self._write_meta(directory, meta)
+        return added
+
+    def attrs(self, symbol, timeframe=DEFAULT_TIMEFRAME):
+        """Free-form attributes saved alongside the columns (e.g. coverage)."""
+        meta = self._meta(symbol, timeframe)
+        return dict(meta.get("attrs", {})) if meta else {}
+
+    def set_attrs(self, symbol, timeframe=DEFAULT_TIMEFRAME, **attrs):
+        meta = self._meta(symbol, timeframe)
+        if meta is None:
+            raise KeyError(f"no {timeframe} bars stored for {symbol}")
+        meta.setdefault("attrs", {}).update(attrs)
+        self._write_meta(self._dir(symbol, timeframe), meta)
+
+    def delete(self, symbol, timeframe=DEFAULT_TIMEFRAME):
+        shutil.rmtree(self._dir(symbol, timeframe), ignore_errors=True)
+
+    # ----------------------------
+    # Reads
+    # ----------------------------
+    def _column(self, directory, name, dtype, rows):
+        dtype = np.dtype(dtype)
+        if rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(os.path.join(directory, f"{name}.bin"), dtype=dtype, mode="r", shape=(rows,))
+
+    def read(self, symbol, timeframe=DEFAULT_TIMEFRAME, start=None, end=None, columns=None):
+        """
+        Zero-copy read of a date range.
+
+        Returns {column: read-only array view} for bars with
+        start <= timestamp <= end (either bound optional). Timestamps are
+        int64 ns; use read_frame() for a DataFrame.
+        """
+        meta = self._meta(symbol, timeframe)
+        if meta is None:
+            raise KeyError(f"no {timeframe} bars stored for {symbol}")
+
+        directory = self._dir(symbol, timeframe)
+        rows = meta["rows"]
+        timestamps = self._column(directory, "timestamp", meta["columns"]["timestamp"], rows)
+
+        lo = 0 if start is None else int(np.searchsorted(timestamps, _to_ns([start])[0], side="left"))
+        hi = rows if end is None else int(np.searchsorted(timestamps, _to_ns([end])[0], side="right"))
+
+        names = list(meta["columns"]) if columns is None else ["timestamp"] + [c for c in columns if c != "timestamp"]
+        out = {}
+        for name in names:
+            if name == "timestamp":
+                values = timestamps
+            else:
+                values = self._column(directory, name, meta["columns"][name], rows)
+            out[name] = values[lo:hi]
+        return out
+
+    def read_frame(self, symbol, timeframe=DEFAULT_TIMEFRAME, start=None, end=None, columns=None):
+        """Date-range read as a DataFrame with a datetime 'timestamp' column."""
+        data = self.read(symbol, timeframe, start, end, columns)
+        frame = pd.DataFrame({name: np.asarray(values) for name, values in data.items()})
+        frame["timestamp"] = pd.to_datetime(frame["timestamp"].to_numpy().view("datetime64[ns]"))
+        return frame
+
+    def last_timestamp_ns(self, symbol, timeframe=DEFAULT_TIMEFRAME):
+        meta = self._meta(symbol, timeframe)
+        if not meta or meta["rows"] == 0:
+            return None
+        timestamps = self._column(self._dir(symbol, timeframe), "timestamp",
+                                  meta["columns"]["timestamp"], meta["rows"])
+        return int(timestamps[-1])
+
+    def last_timestamp(self, symbol, timeframe=DEFAULT_TIMEFRAME):
+        """Last stored bar time as a pd.Timestamp (None if nothing stored)."""
+        last = self.last_timestamp_ns(symbol, timeframe)
+        return None if last is None else pd.Timestamp(last)
+
+
+# -----------------------------
+# CSV COMPATIBILITY
+# -----------------------------
+
+def import_csv(path, symbol, timeframe=DEFAULT_TIMEFRAME, store=None):
+    """Load a timestamp/OHLCV CSV into the store, replacing what was there."""
+    store = store or BarStore()
+    rows = store.write(symbol, pd.read_csv(path), timeframe)
+    return rows
+
+
+def ensure_bars(symbol, timeframe=DEFAULT_TIMEFRAME, store=None, data_dir="data"):
+    """
+    Make sure (symbol, timeframe) is in the store, importing
+    data/{symbol}_5y.csv on first use. Returns the store.
+    """
+    store = store or BarStore()
+    if not store.exists(symbol, timeframe):
+        csv_path = os.path.join(data_dir, f"{symbol.upper()}_5y.csv")
+        if not os.path.exists(csv_path):
+            raise FileNotFoundError(f"No stored bars or {csv_path} for {symbol}")
+        import_csv(csv_path, symbol, timeframe, store)
+    return store
+
+
+def load_bars(symbol, timeframe=DEFAULT_TIMEFRAME, start=None, end=None, store=None, data_dir="data"):
+    """Bars for a symbol as a DataFrame, from the store (CSV imported on first use)."""
+    store = ensure_bars(symbol, timeframe, store, data_dir)
+    return store.read_frame(symbol, timeframe, start, end)
+
+
+def load_features(symbol, timeframe=DEFAULT_TIMEFRAME, start=None, end=None, store=None, data_dir="data"):
+    """
+    Prepared feature frame for a symbol from the feature store.
+    Falls back to importing data/prepared_{symbol}.csv on first use.
+    """
+    store = store or BarStore(FEATURE_STORE_DIR)
+    if not store.exists(symbol, timeframe):
+        csv_path = os.path.join(data_dir, f"prepared_{symbol.upper()}.csv")
+        if not os.path.exists(csv_path):
+            raise FileNotFoundError(f"No stored features or {csv_path} for {symbol}")
+        import_csv(csv_path, symbol, timeframe, store)
+    return store.read_frame(symbol, timeframe, start, end)
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local columnar bar store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    imp = sub.add_parser("import", help="import CSV files (SYMBOL_*.csv) into the store")
+    imp.add_argument("paths", nargs="+")
+    imp.add_argument("--symbol", help="symbol (default: file name prefix before '_')")
+    imp.add_argument("--timeframe", default=DEFAULT_TIMEFRAME)
+
+    info = sub.add_parser("info", help="list stored symbols")
+    info.add_argument("--timeframe", default=DEFAULT_TIMEFRAME)
+
+    parser.add_argument("--root", default=STORE_DIR)
+    args = parser.parse_args(argv)
+    store = BarStore(args.root)
+
+    if args.command == "import":
+        for path in args.paths:
+            symbol = args.symbol or os.path.basename(path).split("_")[0].split(".")[0]
+            rows = import_csv(path, symbol, args.timeframe, store)
+            print(f"✅ {symbol}: {rows} bars imported from {path}")
+    else:
+        for symbol in store.symbols(args.timeframe):
+            print(f"{symbol}: {store.rows(symbol, args.timeframe)} bars, "
+                  f"last {store.last_timestamp(symbol, args.timeframe)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+# data/downloader.py
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from data.bar_store import BarStore, DEFAULT_TIMEFRAME
+from data.stream import TIMEFRAME_SECONDS, market_holidays
+
+# Column order used by data/*_5y.csv and the bar store
+BAR_COLUMNS = ["timestamp", "close", "high", "low", "open", "volume"]
+
+FAILED_FILE = "failed_symbols.json"
+
+MARKET_TZ = "America/New_York"
+MARKET_CLOSE = pd.Timedelta(hours=16)  # NYSE regular session close, exchange time
+
+
+# -----------------------------
+# DATA SOURCES
+# -----------------------------
+# A source is any callable (symbol, start, end, timeframe) -> DataFrame
+# with BAR_COLUMNS. Empty frames mean "no bars in that range".
+
+def yfinance_source(symbol, start, end, timeframe=DEFAULT_TIMEFRAME):
+    """Bars from Yahoo Finance (what fetch_aapl.py has always used)."""
+    import yfinance as yf
+
+    interval = {"1Day": "1d", "1Hour": "1h", "1Min": "1m"}[timeframe]
+    # yfinance treats `end` as exclusive
+    df = yf.download(symbol, start=start, end=end + timedelta(days=1),
+                     interval=interval, progress=False)
+    if df is None or df.empty:
+        return pd.DataFrame(columns=BAR_COLUMNS)
+
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    df = df.reset_index().rename(columns={
+        "Date": "timestamp",
+        "Datetime": "timestamp",
+        "Open": "open",
+        "High": "high",
+        "Low": "low",
+        "Close": "close",
+        "Volume": "volume"
+    })
+    return df[BAR_COLUMNS]
+
+
+def alpaca_source(symbol, start, end, timeframe=DEFAULT_TIMEFRAME):
+    """Bars from Alpaca's historical data API (IEX feed)."""
+    from alpaca.data.requests import StockBarsRequest
+    from alpaca.data.timeframe import TimeFrame
+    from data.market_data import get_data_client
+
+    request = StockBarsRequest(
+        symbol_or_symbols=[symbol],
+        timeframe={"1Day": TimeFrame.Day, "1Hour": TimeFrame.Hour, "1Min": TimeFrame.Minute}[timeframe],
+        start=start,
+        end=end,
+        feed="iex"
+    )
+    df = get_data_client().get_stock_bars(request).df
+    if df.empty:
+        return pd.DataFrame(columns=BAR_COLUMNS)
+    return df.reset_index()[BAR_COLUMNS]
+
+
+SOURCES = {
+    "yfinance": yfinance_source,
+    "alpaca": alpaca_source,
+}
+
+
+# -----------------------------
+# INCREMENTAL REFRESH
+# -----------------------------
+
+def completed_until(timeframe=DEFAULT_TIMEFRAME, now=None):
+    """
+    Timestamp (naive, like the store) of the newest bar that is final at
+    `now`: for daily bars the last NYSE session that has closed, for
+    intraday bars the last full interval. Later bars are still forming, and
+    once stored they would never be replaced (refreshes only add newer bars).
+    """
+    now = pd.Timestamp.now(tz="UTC") if now is None else pd.Timestamp(now)
+    now = now.tz_localize("UTC") if now.tzinfo is None else now
+    if timeframe != "1Day":
+        return (now - pd.Timedelta(seconds=TIMEFRAME_SECONDS[timeframe])).tz_convert("UTC").tz_localize(None)
+
+    local = now.tz_convert(MARKET_TZ)
+    day = local.normalize().tz_localize(None)
+    if local - local.normalize() < MARKET_CLOSE:
+        day -= pd.Timedelta(days=1)  # today's session is still open (or not started)
+    session = np.busday_offset(day.date(), 0, roll="backward",
+                               holidays=market_holidays([day.year - 1, day.year]))
+    return pd.Timestamp(session)
+
+
+def missing_ranges(store, symbol, start, end, timeframe=DEFAULT_TIMEFRAME):
+    """
+    Date ranges in [start, end] not yet covered by the store.
+    Returns a list of (start, end, where) with where in {"full", "head", "tail"}.
+    """
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    if not store.exists(symbol, timeframe) or store.rows(symbol, timeframe) == 0:
+        return [(start, end, "full")]
+
+    timestamps = store.read(symbol, timeframe, columns=[])["timestamp"]
+    first, last = pd.Timestamp(int(timestamps[0])), pd.Timestamp(int(timestamps[-1]))
+
+    # History before `history_start` was already requested and came back empty
+    history_start = store.attrs(symbol, timeframe).get("history_start")
+    covered_from = min(first.normalize(), pd.Timestamp(history_start)) if history_start else first.normalize()
+
+    ranges = []
+    if start < covered_from:
+        ranges.append((start, first - pd.Timedelta(1, "ns"), "head"))
+    if end > last:
+        ranges.append((last + pd.Timedelta(1, "ns"), end, "tail"))
+    return ranges
+
+
+def _fetch_with_retry(source, symbol, start, end, timeframe, retries, backoff, sleep):
+    """Call the source, retrying with exponential backoff."""
+    for attempt in range(retries + 1):
+        try:
+            return source(symbol, start, end, timeframe)
+        except Exception as e:
+            if attempt == retries:
+                raise
+            delay = backoff * (2 ** attempt)
+            print(f"⚠ {symbol}: {e} (retry {attempt + 1}/{retries} in {delay:.1f}s)")
+            sleep(delay)
+
+
+def refresh_symbol(symbol, source, store, start, end, timeframe=DEFAULT_TIMEFRAME,
+                   retries=3, backoff=1.0, sleep=time.sleep, now=None):
+    """
+    Fetch and store only the bars missing for one symbol. Returns rows added.
+    Bars that are not final yet (see completed_until) are never stored.
+    """
+    end = min(pd.Timestamp(end), completed_until(timeframe, now))
+    added = 0
+    for range_start, range_end, where in missing_ranges(store, symbol, start, end, timeframe):
+        bars = _fetch_with_retry(source, symbol, range_start, range_end, timeframe, retries, backoff, sleep)
+        if bars is not None and len(bars):
+            # Sources may return more than asked (yfinance pads `end` by a day)
+            bars = pd.DataFrame(bars)
+            timestamps = pd.to_datetime(bars["timestamp"], utc=True).dt.tz_localize(None)
+            bars = bars[(timestamps <= range_end).to_numpy()]
+        if bars is None or len(bars) == 0:
+            if where == "head":
+                store.set_attrs(symbol, timeframe, history_start=str(range_start))
+            continue
+
+        if where == "full":
+            added += store.write(symbol, bars, timeframe)
+            store.set_attrs(symbol, timeframe, history_start=str(range_start))
+            continue
+
+        if where == "head":
+            # Backfill: older bars go in front, so rewrite the symbol once
+            existing = store.read_frame(symbol, timeframe)
+            bars = pd.DataFrame(bars)
+            bars["timestamp"] = pd.to_datetime(bars["timestamp"], utc=True).dt.tz_localize(None)
+            bars = bars[bars["timestamp"] < existing["timestamp"].iloc[0]]
+            combined = pd.concat([bars[existing.columns], existing], ignore_index=True)
+            before = store.rows(symbol, timeframe)
+            added += store.write(symbol, combined, timeframe) - before
+            store.set_attrs(symbol, timeframe, history_start=str(range_start))
+        else:
+            added += store.append(symbol, bars, timeframe)
+    return added
+
+
+def refresh_universe(symbols, source=yfinance_source, store=None, start=None, end=None,
+                     timeframe=DEFAULT_TIMEFRAME, max_workers=8, retries=3, backoff=1.0,
+                     sleep=time.sleep, now=None):
+    """
+    Bring every symbol in the store up to date for [start, end].
+
+    Symbols run concurrently on a bounded thread pool; each one only
+    requests the date ranges it is missing, up to the last completed bar at
+    `now` (default: the current time). Symbols that still fail after
+    retries are returned in 'failed' and saved to <store>/failed_symbols.json.
+    """
+    store = store or BarStore()
+    end = pd.Timestamp(end) if end is not None else pd.Timestamp(datetime.today().date())
+    start = pd.Timestamp(start) if start is not None else end - pd.Timedelta(days=5 * 365)
+
+    started = time.perf_counter()
+    updated, failed = {}, {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(refresh_symbol, symbol, source, store, start, end,
+                        timeframe, retries, backoff, sleep, now): symbol
+            for symbol in dict.fromkeys(s.upper() for s in symbols)
+        }
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                updated[symbol] = future.result()
+            except Exception as e:
+                failed[symbol] = str(e)
+                print(f"❌ {symbol}: {e}")
+
+    os.makedirs(store.root, exist_ok=True)
+    with open(os.path.join(store.root, FAILED_FILE), "w") as f:
+        json.dump({"timeframe": timeframe, "failed": failed}, f, indent=2)
+
+    return {
+        "updated": updated,
+        "failed": failed,
+        "elapsed": time.perf_counter() - started,
+    }
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incrementally refresh bars for a universe.")
+    parser.add_argument("--symbols", nargs="+", default=["AAPL"])
+    parser.add_argument("--years", type=float, default=5)
+    parser.add_argument("--timeframe", default=DEFAULT_TIMEFRAME)
+    parser.add_argument("--source", choices=sorted(SOURCES), default="yfinance")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--retries", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    end = pd.Timestamp(datetime.today().date())
+    start = end - pd.Timedelta(days=int(args.years * 365))
+    result = refresh_universe(
+        args.symbols, SOURCES[args.source], start=start, end=end,
+        timeframe=args.timeframe, max_workers=args.workers, retries=args.retries
+    )
+
+    total = sum(result["updated"].values())
+    print(f"✅ {len(result['updated'])} symbols refreshed, {total} new bars in {result['elapsed']:.2f}s")
+    if result["failed"]:
+        print(f"❌ Failed: {', '.join(sorted(result['failed']))}")
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# data/downsample.py
+import numpy as np
+
+# Points per trace a chart needs: roughly one per horizontal pixel
+DEFAULT_MAX_POINTS = 2000
+
+
+# -----------------------------
+# VISIBLE WINDOW
+# -----------------------------
+
+def visible_slice(timestamps, start=None, end=None):
+    """
+    Index slice of the rows in [start, end] of a sorted timestamp array.
+    Binary search, so zooming into a long memmapped history only touches
+    the visible part.
+    """
+    timestamps = np.asarray(timestamps)
+    lo = 0 if start is None else int(np.searchsorted(timestamps, np.asarray(start, dtype=timestamps.dtype), "left"))
+    hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, np.asarray(end, dtype=timestamps.dtype), "right"))
+    return slice(lo, hi)
+
+
+# -----------------------------
+# SHAPE-PRESERVING DOWNSAMPLING
+# -----------------------------
+# Both return sorted row indices into the input, so one selection can be
+# applied to every column of the same rows (close, moving averages, ...).
+
+def lttb_indices(x, y, max_points=DEFAULT_MAX_POINTS):
+    """
+    Largest-Triangle-Three-Buckets: keeps the first and last point and, per
+    bucket, the point forming the largest triangle with the previously kept
+    point and the next bucket's average. `y` must be finite.
+    """
+    n = len(y)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # Bucket i (of max_points - 2) covers [edges[i], edges[i + 1]); the
+    # last edge is the final point, which acts as the last "next bucket"
+    edges = (np.arange(max_points - 1) * ((n - 2) / (max_points - 2))).astype(np.int64) + 1
+    bounds = np.append(edges, n)
+    counts = np.diff(bounds)
+    avg_x = np.add.reduceat(x, edges) / counts
+    avg_y = np.add.reduceat(y, edges) / counts
+
+    out = np.empty(max_points, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - avg_x[i + 1]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y[i + 1] - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def minmax_indices(y, max_points=DEFAULT_MAX_POINTS):
+    """
+    Min and max of each of max_points // 2 equal buckets, plus the end
+    points. Cheaper than LTTB and keeps every spike; NaNs are skipped.
+    """
+    n = len(y)
+    buckets = max_points // 2
+    if max_points >= n or buckets < 1:
+        return np.arange(n)
+
+    size = -(-n // buckets)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    lows = offsets + np.where(np.isnan(padded), np.inf, padded).argmin(axis=1)
+    highs = offsets + np.where(np.isnan(padded), -np.inf, padded).argmax(axis=1)
+
+    picked = np.concatenate(([0, n - 1], lows, highs))
+    return np.unique(picked[picked < n])
+
+
+def downsample(x, y, max_points=DEFAULT_MAX_POINTS, method="lttb"):
+    """Row indices to draw `y` against `x` with at most ~max_points points."""
+    if method == "lttb":
+        return lttb_indices(x, y, max_points)
+    if method == "minmax":
+        return minmax_indices(y, max_points)
+    raise ValueError(f"unknown downsampling method {method!r} (use 'lttb' or 'minmax')")
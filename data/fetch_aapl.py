@@ -1,30 +1,23 @@
-import yfinance as yf
-import pandas as pd
-from datetime import datetime, timedelta
+import os
+import sys
 
-# Define symbol and time range
-symbol = "AAPL"
-end_date = datetime.today()
-start_date = end_date - timedelta(days=5*365)  # ~5 years
+# Add project root to Python path
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
 
-# Fetch historical data
-df = yf.download(symbol, start=start_date, end=end_date, interval="1d")
+from data.bar_store import BarStore
+from data.downloader import refresh_universe, yfinance_source
 
-# Reset index to get 'Date' as column
-df.reset_index(inplace=True)
+# Define symbol
+symbol = "AAPL"
 
-# Optional: rename columns for consistency
-df = df.rename(columns={
-    "Date": "timestamp",
-    "Open": "open",
-    "High": "high",
-    "Low": "low",
-    "Close": "close",
-    "Adj Close": "adj_close",
-    "Volume": "volume"
-})
+# Fetch only the bars missing from the last ~5 years (full history on first run)
+store = BarStore()
+result = refresh_universe([symbol], yfinance_source, store)
+if result["failed"]:
+    raise SystemExit(f"❌ Failed to download {symbol}: {result['failed'][symbol]}")
 
 # Save to CSV for training
-df.to_csv("data/AAPL_5y.csv", index=False)
+store.read_frame(symbol).to_csv("data/AAPL_5y.csv", index=False)
 
-print("✅ 5-year AAPL data downloaded and saved to data/AAPL_5y.csv")
+print(f"✅ {result['updated'][symbol]} new AAPL bars stored; data/AAPL_5y.csv refreshed")
@@ -0,0 +1,247 @@
+# data/indicators.py
+import copy
+import math
+from collections import deque
+
+import numpy as np
+
+# Relative drop in the sum of squares that triggers a variance recompute
+# (same tolerance as pandas' rolling var: machine epsilon * 1e3)
+_INV_COND_TOL = np.finfo(np.float64).eps * 1e3
+
+
+# -----------------------------
+# STREAMING WINDOWS
+# -----------------------------
+# These mirror pandas' rolling mean/var kernels step for step (Kahan
+# compensated adds/removes, same special cases), so streaming values are
+# bit-identical to Series.rolling(window).mean() / .std().
+
+class RollingMean:
+    """O(1) per value rolling mean, bit-compatible with rolling(window).mean()."""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.nobs = 0
+        self.neg_ct = 0
+        self.sum_x = 0.0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+        self.same_count = 0
+        self.prev_value = math.nan
+        self.value = math.nan
+
+    def _add(self, val):
+        if val == val:
+            self.nobs += 1
+            y = val - self.compensation_add
+            t = self.sum_x + y
+            self.compensation_add = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, val) < 0:
+                self.neg_ct += 1
+            if val == self.prev_value:
+                self.same_count += 1
+            else:
+                self.same_count = 1
+            self.prev_value = val
+
+    def _remove(self, val):
+        if val == val:
+            self.nobs -= 1
+            y = -val - self.compensation_remove
+            t = self.sum_x + y
+            self.compensation_remove = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, val) < 0:
+                self.neg_ct -= 1
+
+    def update(self, val):
+        val = float(val)
+        if not self.values or self.window == 1:
+            # Fresh window (pandas' "setup" branch)
+            self.nobs = self.neg_ct = 0
+            self.sum_x = self.compensation_add = self.compensation_remove = 0.0
+            self.prev_value = val
+            self.same_count = 0
+        elif len(self.values) == self.window:
+            self._remove(self.values[0])
+
+        self.values.append(val)
+        self._add(val)
+
+        if self.nobs >= self.window and self.nobs > 0:
+            result = self.sum_x / self.nobs
+            if self.same_count >= self.nobs:
+                result = self.prev_value
+            elif self.neg_ct == 0 and result < 0:
+                result = 0.0
+            elif self.neg_ct == self.nobs and result > 0:
+                result = 0.0
+        else:
+            result = math.nan
+        self.value = result
+        return result
+
+
+class RollingStd:
+    """O(1) per value rolling std (amortized), bit-compatible with rolling(window).std()."""
+
+    def __init__(self, window, ddof=1):
+        self.window = window
+        self.ddof = ddof
+        self.values = deque(maxlen=window)
+        self._reset()
+        self.unstable = False
+        self.value = math.nan
+
+    def _reset(self):
+        self.nobs = 0.0
+        self.mean_x = 0.0
+        self.ssqdm_x = 0.0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+
+    def _add(self, val):
+        if val != val:
+            return
+        prev_m2 = self.ssqdm_x
+        self.nobs += 1
+        prev_mean = self.mean_x - self.compensation_add
+        y = val - self.compensation_add
+        t = y - self.mean_x
+        self.compensation_add = t + self.mean_x - y
+        if self.nobs:
+            self.mean_x = self.mean_x + t / self.nobs
+        else:
+            self.mean_x = 0.0
+        self.ssqdm_x = self.ssqdm_x + (val - prev_mean) * (val - self.mean_x)
+        if prev_m2 * _INV_COND_TOL > self.ssqdm_x:
+            self.unstable = True
+
+    def _remove(self, val):
+        if val != val:
+            return
+        prev_m2 = self.ssqdm_x
+        self.nobs -= 1
+        if self.nobs:
+            prev_mean = self.mean_x - self.compensation_remove
+            y = val - self.compensation_remove
+            t = y - self.mean_x
+            self.compensation_remove = t + self.mean_x - y
+            self.mean_x = self.mean_x - t / self.nobs
+            self.ssqdm_x = self.ssqdm_x - (val - prev_mean) * (val - self.mean_x)
+            if prev_m2 * _INV_COND_TOL > self.ssqdm_x:
+                self.unstable = True
+        else:
+            self.mean_x = 0.0
+            self.ssqdm_x = 0.0
+            self.unstable = False
+
+    def update(self, val):
+        val = float(val)
+        recompute = not self.values or self.window == 1
+
+        if not recompute:
+            if len(self.values) == self.window:
+                self._remove(self.values[0])
+            self._add(val)
+        self.values.append(val)
+
+        if recompute or self.unstable:
+            # Rebuild from the window contents (first bar or lost precision)
+            self._reset()
+            for v in self.values:
+                self._add(v)
+            self.unstable = False
+
+        minp = max(self.window, 1)
+        if self.nobs >= minp and self.nobs > self.ddof:
+            var = self.ssqdm_x / (self.nobs - self.ddof)
+            result = math.sqrt(var) if var >= 0 else 0.0
+        else:
+            result = math.nan
+        self.value = result
+        return result
+
+
+# -----------------------------
+# INDICATOR ENGINE
+# -----------------------------
+
+FEATURES = ["close", "return", "ma_5", "ma_20", "ma_50", "rsi_14", "volatility_10"]
+
+
+class IndicatorEngine:
+    """
+    Incremental version of prepare_dataset's features.
+
+    Keeps O(1)-per-bar state for the return, SMA 5/20/50, RSI-14 and
+    10-bar return volatility. Feeding closes one at a time through update()
+    gives the same values, bit for bit, as prepare_stock_dataset() on the
+    full history. rsi_period / vol_window may be None to skip those
+    features when a consumer only needs moving averages.
+    """
+
+    def __init__(self, ma_windows=(5, 20, 50), rsi_period=14, vol_window=10):
+        self.ma = {f"ma_{w}": RollingMean(w) for w in ma_windows}
+        self.rsi_name = f"rsi_{rsi_period}"
+        self.avg_gain = RollingMean(rsi_period) if rsi_period else None
+        self.avg_loss = RollingMean(rsi_period) if rsi_period else None
+        self.vol_name = f"volatility_{vol_window}"
+        self.volatility = RollingStd(vol_window) if vol_window else None
+        self.prev_close = math.nan
+        self.bars = 0
+        self.features = {}
+
+    @classmethod
+    def from_history(cls, closes, **kwargs):
+        """Engine warmed up on a history of closes."""
+        engine = cls(**kwargs)
+        for close in np.asarray(closes, dtype=np.float64):
+            engine.update(close)
+        return engine
+
+    def update(self, close):
+        """Feed one completed bar's close; returns the feature dict for it."""
+        close = float(close)
+        prev = self.prev_close
+
+        ret = close / prev - 1 if prev == prev else math.nan
+
+        features = {"close": close, "return": ret}
+        for name, window in self.ma.items():
+            features[name] = window.update(close)
+
+        if self.avg_gain is not None:
+            delta = close - prev if prev == prev else math.nan
+            # delta.clip(lower=0) and -delta.clip(upper=0), NaN preserved
+            gain = 0.0 if delta < 0 else delta
+            loss = -(0.0 if delta > 0 else delta)
+            avg_gain = self.avg_gain.update(gain)
+            avg_loss = self.avg_loss.update(loss)
+            rs = avg_gain / (avg_loss + 1e-9)
+            features[self.rsi_name] = 100 - (100 / (1 + rs))
+
+        if self.volatility is not None:
+            features[self.vol_name] = self.volatility.update(ret)
+
+        self.prev_close = close
+        self.bars += 1
+        self.features = features
+        return features
+
+    def snapshot(self):
+        """Features of the last completed bar."""
+        return dict(self.features)
+
+    def preview(self, close):
+        """Features if `close` were the next bar, without changing state."""
+        return copy.deepcopy(self).update(close)
+
+    def ready(self):
+        """True once every indicator has a full window."""
+        return bool(self.features) and not any(
+            v != v for v in self.features.values()
+        )
@@ -5,54 +5,130 @@ from dotenv import load_dotenv
 from datetime import datetime, timedelta
 
 from alpaca.data.historical.stock import StockHistoricalDataClient
-from alpaca.data.requests import StockBarsRequest
+from alpaca.data.requests import StockBarsRequest, StockLatestBarRequest
 from alpaca.data.timeframe import TimeFrame
 
+from data.price_cache import PriceCache
+
 load_dotenv()
 
 API_KEY = os.getenv("APCA_API_KEY_ID")
 API_SECRET = os.getenv("APCA_API_SECRET_KEY")
 
-# Alpaca data client (works for free users too)
-client = StockHistoricalDataClient(API_KEY, API_SECRET)
+# Max symbols per multi-symbol bars request
+CHUNK_SIZE = 200
 
+# Bar timeframes fetched with a bars request; "minute" uses the latest-bar endpoint
+BAR_TIMEFRAMES = {"hour": TimeFrame.Hour, "day": TimeFrame.Day}
+TIMEFRAMES = ("minute",) + tuple(BAR_TIMEFRAMES)
+
+# Alpaca data client (works for free users too), created on first use
+client = None
+
+# Shared in-process price cache (per-timeframe TTLs, LRU, coalesced fetches)
+price_cache = PriceCache()
+
+
+def get_data_client():
+    """Return the shared Alpaca data client, creating it on first use."""
+    global client
+    if client is None:
+        client = StockHistoricalDataClient(API_KEY, API_SECRET)
+    return client
+
+
+def _check_timeframe(timeframe):
+    if timeframe not in TIMEFRAMES:
+        raise ValueError(f"unknown timeframe {timeframe!r} (use one of {', '.join(TIMEFRAMES)})")
+
+
+def _bar_close(bar):
+    """Close of a parsed Bar model or a raw {'c': ...} bar dict."""
+    if isinstance(bar, dict):
+        return bar.get("c", bar.get("close"))
+    return bar.close
 
-def get_latest_price(symbol="AAPL"):
-    """Fetch latest available daily closing price."""
+
+def get_latest_prices(symbols, chunk_size=CHUNK_SIZE, client=None, timeframe="day"):
+    """
+    Fetch latest available closing prices for many symbols.
+
+    timeframe="day" reads the last daily bar, "hour" the last hourly bar and
+    "minute" the latest minute bar; anything else raises ValueError.
+    Issues one request per chunk of `chunk_size` symbols and reads the
+    last bar of each symbol straight from the response (no DataFrame).
+    Returns (prices, missing): a {symbol: close} dict and the list of
+    symbols that came back without data.
+    """
+    _check_timeframe(timeframe)
+    client = client or get_data_client()
+    symbols = list(dict.fromkeys(symbols))
 
     end = datetime.now()
     start = end - timedelta(days=5)   # Enough buffer to ensure at least 1 bar returned
 
-    request = StockBarsRequest(
-        symbol_or_symbols=[symbol],    # MUST be a list in alpaca-py
-        timeframe=TimeFrame.Day,
-        start=start,
-        end=end,
-        feed="iex"                     # Free market data feed
-    )
+    prices = {}
+    for i in range(0, len(symbols), chunk_size):
+        chunk = symbols[i:i + chunk_size]
+
+        try:
+            if timeframe == "minute":
+                latest = client.get_stock_latest_bar(
+                    StockLatestBarRequest(symbol_or_symbols=chunk, feed="iex")
+                )
+                data = {symbol: [bar] for symbol, bar in (latest or {}).items()}
+            else:
+                bars = client.get_stock_bars(StockBarsRequest(
+                    symbol_or_symbols=chunk,
+                    timeframe=BAR_TIMEFRAMES[timeframe],
+                    start=start,
+                    end=end,
+                    feed="iex"                 # Free market data feed
+                ))
+                data = getattr(bars, "data", bars) or {}
+        except Exception as e:
+            print(f"❌ Error fetching prices for {len(chunk)} symbols: {e}")
+            continue
+
+        for symbol in chunk:
+            symbol_bars = data.get(symbol)
+            if symbol_bars:
+                prices[symbol] = float(_bar_close(symbol_bars[-1]))
+
+    missing = [symbol for symbol in symbols if symbol not in prices]
+    return prices, missing
 
-    try:
-        bars = client.get_stock_bars(request)
 
-        # Convert to df
-        if hasattr(bars, "df"):
-            df = bars.df
-        else:
-            print("❌ No .df in API response")
-            return None
+def get_latest_price(symbol="AAPL"):
+    """Fetch latest available daily closing price."""
 
-        if df.empty:
-            print("❌ No price data returned.")
-            return None
+    prices, missing = get_latest_prices([symbol])
 
-        # Extract latest close
-        latest_close = df["close"].iloc[-1]
-        latest_close = float(latest_close)
+    if missing:
+        print(f"❌ No price data returned for {symbol}.")
+        return None
 
-        print(f"✅ Latest {symbol} close price: {latest_close}")
+    latest_close = prices[symbol]
+    print(f"✅ Latest {symbol} close price: {latest_close}")
 
-        return latest_close
+    return latest_close
 
-    except Exception as e:
-        print(f"❌ Error fetching price: {e}")
-        return None
+
+def get_cached_prices(symbols, timeframe="day"):
+    """
+    Latest prices through the shared cache.
+    Only symbols that are stale and not already being fetched hit the API.
+    Returns (prices, missing) like get_latest_prices.
+    """
+    _check_timeframe(timeframe)
+    return price_cache.get_many(
+        symbols,
+        lambda missing: get_latest_prices(missing, timeframe=timeframe),
+        timeframe
+    )
+
+
+def get_cached_price(symbol="AAPL", timeframe="day"):
+    """Latest price for one symbol through the shared cache (None if unavailable)."""
+    prices, _ = get_cached_prices([symbol], timeframe)
+    return prices.get(symbol)
@@ -0,0 +1,157 @@
+# data/pipeline.py
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from data.bar_store import BarStore, DEFAULT_TIMEFRAME, FEATURE_STORE_DIR, STORE_DIR, ensure_bars
+from data.prepare_dataset import prepare_stock_dataset
+
+RUN_FILE = "_last_run.json"
+
+
+# -----------------------------
+# WORKER
+# -----------------------------
+
+def prepare_symbol(symbol, bar_root=STORE_DIR, feature_root=FEATURE_STORE_DIR,
+                   timeframe=DEFAULT_TIMEFRAME, data_dir="data", export_csv=False):
+    """
+    Build the feature partition for one symbol.
+    Returns a timing row: rows written plus load/compute/write seconds.
+    """
+    t0 = time.perf_counter()
+    store = ensure_bars(symbol, timeframe, BarStore(bar_root), data_dir)
+    bars = store.read_frame(symbol, timeframe)
+    t1 = time.perf_counter()
+
+    prepared = prepare_stock_dataset(bars)
+    t2 = time.perf_counter()
+
+    BarStore(feature_root).write(symbol, prepared, timeframe)
+    if export_csv:
+        prepared.to_csv(os.path.join(data_dir, f"prepared_{symbol.upper()}.csv"), index=False)
+    t3 = time.perf_counter()
+
+    return {
+        "symbol": symbol.upper(),
+        "bars": len(bars),
+        "rows": len(prepared),
+        "load_s": t1 - t0,
+        "compute_s": t2 - t1,
+        "write_s": t3 - t2,
+    }
+
+
+# -----------------------------
+# PIPELINE
+# -----------------------------
+
+def discover_symbols(bar_root=STORE_DIR, timeframe=DEFAULT_TIMEFRAME, data_dir="data"):
+    """Symbols in the bar store plus any data/{SYMBOL}_5y.csv not imported yet."""
+    symbols = set(BarStore(bar_root).symbols(timeframe))
+    for path in glob.glob(os.path.join(data_dir, "*_5y.csv")):
+        symbols.add(os.path.basename(path).split("_")[0].upper())
+    return sorted(symbols)
+
+
+def run_pipeline(symbols=None, workers=None, bar_root=STORE_DIR, feature_root=FEATURE_STORE_DIR,
+                 timeframe=DEFAULT_TIMEFRAME, data_dir="data", export_csv=False):
+    """
+    Prepare features for a universe, one process per symbol at a time.
+
+    Output is the feature store: one partition per symbol under
+    <feature_root>/<timeframe>/<SYMBOL>/. Returns a per-symbol timing table;
+    the run summary is also saved to <feature_root>/<timeframe>/_last_run.json.
+    """
+    symbols = [s.upper() for s in (symbols or discover_symbols(bar_root, timeframe, data_dir))]
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+
+    rows, failed = [], {}
+    args = (bar_root, feature_root, timeframe, data_dir, export_csv)
+    if workers == 1 or len(symbols) <= 1:
+        for symbol in symbols:
+            try:
+                rows.append(prepare_symbol(symbol, *args))
+            except Exception as e:
+                failed[symbol] = str(e)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(symbols))) as pool:
+            futures = {pool.submit(prepare_symbol, symbol, *args): symbol for symbol in symbols}
+            for future in as_completed(futures):
+                try:
+                    rows.append(future.result())
+                except Exception as e:
+                    failed[futures[future]] = str(e)
+
+    elapsed = time.perf_counter() - started
+    timings = pd.DataFrame(rows, columns=["symbol", "bars", "rows", "load_s", "compute_s", "write_s"])
+    timings = timings.sort_values("symbol").reset_index(drop=True)
+
+    summary = {
+        "symbols": len(symbols),
+        "prepared": len(rows),
+        "failed": failed,
+        "workers": workers,
+        "elapsed_s": elapsed,
+        "cpu_s": float(timings[["load_s", "compute_s", "write_s"]].to_numpy().sum()),
+    }
+    run_dir = os.path.join(feature_root, timeframe)
+    os.makedirs(run_dir, exist_ok=True)
+    with open(os.path.join(run_dir, RUN_FILE), "w") as f:
+        json.dump(summary, f, indent=2)
+
+    timings.attrs["summary"] = summary
+    return timings
+
+
+def read_dataset(symbols=None, feature_root=FEATURE_STORE_DIR, timeframe=DEFAULT_TIMEFRAME,
+                 start=None, end=None):
+    """Concatenate feature partitions into one long frame with a 'symbol' column."""
+    store = BarStore(feature_root)
+    frames = []
+    for symbol in symbols or store.symbols(timeframe):
+        frame = store.read_frame(symbol, timeframe, start, end)
+        frame.insert(0, "symbol", symbol.upper())
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prepare features for a universe of symbols.")
+    parser.add_argument("--symbols", nargs="*", help="default: everything in the bar store / data/*_5y.csv")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--timeframe", default=DEFAULT_TIMEFRAME)
+    parser.add_argument("--bar-root", default=STORE_DIR)
+    parser.add_argument("--feature-root", default=FEATURE_STORE_DIR)
+    parser.add_argument("--csv", action="store_true", help="also write data/prepared_{SYMBOL}.csv")
+    args = parser.parse_args(argv)
+
+    timings = run_pipeline(
+        args.symbols, args.workers, args.bar_root, args.feature_root,
+        args.timeframe, export_csv=args.csv
+    )
+    summary = timings.attrs["summary"]
+
+    print(timings.to_string(index=False))
+    print(f"✅ {summary['prepared']}/{summary['symbols']} symbols prepared in "
+          f"{summary['elapsed_s']:.2f}s wall ({summary['cpu_s']:.2f}s worker time, "
+          f"{summary['workers']} workers)")
+    if summary["failed"]:
+        print(f"❌ Failed: {summary['failed']}")
+    return timings
+
+
+if __name__ == "__main__":
+    main()
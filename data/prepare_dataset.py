@@ -1,6 +1,12 @@
+import os
+import sys
 import pandas as pd
 import numpy as np
 
+# Add project root to Python path
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
 # -----------------------------
 # FEATURE ENGINEERING FUNCTIONS
 # -----------------------------
@@ -50,16 +56,13 @@ def prepare_stock_dataset(df):
 # MAIN SCRIPT
 # -----------------------------
 
-input_path = "data/AAPL_5y.csv"
-output_path = "data/prepared_AAPL.csv"
-
-print("📥 Loading raw CSV...")
-df = pd.read_csv(input_path)
-
-print("🛠 Preparing dataset...")
-prepared = prepare_stock_dataset(df)
+if __name__ == "__main__":
+    # Single-symbol entry point kept for compatibility; see data/pipeline.py
+    # for preparing a whole universe in parallel.
+    from data.pipeline import run_pipeline
 
-print("💾 Saving processed data...")
-prepared.to_csv(output_path, index=False)
+    print("🛠 Preparing dataset...")
+    timings = run_pipeline(["AAPL"], export_csv=True)
 
-print("✅ Done! Saved to:", output_path)
+    print(timings.to_string(index=False))
+    print("✅ Done! Saved to: data/prepared_AAPL.csv and the feature store")
@@ -0,0 +1,149 @@
+# data/price_cache.py
+import threading
+import time
+from collections import OrderedDict
+
+# Seconds a cached price stays fresh, per bar timeframe
+DEFAULT_TTLS = {
+    "minute": 15,
+    "hour": 120,
+    "day": 300,
+}
+
+
+class _Pending:
+    """A fetch in flight that other callers can wait on."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+
+
+class PriceCache:
+    """
+    Thread-safe in-process price cache.
+
+    Entries are keyed by (timeframe, symbol), expire after the timeframe's
+    TTL and are evicted least-recently-used beyond `max_entries`.
+    Concurrent lookups of a symbol that is already being fetched wait for
+    that fetch instead of issuing their own (request coalescing).
+    """
+
+    def __init__(self, ttls=None, max_entries=2048, wait_timeout=30, clock=time.monotonic):
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+        self.clock = clock
+
+        self._entries = OrderedDict()   # key -> (value, expires_at)
+        self._in_flight = {}            # key -> _Pending
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    # ----------------------------
+    # Lookups
+    # ----------------------------
+    def get(self, symbol, loader, timeframe="day"):
+        """Cached value for one symbol; loader(symbol) fetches on a miss."""
+        prices, _ = self.get_many(
+            [symbol], lambda symbols: ({symbols[0]: loader(symbols[0])}, []), timeframe
+        )
+        return prices.get(symbol)
+
+    def get_many(self, symbols, batch_loader, timeframe="day"):
+        """
+        Cached values for many symbols.
+
+        batch_loader(symbols) -> (prices, missing) is called once with only
+        the symbols that are neither cached nor already being fetched.
+        Returns (prices, missing) like the loader.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        prices = {}
+        claimed = []
+        waiting = []
+
+        with self._lock:
+            now = self.clock()
+            for symbol in symbols:
+                key = (timeframe, symbol)
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] > now:
+                    self._entries.move_to_end(key)
+                    prices[symbol] = entry[0]
+                    self.hits += 1
+                elif key in self._in_flight:
+                    waiting.append((symbol, self._in_flight[key]))
+                    self.coalesced += 1
+                else:
+                    self._in_flight[key] = _Pending()
+                    claimed.append(symbol)
+                    self.misses += 1
+
+        if claimed:
+            fetched = {}
+            try:
+                fetched, _ = batch_loader(claimed)
+            finally:
+                self._publish(claimed, fetched or {}, timeframe)
+            for symbol in claimed:
+                if fetched and fetched.get(symbol) is not None:
+                    prices[symbol] = fetched[symbol]
+
+        for symbol, pending in waiting:
+            pending.event.wait(self.wait_timeout)
+            if pending.value is not None:
+                prices[symbol] = pending.value
+
+        missing = [symbol for symbol in symbols if symbol not in prices]
+        return prices, missing
+
+    def _publish(self, symbols, fetched, timeframe):
+        """Store fetched values and wake up coalesced waiters."""
+        with self._lock:
+            expires_at = self.clock() + self.ttls.get(timeframe, self.ttls["day"])
+            for symbol in symbols:
+                key = (timeframe, symbol)
+                value = fetched.get(symbol)
+                if value is not None:
+                    self._entries[key] = (value, expires_at)
+                    self._entries.move_to_end(key)
+                pending = self._in_flight.pop(key, None)
+                if pending is not None:
+                    pending.value = value
+                    pending.event.set()
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    # ----------------------------
+    # Maintenance
+    # ----------------------------
+    def invalidate(self, symbol=None, timeframe=None):
+        """Drop one symbol (optionally one timeframe), or everything."""
+        with self._lock:
+            if symbol is None and timeframe is None:
+                self._entries.clear()
+                return
+            for key in list(self._entries):
+                if (timeframe is None or key[0] == timeframe) and (symbol is None or key[1] == symbol):
+                    del self._entries[key]
+
+    def stats(self):
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,390 @@
+# data/stream.py
+import argparse
+import asyncio
+import inspect
+import logging
+import os
+import time
+from collections import deque
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+from data.bar_store import DEFAULT_TIMEFRAME, ensure_bars
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+API_KEY = os.getenv("APCA_API_KEY_ID")
+API_SECRET = os.getenv("APCA_API_SECRET_KEY")
+
+# Bar spacing per timeframe, for gap detection
+TIMEFRAME_SECONDS = {"1Min": 60, "5Min": 300, "15Min": 900, "1Hour": 3600, "1Day": 86400}
+BAR_FIELDS = ("open", "high", "low", "close", "volume")
+
+# Intraday sessions are exchange-local trading dates (pre-market through
+# after-hours), so a US evening session past 00:00 UTC stays one session
+MARKET_TZ = ZoneInfo("America/New_York")
+
+
+# -----------------------------
+# TRADING CALENDAR
+# -----------------------------
+
+def _observed(day, saturday=True):
+    """Weekend holidays move to Friday (if `saturday`) or Monday."""
+    weekday = (day.astype("datetime64[D]").view("int64") - 4) % 7  # 0 = Monday
+    if weekday == 5:
+        return day - 1 if saturday else None
+    return day + 1 if weekday == 6 else day
+
+
+def _easter(year):
+    """Gregorian Easter Sunday (anonymous algorithm)."""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l_ = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l_) // 451
+    month, day = divmod(h + l_ - 7 * m + 114, 31)
+    return np.datetime64(f"{year}-{month:02d}-{day + 1:02d}")
+
+
+def _nth_weekday(year, month, n, weekmask):
+    """n-th (0-based; -1 = last) `weekmask` day of a month."""
+    month_start = np.datetime64(f"{year}-{month:02d}", "M") + (1 if n < 0 else 0)
+    return np.busday_offset(month_start.astype("datetime64[D]"), n, roll="forward", weekmask=weekmask)
+
+
+def market_holidays(years):
+    """
+    NYSE full-day holidays in `years` as sorted datetime64[D], from the
+    regular rules (one-off closures are not included).
+    """
+    days = []
+    for year in years:
+        fixed = [_observed(np.datetime64(f"{year}-01-01"), saturday=False),
+                 _observed(np.datetime64(f"{year}-07-04")),
+                 _observed(np.datetime64(f"{year}-12-25"))]
+        if year >= 2022:
+            fixed.append(_observed(np.datetime64(f"{year}-06-19")))
+        days += [day for day in fixed if day is not None]
+        days += [_nth_weekday(year, 1, 2, "Mon"),    # Martin Luther King Jr. Day
+                 _nth_weekday(year, 2, 2, "Mon"),    # Presidents' Day
+                 _easter(year) - 2,                  # Good Friday
+                 _nth_weekday(year, 5, -1, "Mon"),   # Memorial Day
+                 _nth_weekday(year, 9, 0, "Mon"),    # Labor Day
+                 _nth_weekday(year, 11, 3, "Thu")]   # Thanksgiving
+    return np.array(sorted(days), dtype="datetime64[D]")
+
+
+# -----------------------------
+# RING BUFFERS
+# -----------------------------
+
+class RingBuffer:
+    """Fixed-size per-symbol bar history in preallocated arrays; O(1) append."""
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.timestamp = np.zeros(capacity, dtype=np.int64)
+        self.values = np.zeros((capacity, len(BAR_FIELDS)), dtype=np.float64)
+        self.count = 0  # bars ever appended
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    @property
+    def last_timestamp(self):
+        return int(self.timestamp[(self.count - 1) % self.capacity]) if self.count else None
+
+    def append(self, timestamp, open_, high, low, close, volume):
+        i = self.count % self.capacity
+        self.timestamp[i] = timestamp
+        self.values[i] = (open_, high, low, close, volume)
+        self.count += 1
+
+    def latest(self, n=None):
+        """Last `n` bars (default: all held), oldest first, as a dict of arrays."""
+        n = len(self) if n is None else min(n, len(self))
+        rows = np.arange(self.count - n, self.count) % self.capacity
+        bars = {"timestamp": self.timestamp[rows]}
+        values = self.values[rows]
+        for j, name in enumerate(BAR_FIELDS):
+            bars[name] = values[:, j]
+        return bars
+
+    def closes(self, n=None):
+        return self.latest(n)["close"]
+
+
+# -----------------------------
+# STREAM HUB
+# -----------------------------
+
+class MarketStream:
+    """
+    Where market-data sources push bars and strategies consume them.
+
+    publish() (called by a source) drops duplicate / out-of-order bars,
+    flags gaps, appends the bar to its symbol's ring buffer and queues it.
+    The queue is bounded: with overflow="block" a slow consumer makes the
+    source wait (backpressure); with "drop_oldest" the oldest queued bar is
+    discarded instead, so decisions stay current (the ring buffers still
+    have every bar). run() feeds queued bars to a handler and records the
+    publish-to-handled latency of each.
+
+    A gap is a missing bar: within one session (an exchange-local trading
+    date) two consecutive intraday bars more than gap_tolerance intervals
+    apart; across sessions, whole trading days skipped (weekends and NYSE
+    holidays are not gaps). Daily bars are dated by their UTC date. Gaps
+    are counted and kept in `self.gaps`, and logged at debug level.
+    """
+
+    def __init__(self, symbols, timeframe="1Min", capacity=1024, queue_size=1000,
+                 overflow="block", gap_tolerance=1.5, latency_history=10000):
+        if overflow not in ("block", "drop_oldest"):
+            raise ValueError(f"unknown overflow policy {overflow!r} (use 'block' or 'drop_oldest')")
+        self.symbols = [s.upper() for s in symbols]
+        self.interval_ns = int(TIMEFRAME_SECONDS.get(timeframe, 60) * 1e9)
+        self.daily = self.interval_ns >= 86400 * 10**9
+        self.capacity = capacity
+        self.buffers = {symbol: RingBuffer(capacity) for symbol in self.symbols}
+        self.quotes = {}               # symbol -> (timestamp ns, bid, ask), latest only
+        self.queue = asyncio.Queue(queue_size)
+        self.overflow = overflow
+        self.gap_tolerance = gap_tolerance
+        self.gaps = deque(maxlen=1000)  # (symbol, last ts, new ts)
+        self._holiday_years = {}        # year -> market_holidays([year])
+        self.latencies = deque(maxlen=latency_history)
+        self.counts = {"received": 0, "queued": 0, "dropped": 0, "duplicates": 0, "gaps": 0, "handled": 0}
+
+    def buffer(self, symbol):
+        symbol = symbol.upper()
+        if symbol not in self.buffers:
+            self.buffers[symbol] = RingBuffer(self.capacity)
+        return self.buffers[symbol]
+
+    def _holidays(self, first, last):
+        for year in range(first.year, last.year + 1):
+            if year not in self._holiday_years:
+                self._holiday_years[year] = market_holidays([year])
+        return np.concatenate([self._holiday_years[y] for y in range(first.year, last.year + 1)])
+
+    def _session(self, ts):
+        """Trading date of a bar (ns since epoch, UTC)."""
+        tz = timezone.utc if self.daily else MARKET_TZ
+        return datetime.fromtimestamp(ts / 1e9, tz).date()
+
+    def _is_gap(self, last, ts):
+        last_session, session = self._session(last), self._session(ts)
+        if last_session == session:
+            return ts - last > self.gap_tolerance * self.interval_ns
+        return np.busday_count(last_session, session, holidays=self._holidays(last_session, session)) > 1
+
+    async def publish(self, bar):
+        """Accept one bar from a source (anything with symbol/timestamp/OHLCV)."""
+        received = time.perf_counter()
+        self.counts["received"] += 1
+        symbol = bar.symbol.upper()
+        ts = pd.Timestamp(bar.timestamp).value
+        buffer = self.buffer(symbol)
+
+        last = buffer.last_timestamp
+        if last is not None:
+            if ts <= last:
+                self.counts["duplicates"] += 1
+                return
+            if self._is_gap(last, ts):
+                self.counts["gaps"] += 1
+                self.gaps.append((symbol, last, ts))
+                logger.debug("Gap in %s bars: %s -> %s (ns)", symbol, last, ts)
+        buffer.append(ts, bar.open, bar.high, bar.low, bar.close, bar.volume)
+
+        if self.overflow == "drop_oldest" and self.queue.full():
+            self.queue.get_nowait()
+            self.counts["dropped"] += 1
+        await self.queue.put((bar, received))
+        self.counts["queued"] += 1
+
+    def publish_quote(self, quote):
+        self.quotes[quote.symbol.upper()] = (pd.Timestamp(quote.timestamp).value, quote.bid_price, quote.ask_price)
+
+    async def _produce(self, source):
+        try:
+            await source.run(self)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.error = e
+        await self.queue.put(None)  # end of stream
+
+    async def run(self, source, on_bar, max_bars=None):
+        """
+        Run `source` and call on_bar(bar) (sync or async) for every queued
+        bar until the source ends or `max_bars` were handled.
+        """
+        self.error = None
+        producer = asyncio.create_task(self._produce(source))
+        try:
+            while max_bars is None or self.counts["handled"] < max_bars:
+                item = await self.queue.get()
+                if item is None:
+                    break
+                bar, received = item
+                result = on_bar(bar)
+                if inspect.isawaitable(result):
+                    await result
+                self.latencies.append(time.perf_counter() - received)
+                self.counts["handled"] += 1
+        finally:
+            source.stop()
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+        if self.error is not None:
+            raise self.error
+
+    def stats(self):
+        stats = dict(self.counts)
+        if self.latencies:
+            latencies = np.array(self.latencies)
+            stats["p50_ms"] = float(np.percentile(latencies, 50) * 1000)
+            stats["p99_ms"] = float(np.percentile(latencies, 99) * 1000)
+        return stats
+
+
+# -----------------------------
+# SOURCES
+# -----------------------------
+# A source has `async run(stream)`, which publishes bars until it is done
+# or stopped, and `stop()`.
+
+class AlpacaBarSource:
+    """
+    Live minute bars (and optionally quotes) from alpaca-py's
+    StockDataStream. The websocket client runs its own event loop in a
+    worker thread; each bar is handed to the stream's loop and the
+    websocket reader waits until it is queued, so backpressure reaches
+    the socket.
+    """
+
+    def __init__(self, symbols, feed="iex", quotes=False):
+        self.symbols = [s.upper() for s in symbols]
+        self.feed = feed
+        self.quotes = quotes
+        self.client = None
+
+    async def run(self, stream):
+        from alpaca.data.enums import DataFeed
+        from alpaca.data.live import StockDataStream
+
+        loop = asyncio.get_running_loop()
+        self.client = StockDataStream(API_KEY, API_SECRET, feed=DataFeed(self.feed))
+
+        async def on_bar(bar):
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(stream.publish(bar), loop))
+
+        async def on_quote(quote):
+            loop.call_soon_threadsafe(stream.publish_quote, quote)
+
+        self.client.subscribe_bars(on_bar, *self.symbols)
+        if self.quotes:
+            self.client.subscribe_quotes(on_quote, *self.symbols)
+        await asyncio.to_thread(self.client.run)
+
+    def stop(self):
+        if self.client is not None:
+            try:
+                self.client.stop()
+            except Exception as e:
+                print(f"⚠ Error stopping data stream: {e}")
+
+
+class ReplaySource:
+    """
+    Offline stand-in for AlpacaBarSource: replays stored bars of several
+    symbols in timestamp order through the same publish path. speed=None
+    replays as fast as the consumer keeps up; speed=60 plays one minute of
+    market time per second.
+    """
+
+    def __init__(self, symbols, store=None, timeframe=DEFAULT_TIMEFRAME, start=None, end=None,
+                 speed=None, data_dir="data"):
+        self.symbols = [s.upper() for s in symbols]
+        self.store = store
+        self.timeframe = timeframe
+        self.start = start
+        self.end = end
+        self.speed = speed
+        self.data_dir = data_dir
+        self.stopped = False
+
+    def load(self):
+        """All bars merged by (timestamp, symbol order), as parallel arrays."""
+        parts = []
+        for i, symbol in enumerate(self.symbols):
+            self.store = ensure_bars(symbol, self.timeframe, self.store, self.data_dir)
+            bars = self.store.read(symbol, self.timeframe, self.start, self.end)
+            n = len(bars["timestamp"])
+            columns = [bars.get(name, bars["close"] if name != "volume" else np.zeros(n)) for name in BAR_FIELDS]
+            parts.append((np.full(n, i, dtype=np.int32), bars["timestamp"], np.column_stack(columns)))
+
+        symbol_idx = np.concatenate([p[0] for p in parts])
+        timestamps = np.concatenate([p[1] for p in parts])
+        values = np.concatenate([p[2] for p in parts])
+        order = np.lexsort((symbol_idx, timestamps))
+        return symbol_idx[order], timestamps[order], values[order]
+
+    async def run(self, stream):
+        symbol_idx, timestamps, values = self.load()
+        started, first = time.perf_counter(), timestamps[0] if len(timestamps) else 0
+        for s, ts, row in zip(symbol_idx.tolist(), timestamps.tolist(), values.tolist()):
+            if self.stopped:
+                break
+            if self.speed:
+                delay = (ts - first) / 1e9 / self.speed - (time.perf_counter() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            bar = SimpleNamespace(symbol=self.symbols[s], timestamp=pd.Timestamp(ts, tz="UTC"),
+                                  open=row[0], high=row[1], low=row[2], close=row[3], volume=row[4])
+            await stream.publish(bar)
+            await asyncio.sleep(0)  # let the consumer take it now (latency over batching)
+
+    def stop(self):
+        self.stopped = True
+
+
+# -----------------------------
+# BENCHMARK
+# -----------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay stored bars through the stream and time it.")
+    parser.add_argument("--symbols", nargs="+", default=["AAPL"])
+    parser.add_argument("--timeframe", default=DEFAULT_TIMEFRAME)
+    parser.add_argument("--speed", type=float, default=None, help="market seconds per wall second")
+    parser.add_argument("--queue-size", type=int, default=1000)
+    parser.add_argument("--overflow", choices=["block", "drop_oldest"], default="block")
+    args = parser.parse_args(argv)
+
+    stream = MarketStream(args.symbols, args.timeframe, queue_size=args.queue_size, overflow=args.overflow)
+    source = ReplaySource(args.symbols, timeframe=args.timeframe, speed=args.speed)
+
+    started = time.perf_counter()
+    asyncio.run(stream.run(source, lambda bar: None))
+    elapsed = time.perf_counter() - started
+    stats = stream.stats()
+    print(f"✅ {stats['handled']} bars in {elapsed:.2f}s ({stats['handled'] / elapsed:,.0f} bars/s)")
+    print(stats)
+    return stats
+
+
+if __name__ == "__main__":
+    main()
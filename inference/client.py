@@ -0,0 +1,62 @@
+# inference/client.py
+import http.client
+import json
+import os
+import threading
+from urllib.parse import urlparse
+
+DEFAULT_URL = os.getenv("INFERENCE_URL", "http://127.0.0.1:8765")
+
+
+class InferenceClient:
+    """
+    Client for inference/server.py. One keep-alive connection per thread,
+    so repeated calls skip the TCP handshake.
+    """
+
+    def __init__(self, url=DEFAULT_URL, timeout=5):
+        parsed = urlparse(url)
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _request(self, method, path, payload=None):
+        body = None if payload is None else json.dumps(payload)
+        headers = {"Content-Type": "application/json"} if body else {}
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = json.loads(response.read() or b"{}")
+                break
+            except (ConnectionError, http.client.HTTPException):
+                # Stale keep-alive connection: reconnect once
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+        if response.status != 200:
+            raise RuntimeError(data.get("error", f"HTTP {response.status}"))
+        return data
+
+    def predict(self, symbols):
+        """Signals for a whole watchlist in one round-trip: {symbol: signal}."""
+        return self._request("POST", "/predict", {"symbols": list(symbols)})["signals"]
+
+    def stats(self):
+        return self._request("GET", "/stats")
+
+    def healthy(self):
+        try:
+            return self._request("GET", "/health").get("status") == "ok"
+        except Exception:
+            return False
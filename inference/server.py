@@ -0,0 +1,363 @@
+# inference/server.py
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+# Add project root to Python path
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+from data.bar_store import load_features
+from training.model_registry import ModelRegistry
+from training.observations import ObservationBuilder
+
+# PPO is optional (stable-baselines3 / torch are heavy)
+try:
+    from stable_baselines3 import PPO
+    USE_RL = True
+except ImportError:
+    print("⚠ stable-baselines3 not installed. Serving ML signals only.")
+    USE_RL = False
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+RL_MODELS_DIR = os.path.join(ROOT_DIR, "training", "models", "rl")
+RL_ACTIONS = ["HOLD", "BUY", "SELL"]
+
+
+# -----------------------------
+# MODELS
+# -----------------------------
+
+class SignalModels:
+    """
+    Every model kept loaded, predicting for many symbols per call.
+
+    ML models come from the registry (latest versions); each one runs one
+    predict() over the stacked feature rows of all requested symbols. PPO
+    agents are loaded per symbol from training/models/rl/ppo_<symbol>_final.zip
+    with the ObservationBuilder config saved beside them, and likewise get
+    all their observations in one predict(). The server has no account
+    state, so agents trained with state see a flat position (no shares,
+    initial cash).
+    """
+
+    def __init__(self, registry=None, rl_dir=RL_MODELS_DIR, feature_loader=load_features,
+                 feature_ttl=60, clock=time.monotonic, feature_history=256):
+        self.ml_models = (registry or ModelRegistry()).load_latest()
+        self.rl_dir = rl_dir
+        self.feature_loader = feature_loader
+        self.feature_ttl = feature_ttl
+        self.feature_history = feature_history
+        self.clock = clock
+        self._rows = {}     # symbol -> (loaded_at, last feature_history rows)
+        self._rl_models = {}
+
+    def feature_rows(self, symbol):
+        """Latest feature rows for a symbol, cached for feature_ttl seconds."""
+        now = self.clock()
+        cached = self._rows.get(symbol)
+        if cached is None or now - cached[0] >= self.feature_ttl:
+            cached = (now, self.feature_loader(symbol).iloc[-self.feature_history:])
+            self._rows[symbol] = cached
+        return cached[1]
+
+    def rl_agent(self, symbol):
+        """(PPO model, ObservationBuilder) for a symbol, or None."""
+        if not USE_RL:
+            return None
+        if symbol not in self._rl_models:
+            path = os.path.join(self.rl_dir, f"ppo_{symbol.lower()}_final.zip")
+            agent = None
+            try:
+                if os.path.exists(path):
+                    agent = self._checked_agent(PPO.load(path), ObservationBuilder.load(path))
+            except Exception as e:
+                print(f"⚠ Could not load RL agent for {symbol}: {e}")
+            self._rl_models[symbol] = agent
+        return self._rl_models[symbol]
+
+    def _checked_agent(self, model, builder):
+        """Reject agents whose observations the saved builder cannot reproduce."""
+        expected = tuple(model.observation_space.shape)
+        if expected != builder.shape:
+            raise ValueError(f"agent expects observations of shape {expected}, its observation "
+                             f"config {builder.to_config()} gives {builder.shape}")
+        if builder.lookback > self.feature_history:
+            raise ValueError(f"lookback {builder.lookback} exceeds feature_history {self.feature_history}")
+        return model, builder
+
+    def _ml_predictions(self, frame):
+        """
+        Per-row {model: prediction} for the stacked frame. If the batched
+        call fails, rows are retried one by one so a bad row (e.g. NaN
+        features) only fails its own symbol; such rows get the exception.
+        """
+        try:
+            ml = {name: model.predict(frame) for name, model in self.ml_models.items()}
+            return [{name: float(values[i]) for name, values in ml.items()} for i in range(len(frame))]
+        except Exception:
+            pass
+        preds = []
+        for i in range(len(frame)):
+            row = frame.iloc[i:i + 1]
+            try:
+                preds.append({name: float(model.predict(row)[0]) for name, model in self.ml_models.items()})
+            except Exception as e:
+                preds.append(e)
+        return preds
+
+    def predict(self, symbols):
+        """
+        {symbol: {"ml": {model: predicted return}, "ml_signal", "rl"}}; a
+        symbol that fails gets {"error"} without failing the others, and
+        one whose agent could not act also gets "rl_error".
+        """
+        results, known, histories = {}, [], []
+        for symbol in symbols:
+            try:
+                histories.append(self.feature_rows(symbol))
+                known.append(symbol)
+            except FileNotFoundError:
+                results[symbol] = {"error": f"no features for {symbol}"}
+            except Exception as e:
+                results[symbol] = {"error": f"features for {symbol}: {e}"}
+        if not known:
+            return results
+
+        frame = pd.concat([history.iloc[-1:] for history in histories], ignore_index=True)
+        ml = self._ml_predictions(frame)
+
+        # One PPO predict per distinct agent over its symbols' observations,
+        # each built the way the agent was trained (features, lookback, state)
+        rl, rl_errors = {}, {}
+        by_model = {}
+        for i, symbol in enumerate(known):
+            agent = self.rl_agent(symbol)
+            if agent is None:
+                continue
+            model, builder = agent
+            try:
+                windows = builder.windows(builder.padded(histories[i]))
+                obs = builder.observe(windows, len(windows) - 1).copy()
+            except Exception as e:
+                rl_errors[symbol] = f"observation for {symbol}: {e}"
+                continue
+            by_model.setdefault(id(model), (model, [], []))
+            by_model[id(model)][1].append(i)
+            by_model[id(model)][2].append(obs)
+        for model, indices, observations in by_model.values():
+            try:
+                actions, _ = model.predict(np.stack(observations), deterministic=True)
+            except Exception as e:
+                for i in indices:
+                    rl_errors[known[i]] = f"RL predict for {known[i]}: {e}"
+                continue
+            for i, action in zip(indices, np.atleast_1d(actions)):
+                rl[known[i]] = RL_ACTIONS[int(action)]
+
+        for i, symbol in enumerate(known):
+            preds = ml[i]
+            if isinstance(preds, Exception):
+                results[symbol] = {"error": f"prediction for {symbol}: {preds}"}
+                continue
+            mean = float(np.mean(list(preds.values()))) if preds else 0.0
+            results[symbol] = {
+                "ml": preds,
+                "ml_signal": "BUY" if mean > 0 else "SELL" if mean < 0 else "HOLD",
+                "rl": rl.get(symbol),
+            }
+            if symbol in rl_errors:
+                results[symbol]["rl_error"] = rl_errors[symbol]
+        return results
+
+
+# -----------------------------
+# MICRO-BATCHING
+# -----------------------------
+
+class _Request:
+    __slots__ = ("symbols", "submitted", "done", "result", "error")
+
+    def __init__(self, symbols):
+        self.symbols = symbols
+        self.submitted = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    Collects concurrent requests into batches for one predict call.
+
+    A single worker thread takes the first waiting request, then keeps
+    draining the queue for up to `max_wait` seconds or `max_batch` symbols.
+    Every request in the batch gets its own slice of the shared result.
+    """
+
+    def __init__(self, predict, max_batch=256, max_wait=0.002, latency_history=10000):
+        self.predict = predict
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.latencies = deque(maxlen=latency_history)
+        self.batch_sizes = deque(maxlen=latency_history)
+        self.requests = 0
+        self.batches = 0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._worker, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, symbols, timeout=10):
+        """Block until the batch holding `symbols` is predicted; returns {symbol: signal}."""
+        request = _Request([s.upper() for s in symbols])
+        self._queue.put(request)
+        if not request.done.wait(timeout):
+            raise TimeoutError("inference request timed out")
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        size = len(batch[0].symbols)
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request.symbols)
+        return batch
+
+    def _worker(self):
+        while True:
+            batch = self._collect()
+            symbols = list(dict.fromkeys(s for r in batch for s in r.symbols))
+            try:
+                predictions = self.predict(symbols)
+                error = None
+            except Exception as e:
+                predictions, error = {}, e
+
+            finished = time.perf_counter()
+            with self._lock:
+                self.batches += 1
+                self.batch_sizes.append(len(symbols))
+                for request in batch:
+                    self.requests += 1
+                    self.latencies.append(finished - request.submitted)
+            for request in batch:
+                request.error = error
+                request.result = {s: predictions.get(s) for s in request.symbols}
+                request.done.set()
+
+    def stats(self):
+        with self._lock:
+            latencies = np.array(self.latencies) * 1000
+            sizes = np.array(self.batch_sizes)
+            requests, batches = self.requests, self.batches
+        if not len(latencies):
+            return {"requests": 0, "batches": 0}
+        return {
+            "requests": requests,
+            "batches": batches,
+            "mean_batch": float(sizes.mean()),
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p99_ms": float(np.percentile(latencies, 99)),
+            "max_ms": float(latencies.max()),
+        }
+
+
+# -----------------------------
+# HTTP
+# -----------------------------
+
+def _make_handler(batcher):
+    class InferenceHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so clients reuse connections
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, {"status": "ok"})
+            elif self.path == "/stats":
+                self._send(200, batcher.stats())
+            else:
+                self._send(404, {"error": f"unknown path {self.path}"})
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self._send(404, {"error": f"unknown path {self.path}"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                symbols = json.loads(self.rfile.read(length) or b"{}").get("symbols") or []
+                self._send(200, {"signals": batcher.submit(symbols)})
+            except Exception as e:
+                self._send(500, {"error": str(e)})
+
+        def log_message(self, format, *args):
+            pass  # one line per request would dominate latency
+
+    return InferenceHandler
+
+
+def serve(models=None, host=DEFAULT_HOST, port=DEFAULT_PORT, max_batch=256, max_wait=0.002):
+    """Start the server in a background thread; returns (server, batcher)."""
+    models = models or SignalModels()
+    batcher = MicroBatcher(models.predict, max_batch=max_batch, max_wait=max_wait)
+    server = ThreadingHTTPServer((host, port), _make_handler(batcher))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="inference-http", daemon=True).start()
+    return server, batcher
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batched ML / RL signal server.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-batch", type=int, default=256, help="max symbols per predict call")
+    parser.add_argument("--max-wait-ms", type=float, default=2.0,
+                        help="how long to wait for more requests to batch")
+    parser.add_argument("--stats-every", type=float, default=60, help="seconds between latency reports")
+    args = parser.parse_args(argv)
+
+    models = SignalModels()
+    print(f"✅ Loaded ML models: {', '.join(models.ml_models) or 'none'}")
+    server, batcher = serve(models, args.host, args.port, args.max_batch, args.max_wait_ms / 1000)
+    print(f"🚀 Inference server on http://{args.host}:{server.server_address[1]}")
+
+    try:
+        while True:
+            time.sleep(args.stats_every)
+            print(f"📊 {batcher.stats()}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        print(f"Final stats: {batcher.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,257 @@
 # main.py
+import argparse
+import asyncio
+import os
+import signal
 import time
-from data.market_data import get_latest_price
-from strategies.basic_strategy import simple_moving_average_decision
-from trading.execute import place_order
-
-symbol = "AAPL"
-moving_average = 150  # hardcoded for now
-while True:
-    current_price = get_latest_price(symbol)
-    if current_price is None:
-        print("Skipping this cycle due to missing price.")
-        time.sleep(60)
-        continue
-
-    print(f"Current price of {symbol}: {current_price}")
-    decision = simple_moving_average_decision(current_price, moving_average)
-    print(f"Decision: {decision}")
-
-    if decision == "BUY":
-        place_order(symbol, qty=1, side="buy")
-    elif decision == "SELL":
-        place_order(symbol, qty=1, side="sell")
-
-    time.sleep(60)
\ No newline at end of file
+
+import numpy as np
+import pandas as pd
+
+from data.bar_store import load_bars
+from data.market_data import get_cached_price, get_cached_prices, price_cache
+from data.stream import AlpacaBarSource, MarketStream, ReplaySource, market_holidays
+from strategies.basic_strategy import SmaStrategy
+from trading.execute import make_client_order_id, place_order
+from trading.journal import JOURNAL_PATH, TradeJournal
+from trading.positions import PositionBook
+from trading.scheduler import TradingScheduler
+
+WATCHLIST = os.getenv("WATCHLIST", "AAPL").split(",")
+MA_FEATURE = "ma_20"  # moving average the live price is compared against
+MARKET_TZ = "America/New_York"  # daily bars are exchange trading days
+
+
+def trading_day():
+    """
+    Today's exchange date (naive midnight, like the daily bars'
+    timestamps), or None on weekends and holidays, when no bar is open.
+    """
+    today = pd.Timestamp.now(tz=MARKET_TZ).normalize().tz_localize(None)
+    return today if np.is_busday(today.date(), holidays=market_holidays([today.year])) else None
+
+
+def warmup_closes(symbol, before=None):
+    """Stored closes to warm a symbol's indicators with; only bars before `before`."""
+    bars = load_bars(symbol)
+    if before is not None:
+        bars = bars[bars["timestamp"] < pd.Timestamp(before).tz_localize(None)]
+    return bars["close"].to_numpy()
+
+
+# Per-symbol incremental indicator state, warmed up from the bar store once
+# (the event backtester runs the same strategy object over stored bars).
+# Today's bar is still open, so it comes from live prices, not the store.
+strategy = SmaStrategy(MA_FEATURE, history=lambda symbol: warmup_closes(symbol, before=trading_day()))
+
+# Optional inference server client (--inference-url) for ML / RL signals.
+# They are advisory: logged beside each decision, which stays the SMA rule
+# the backtests replay.
+inference = None
+model_signals = {}  # symbol -> latest signal from the server
+
+# Latest price seen per symbol, journaled as its orders' reference price
+last_prices = {}
+
+# Trade journal: orders as submitted, fills as the broker reports them
+journal = None
+
+# Live positions and P/L, fed by the journal's fills and marked on every price
+positions = PositionBook()
+
+
+def on_price(symbol, price):
+    print(f"Current price of {symbol}: {price}")
+    last_prices[symbol] = price
+    positions.mark(symbol, price)
+
+
+def fetch_model_signals(symbols):
+    """One inference request for a cycle's symbols (the server batches the models)."""
+    if inference is None:
+        return
+    try:
+        model_signals.update(inference.predict(symbols))
+    except Exception as e:
+        print(f"⚠ Inference server unavailable: {e}")
+
+
+def log_model_signals(symbol):
+    signal = model_signals.get(symbol)
+    if signal:
+        print(f"Model signals for {symbol}: ML {signal.get('ml_signal')}, RL {signal.get('rl')}")
+
+
+def decide(symbol, price):
+    on_price(symbol, price)
+    # Features as if the live price closed today's bar (same as the backtest);
+    # the first price of a new trading day commits the previous day's bar
+    decision, moving_average = strategy.evaluate(symbol, price, session=trading_day())
+    print(f"Decision for {symbol}: {decision} ({MA_FEATURE}={moving_average})")
+    log_model_signals(symbol)
+    return decision
+
+
+def execute(symbol, qty, side, tag=None):
+    """
+    Place an order for a decision. `tag` names the decision (bar or polling
+    slot): re-placing the same decision reuses its client order id, so the
+    broker returns the existing order instead of filling it twice.
+    """
+    client_order_id = None if tag is None else make_client_order_id(symbol, side, qty, tag)
+    order = place_order(symbol, qty, side, client_order_id=client_order_id, price=last_prices.get(symbol))
+    positions.sync(journal)  # an order that filled on submit is in the journal already
+    return order
+
+
+def parse_intervals(values):
+    """Parse SYMBOL=SECONDS overrides into a dict."""
+    intervals = {}
+    for value in values or []:
+        symbol, _, seconds = value.partition("=")
+        intervals[symbol.upper()] = float(seconds)
+    return intervals
+
+
+def setup(args):
+    global inference, journal
+    if args.inference_url:
+        from inference.client import InferenceClient
+        inference = InferenceClient(args.inference_url)
+
+    # Every order placed from here on is appended to the trade journal; the
+    # position book follows the journal's fills (warmed up from its history)
+    journal = TradeJournal(args.journal)
+    journal.attach(source="main")
+    positions.sync(journal)
+
+
+async def track_fills(interval):
+    """Journal what open orders filled since the last poll and apply it to the book."""
+    while True:
+        await asyncio.sleep(interval)
+        await asyncio.to_thread(journal.sync_orders)
+        positions.sync(journal)
+
+
+def report():
+    print(positions.snapshot(open_only=True).to_string(index=False))
+    print(f"P/L: {positions.totals()}")
+
+
+async def run_stream(args):
+    """Event-driven loop: decide on every streamed bar instead of polling."""
+    setup(args)
+    symbols = [s.strip().upper() for s in args.symbols if s.strip()]
+    if args.stream == "replay":
+        source = ReplaySource(symbols, start=args.replay_start, speed=args.replay_speed)
+        stream = MarketStream(symbols, timeframe=source.timeframe, queue_size=args.queue_size)  # block: every bar
+        # Warm up only on bars before the replay (no look-ahead); cold without a start
+        history = (lambda symbol: warmup_closes(symbol, before=args.replay_start)) if args.replay_start else None
+    else:
+        source = AlpacaBarSource(symbols)
+        stream = MarketStream(symbols, timeframe="1Min", queue_size=args.queue_size,
+                              overflow="drop_oldest")  # stay current when behind
+        history = None  # minute bars: the average builds up from the stream (HOLD until then)
+    # Every streamed bar is complete, so it is committed before deciding
+    bar_strategy = SmaStrategy(MA_FEATURE, history=history)
+
+    signals_for = [None]  # bar timestamp the model signals were last requested for
+    requests = set()      # in-flight signal requests (the loop only keeps weak references)
+
+    async def on_bar(bar):
+        if inference and bar.timestamp != signals_for[0]:
+            # One request per bar interval for the whole watchlist, off the loop
+            signals_for[0] = bar.timestamp
+            request = asyncio.create_task(asyncio.to_thread(fetch_model_signals, symbols))
+            requests.add(request)
+            request.add_done_callback(requests.discard)
+        on_price(bar.symbol, bar.close)
+        decision = bar_strategy.on_bar(bar.symbol, bar.close)
+        print(f"Decision for {bar.symbol}: {decision}")
+        log_model_signals(bar.symbol)
+        if decision in ("BUY", "SELL"):
+            await asyncio.to_thread(execute, bar.symbol, args.qty, decision.lower(),
+                                    f"bar-{bar.timestamp.isoformat()}")
+
+    task = asyncio.create_task(stream.run(source, on_bar, max_bars=args.max_cycles))
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, task.cancel)
+        except NotImplementedError:  # e.g. Windows event loops
+            pass
+    fills = asyncio.create_task(track_fills(args.fill_poll))
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    finally:
+        fills.cancel()
+    print(f"Stream: {stream.stats()}")
+    report()
+
+
+async def run(args):
+    setup(args)
+    intervals = parse_intervals(args.symbol_interval)
+
+    def execute_in_slot(symbol, qty, side):
+        # A symbol is processed at most once per interval, so the interval
+        # slot identifies the decision
+        slot = int(time.time() // intervals.get(symbol, args.interval))
+        return execute(symbol, qty, side, tag=f"poll-{slot}")
+
+    scheduler = TradingScheduler(
+        watchlist=[s.strip().upper() for s in args.symbols if s.strip()],
+        fetch_price=get_cached_price,
+        fetch_prices=get_cached_prices,
+        decide=decide,
+        before_cycle=fetch_model_signals,
+        place_order=execute_in_slot,
+        interval=args.interval,
+        intervals=intervals,
+        max_in_flight=args.max_in_flight,
+        qty=args.qty
+    )
+
+    # Clean shutdown on Ctrl+C / SIGTERM: finish the cycle in flight, then exit
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, scheduler.stop)
+        except NotImplementedError:  # e.g. Windows event loops
+            pass
+
+    fills = asyncio.create_task(track_fills(args.fill_poll))
+    try:
+        await scheduler.run(max_cycles=args.max_cycles)
+    finally:
+        fills.cancel()
+    print(f"Price cache: {price_cache.stats()}")
+    report()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Live trading loop over a watchlist.")
+    parser.add_argument("--symbols", nargs="+", default=WATCHLIST)
+    parser.add_argument("--interval", type=float, default=60, help="seconds between cycles per symbol")
+    parser.add_argument("--symbol-interval", nargs="*", help="per-symbol overrides, e.g. AAPL=30")
+    parser.add_argument("--max-in-flight", type=int, default=10, help="max concurrent API requests")
+    parser.add_argument("--qty", type=int, default=1)
+    parser.add_argument("--max-cycles", type=int, default=None, help="with --stream: max bars handled")
+    parser.add_argument("--inference-url", default=os.getenv("INFERENCE_URL"),
+                        help="inference server for ML/RL signals, e.g. http://127.0.0.1:8765")
+    parser.add_argument("--journal", default=JOURNAL_PATH, help="SQLite trade journal path")
+    parser.add_argument("--fill-poll", type=float, default=5,
+                        help="seconds between broker polls for fills of open orders")
+    parser.add_argument("--stream", choices=["alpaca", "replay"],
+                        help="decide on streamed bars instead of polling (replay: stored bars, "
+                             "pair with TRADING_BROKER=sim)")
+    parser.add_argument("--replay-start", help="replay bars from this date (earlier bars warm up the indicators)")
+    parser.add_argument("--replay-speed", type=float, default=None,
+                        help="replay market seconds per wall second (default: as fast as possible)")
+    parser.add_argument("--queue-size", type=int, default=64,
+                        help="bars queued between stream and strategy (bounds decision latency)")
+    args = parser.parse_args()
+    asyncio.run(run_stream(args) if args.stream else run(args))
@@ -1,4 +1,42 @@
 # strategies/basic_strategy.py
+import numpy as np
+
+from data.indicators import IndicatorEngine
+
+# Compact signal codes used by the array API
+BUY = 1
+SELL = -1
+HOLD = 0
+
+SIGNAL_NAMES = {BUY: "BUY", SELL: "SELL", HOLD: "HOLD"}
+
+
+def sma_signals(prices, moving_averages):
+    """
+    Vectorized SMA rule over price and moving-average arrays.
+    Returns an int8 array of 1 (BUY), -1 (SELL) or 0 (HOLD).
+    NaN inputs compare False both ways, so they map to HOLD.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    moving_averages = np.asarray(moving_averages, dtype=np.float64)
+
+    signals = np.zeros(np.broadcast(prices, moving_averages).shape, dtype=np.int8)
+    signals[prices > moving_averages] = BUY
+    signals[prices < moving_averages] = SELL
+    return signals
+
+
+def sma_signal(price, moving_average):
+    """
+    Scalar form of sma_signals for one price (same codes, NaN -> HOLD),
+    with plain float compares: the per-tick path, no array setup.
+    """
+    if price > moving_average:
+        return BUY
+    if price < moving_average:
+        return SELL
+    return HOLD
+
 
 def simple_moving_average_decision(current_price, moving_average):
     """
@@ -11,15 +49,67 @@ def simple_moving_average_decision(current_price, moving_average):
         return "HOLD"
 
     try:
-        current_price = float(current_price)
-        moving_average = float(moving_average)
-    except ValueError:
+        signal = sma_signal(float(current_price), float(moving_average))
+    except (TypeError, ValueError):
         return "HOLD"
 
-    # Strategy logic
-    if current_price > moving_average:
-        return "BUY"
-    elif current_price < moving_average:
-        return "SELL"
-    else:
-        return "HOLD"
+    return SIGNAL_NAMES[signal]
+
+
+class SmaStrategy:
+    """
+    The live trading rule, per symbol: price vs. a moving average kept by an
+    incremental IndicatorEngine.
+
+    decide() is for live prices: the features are previewed as if the price
+    closed the current bar, without changing state. Given the price's
+    `session` (e.g. its trading date), a new session commits the previous
+    session's last price as that bar's close, so a long-running poller's
+    moving average keeps advancing. on_bar() is for completed bars (event
+    backtests, streams): the bar is committed, then decided on — the same
+    decision, without the preview copy.
+    `history(symbol)` returns past closes to warm an engine up; it may
+    raise FileNotFoundError, in which case the symbol starts cold.
+    Engines only track the one moving average the rule needs.
+    """
+
+    def __init__(self, feature="ma_20", history=None):
+        self.feature = feature
+        self.history = history
+        self.engine_kwargs = {"ma_windows": (int(feature.split("_")[1]),),
+                              "rsi_period": None, "vol_window": None}
+        self.engines = {}
+        self.live = {}  # symbol -> (session, last live price) of the open bar
+
+    def engine(self, symbol):
+        if symbol not in self.engines:
+            closes = ()
+            if self.history is not None:
+                try:
+                    closes = self.history(symbol)
+                except FileNotFoundError:
+                    print(f"⚠ No stored bars for {symbol}; it will HOLD until history is downloaded.")
+                    self.engines[symbol] = None
+                    return None
+            self.engines[symbol] = IndicatorEngine.from_history(closes, **self.engine_kwargs)
+        return self.engines[symbol]
+
+    def evaluate(self, symbol, price, session=None):
+        """(decision, moving average) for a live price."""
+        if session is not None:
+            last = self.live.get(symbol)
+            if last is not None and last[0] != session:
+                self.on_bar(symbol, last[1])  # the previous session's bar is complete
+            self.live[symbol] = (session, price)
+        engine = self.engine(symbol)
+        moving_average = engine.preview(price)[self.feature] if engine else None
+        return simple_moving_average_decision(price, moving_average), moving_average
+
+    def decide(self, symbol, price, session=None):
+        return self.evaluate(symbol, price, session)[0]
+
+    def on_bar(self, symbol, close):
+        engine = self.engine(symbol)
+        if engine is None:
+            engine = self.engines[symbol] = IndicatorEngine(**self.engine_kwargs)
+        return simple_moving_average_decision(close, engine.update(close)[self.feature])
@@ -0,0 +1,74 @@
+# tests/test_backtest_engine.py
+import numpy as np
+import pandas as pd
+
+from backtest.backtest_sma import backtest_sma
+from backtest.engine import run_backtest
+from strategies.basic_strategy import simple_moving_average_decision
+
+
+def _reference_backtest(df, window=20, initial_cash=10000):
+    """The original iterrows implementation, kept as the oracle."""
+    df = df.copy()
+    df['sma'] = df['close'].rolling(window).mean()
+    cash = initial_cash
+    position = 0
+    portfolio_values = []
+    for _, row in df.iterrows():
+        price = row['close']
+        decision = simple_moving_average_decision(price, row['sma'])
+        if decision == "BUY" and cash >= price:
+            qty = int(cash // price)
+            if qty > 0:
+                position += qty
+                cash -= qty * price
+        elif decision == "SELL" and position > 0:
+            cash += position * price
+            position = 0
+        portfolio_values.append(cash + position * price)
+    return np.array(portfolio_values)
+
+
+def _random_walk(n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({"close": close})
+
+
+def test_matches_reference_on_random_walk():
+    df = _random_walk()
+    for window in (3, 20, 50):
+        expected = _reference_backtest(df, window)
+        res = backtest_sma(df, window=window)
+        np.testing.assert_array_equal(res['portfolio'].to_numpy(), expected)
+
+
+def test_matches_reference_on_aapl():
+    df = pd.read_csv("data/AAPL_5y.csv")
+    expected = _reference_backtest(df, 20)
+    res = backtest_sma(df, window=20)
+    np.testing.assert_array_equal(res['portfolio'].to_numpy(), expected)
+
+
+def test_stats():
+    df = _random_walk(seed=3)
+    result = run_backtest(df['close'].to_numpy(), window=10)
+    stats = result['stats']
+    portfolio = result['portfolio']
+
+    peak = np.maximum.accumulate(portfolio)
+    assert np.isclose(stats['max_drawdown'], ((peak - portfolio) / peak).max())
+
+    returns = portfolio[1:] / portfolio[:-1] - 1
+    assert np.isclose(stats['sharpe'], returns.mean() / returns.std(ddof=1) * np.sqrt(252))
+
+    years = len(portfolio) / 252
+    assert np.isclose(stats['cagr'], (portfolio[-1] / 10000) ** (1 / years) - 1)
+    assert stats['trades'] > 0
+    assert stats['turnover'] > 0
+
+
+def test_nan_sma_holds():
+    result = run_backtest(np.array([10.0, 11.0, 12.0]), sma=np.full(3, np.nan))
+    assert (result['signal'] == 0).all()
+    assert (result['portfolio'] == 10000).all()
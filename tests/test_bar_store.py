@@ -0,0 +1,81 @@
+# tests/test_bar_store.py
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.bar_store import BarStore, import_csv, load_bars
+
+
+def _bars(start, periods):
+    ts = pd.date_range(start, periods=periods, freq="D")
+    close = np.arange(periods, dtype=float) + 100
+    return pd.DataFrame({
+        "timestamp": ts, "open": close, "high": close + 1,
+        "low": close - 1, "close": close, "volume": np.arange(periods) * 10,
+    })
+
+
+def test_write_read_roundtrip(tmp_path):
+    store = BarStore(str(tmp_path))
+    df = _bars("2024-01-01", 30)
+    assert store.write("aapl", df) == 30
+    assert store.symbols() == ["AAPL"]
+
+    frame = store.read_frame("AAPL")
+    pd.testing.assert_frame_equal(frame, df, check_dtype=False)
+    assert frame["volume"].dtype == df["volume"].dtype
+    assert frame["close"].dtype == np.float64
+
+
+def test_range_read_is_zero_copy_view(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.write("AAPL", _bars("2024-01-01", 30))
+
+    bars = store.read("AAPL", start="2024-01-05", end="2024-01-10")
+    assert len(bars["close"]) == 6
+    assert bars["close"][0] == 104
+    assert isinstance(bars["close"].base, np.memmap) or isinstance(bars["close"], np.memmap)
+    assert not bars["close"].flags.writeable
+
+
+def test_append_only_adds_newer_bars(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.write("AAPL", _bars("2024-01-01", 10))
+
+    # Overlaps the last 5 stored days
+    assert store.append("AAPL", _bars("2024-01-06", 10)) == 5
+    assert store.append("AAPL", _bars("2024-01-06", 10)) == 0
+    assert store.rows("AAPL") == 15
+    assert store.last_timestamp("AAPL") == pd.Timestamp("2024-01-15")
+
+    timestamps = store.read("AAPL")["timestamp"]
+    assert np.all(np.diff(timestamps) > 0)
+
+    with pytest.raises(ValueError):
+        store.append("AAPL", _bars("2024-02-01", 2).drop(columns=["volume"]))
+
+
+def test_append_recovers_from_interrupted_write(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.write("AAPL", _bars("2024-01-01", 5))
+    # Simulate a crash after bytes were written but before meta was updated
+    with open(os.path.join(str(tmp_path), "1Day", "AAPL", "close.bin"), "ab") as f:
+        f.write(np.zeros(3).tobytes())
+
+    store.append("AAPL", _bars("2024-01-06", 2))
+    assert store.read_frame("AAPL")["close"].tolist() == [100, 101, 102, 103, 104, 100, 101]
+
+
+def test_csv_import_and_fallback(tmp_path):
+    store = BarStore(str(tmp_path))
+    assert import_csv("data/AAPL_5y.csv", "AAPL", store=store) == 1254
+    csv = pd.read_csv("data/AAPL_5y.csv")
+    frame = load_bars("AAPL", store=store)
+    np.testing.assert_array_equal(frame["close"].to_numpy(), csv["close"].to_numpy())
+
+    other = BarStore(str(tmp_path / "fresh"))
+    assert len(load_bars("AAPL", start="2025-01-01", store=other)) > 0
+    with pytest.raises(FileNotFoundError):
+        load_bars("NOPE", store=other)
@@ -0,0 +1,41 @@
+# tests/test_basic_strategy.py
+import numpy as np
+
+from strategies.basic_strategy import SIGNAL_NAMES, SmaStrategy, sma_signal, sma_signals, simple_moving_average_decision
+
+
+def test_sma_signals_array():
+    prices = np.array([10.0, 9.0, 5.0, np.nan, 7.0])
+    mas = np.array([9.0, 10.0, 5.0, 5.0, np.nan])
+    signals = sma_signals(prices, mas)
+    assert signals.dtype == np.int8
+    assert signals.tolist() == [1, -1, 0, 0, 0]
+
+
+def test_scalar_wrapper():
+    assert simple_moving_average_decision(151, 150) == "BUY"
+    assert simple_moving_average_decision("149.5", 150) == "SELL"
+    assert simple_moving_average_decision(150, 150.0) == "HOLD"
+    assert simple_moving_average_decision(None, 150) == "HOLD"
+    assert simple_moving_average_decision(150, float("nan")) == "HOLD"
+    assert simple_moving_average_decision("n/a", 150) == "HOLD"
+
+
+def test_scalar_and_array_paths_agree():
+    rng = np.random.default_rng(0)
+    prices = rng.choice([9.0, 10.0, 11.0, np.nan], size=200)
+    mas = rng.choice([10.0, np.nan], size=200)
+    signals = sma_signals(prices, mas)
+    assert [sma_signal(p, m) for p, m in zip(prices.tolist(), mas.tolist())] == signals.tolist()
+    assert [simple_moving_average_decision(p, m) for p, m in zip(prices, mas)] == \
+        [SIGNAL_NAMES[s] for s in signals.tolist()]
+
+
+def test_live_sessions_commit_completed_bars():
+    strategy = SmaStrategy("ma_3", history=lambda symbol: [10.0, 10.0, 10.0])
+    assert strategy.evaluate("AAA", 13.0, session="2024-01-02") == ("BUY", 11.0)
+    # Same session: still a preview over the warm-up bars
+    assert strategy.evaluate("AAA", 16.0, session="2024-01-02") == ("BUY", 12.0)
+    # Next session: 16 closed the 2nd, so the average now spans 10, 16 and the new price
+    assert strategy.evaluate("AAA", 10.0, session="2024-01-03") == ("SELL", 12.0)
+    assert strategy.engine("AAA").prev_close == 16.0
@@ -0,0 +1,114 @@
+# tests/test_downloader.py
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data.bar_store import BarStore
+from data.downloader import refresh_universe
+
+
+class StubSource:
+    """Serves business-day bars from 2020-01-01 on and records every request."""
+
+    def __init__(self, fail=None, flaky=None):
+        self.calls = []
+        self.fail = set(fail or [])
+        self.flaky = dict(flaky or {})
+        self.lock = threading.Lock()
+
+    def __call__(self, symbol, start, end, timeframe):
+        with self.lock:
+            self.calls.append((symbol, pd.Timestamp(start), pd.Timestamp(end)))
+            if symbol in self.fail:
+                raise ConnectionError("boom")
+            if self.flaky.get(symbol, 0) > 0:
+                self.flaky[symbol] -= 1
+                raise ConnectionError("try again")
+
+        days = pd.bdate_range("2020-01-01", "2030-01-01")
+        days = days[(days >= pd.Timestamp(start)) & (days <= pd.Timestamp(end))]
+        close = np.arange(len(days), dtype=float) + 1
+        return pd.DataFrame({
+            "timestamp": days, "close": close, "high": close, "low": close,
+            "open": close, "volume": np.ones(len(days)),
+        })
+
+
+def test_only_missing_ranges_are_fetched(tmp_path):
+    store = BarStore(str(tmp_path))
+    source = StubSource()
+    no_sleep = lambda s: None
+
+    first = refresh_universe(["AAPL", "MSFT"], source, store, start="2024-01-01", end="2024-03-29", sleep=no_sleep)
+    assert first["failed"] == {}
+    assert first["updated"]["AAPL"] == store.rows("AAPL") == len(pd.bdate_range("2024-01-01", "2024-03-29"))
+
+    # Nothing new: no requests at all
+    source.calls.clear()
+    again = refresh_universe(["AAPL"], source, store, start="2024-01-01", end="2024-03-29", sleep=no_sleep)
+    assert again["updated"] == {"AAPL": 0}
+    assert source.calls == []
+
+    # One more week at the tail and one at the head
+    source.calls.clear()
+    refresh_universe(["AAPL"], source, store, start="2023-12-25", end="2024-04-05", sleep=no_sleep)
+    ranges = sorted((s, e) for _, s, e in source.calls)
+    assert ranges[0][0] == pd.Timestamp("2023-12-25") and ranges[0][1] < pd.Timestamp("2024-01-01")
+    assert ranges[1][0] > pd.Timestamp("2024-03-29") and ranges[1][1] == pd.Timestamp("2024-04-05")
+
+    timestamps = store.read_frame("AAPL")["timestamp"]
+    assert timestamps.iloc[0] == pd.Timestamp("2023-12-25")
+    assert timestamps.iloc[-1] == pd.Timestamp("2024-04-05")
+    assert timestamps.is_monotonic_increasing and timestamps.is_unique
+
+
+def test_retries_and_failed_symbols(tmp_path):
+    store = BarStore(str(tmp_path))
+    source = StubSource(fail=["BAD"], flaky={"FLAKY": 2})
+    delays = []
+
+    result = refresh_universe(["GOOD", "BAD", "FLAKY"], source, store, start="2024-01-01",
+                              end="2024-01-31", retries=2, backoff=0.5, sleep=delays.append)
+
+    assert set(result["updated"]) == {"GOOD", "FLAKY"}
+    assert set(result["failed"]) == {"BAD"}
+    assert sorted(delays) == [0.5, 0.5, 1.0, 1.0]
+    with open(os.path.join(str(tmp_path), "failed_symbols.json")) as f:
+        assert json.load(f)["failed"] == {"BAD": "boom"}
+
+
+def test_history_before_listing_is_not_refetched(tmp_path):
+    store = BarStore(str(tmp_path))
+    source = StubSource()
+    refresh_universe(["NEW"], source, store, start="2019-06-01", end="2020-02-28", sleep=lambda s: None)
+    assert store.read_frame("NEW")["timestamp"].iloc[0] == pd.Timestamp("2020-01-01")
+
+    source.calls.clear()
+    refresh_universe(["NEW"], source, store, start="2019-06-01", end="2020-02-28", sleep=lambda s: None)
+    assert source.calls == []
+
+
+def test_unfinished_daily_bar_is_not_stored(tmp_path):
+    store = BarStore(str(tmp_path))
+
+    def partial_source(symbol, start, end, timeframe):
+        # Like yfinance mid-session: today's bar comes back with the price so far
+        days = pd.bdate_range(start, "2024-03-27")
+        close = np.where(days == pd.Timestamp("2024-03-27"), 999.0, 100.0)
+        return pd.DataFrame({"timestamp": days, "close": close, "high": close, "low": close,
+                             "open": close, "volume": np.ones(len(days))})
+
+    during = pd.Timestamp("2024-03-27 12:00", tz="America/New_York")
+    refresh_universe(["AAPL"], partial_source, store, start="2024-03-01", end="2024-03-27", now=during)
+    assert store.read_frame("AAPL")["timestamp"].iloc[-1] == pd.Timestamp("2024-03-26")
+
+    # After the close the finished bar is fetched
+    source = StubSource()
+    after = pd.Timestamp("2024-03-27 16:30", tz="America/New_York")
+    refresh_universe(["AAPL"], source, store, start="2024-03-01", end="2024-03-27", now=after)
+    assert [c[1:] for c in source.calls] == [(pd.Timestamp("2024-03-26") + pd.Timedelta(1, "ns"),
+                                              pd.Timestamp("2024-03-27"))]
+    assert store.read_frame("AAPL")["timestamp"].iloc[-1] == pd.Timestamp("2024-03-27")
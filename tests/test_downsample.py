@@ -0,0 +1,54 @@
+# tests/test_downsample.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.downsample import downsample, lttb_indices, minmax_indices, visible_slice
+
+
+def _walk(n=100_000, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.arange(n, dtype=np.float64), 100 + np.cumsum(rng.normal(size=n))
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_bounded_sorted_and_keeps_ends(method):
+    x, y = _walk()
+    rows = downsample(x, y, 1000, method)
+    assert len(rows) <= 1002
+    assert rows[0] == 0 and rows[-1] == len(y) - 1
+    assert (np.diff(rows) > 0).all()
+
+
+def test_minmax_keeps_extremes():
+    x, y = _walk()
+    y[12345] = 1e6
+    rows = minmax_indices(y, 500)
+    assert 12345 in rows
+    assert y[rows].min() == y.min()
+
+
+def test_lttb_picks_the_spike_in_its_bucket():
+    y = np.zeros(1000)
+    y[500] = 10.0
+    rows = lttb_indices(np.arange(1000), y, 50)
+    assert len(rows) == 50
+    assert 500 in rows
+
+
+def test_short_series_untouched():
+    x, y = _walk(100)
+    np.testing.assert_array_equal(downsample(x, y, 2000), np.arange(100))
+
+
+def test_minmax_skips_nan():
+    y = np.array([np.nan, np.nan, 1.0, 5.0, 2.0, np.nan, 0.5, 3.0])
+    rows = minmax_indices(y, 4)
+    assert 3 in rows and 6 in rows
+
+
+def test_visible_slice():
+    timestamps = pd.date_range("2024-01-01", periods=100, freq="D").to_numpy()
+    window = visible_slice(timestamps, pd.Timestamp("2024-01-11"), "2024-01-21")
+    assert (window.start, window.stop) == (10, 21)
+    assert visible_slice(timestamps) == slice(0, 100)
@@ -0,0 +1,66 @@
+# tests/test_event_backtest.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.event_backtest import load_events, run_event_backtest
+from data.bar_store import BarStore
+from strategies.basic_strategy import SmaStrategy
+
+
+def _write(store, symbol, start, close):
+    store.write(symbol, pd.DataFrame({
+        "timestamp": pd.date_range(start, periods=len(close), freq="D"),
+        "open": close, "high": close, "low": close, "close": close, "volume": np.ones(len(close)),
+    }))
+
+
+@pytest.fixture
+def store(tmp_path):
+    rng = np.random.default_rng(3)
+    store = BarStore(str(tmp_path))
+    _write(store, "AAA", "2024-01-01", 100 + np.cumsum(rng.normal(size=120)))
+    _write(store, "BBB", "2024-01-15", 50 + np.cumsum(rng.normal(size=60)))
+    return store
+
+
+def test_events_are_time_ordered(store):
+    timestamps, symbol_idx, close = load_events(["AAA", "BBB"], store)
+    assert len(timestamps) == 180
+    assert (np.diff(timestamps) >= 0).all()
+    first_bbb = np.flatnonzero(symbol_idx == 1)[0]
+    assert timestamps[first_bbb] == pd.Timestamp("2024-01-15").value
+
+
+def test_replay_matches_live_decisions(store):
+    result = run_event_backtest(["AAA"], SmaStrategy("ma_5"), qty=1, initial_cash=1000, store=store)
+    closes = store.read("AAA", columns=["close"])["close"]
+
+    # Live path: a strategy warmed on the bars before t, previewing bar t's close
+    expected = []
+    for t in range(len(closes)):
+        live = SmaStrategy("ma_5", history=lambda symbol: closes[:t])
+        expected.append(live.decide("AAA", closes[t]))
+
+    fills = result["fills"]
+    stats = result["stats"]
+    assert stats["trades"] + stats["rejected"] == sum(d != "HOLD" for d in expected)
+
+    cash, shares = 1000.0, 0
+    for t, decision in enumerate(expected):
+        if decision == "BUY" and cash >= closes[t]:
+            cash -= closes[t]
+            shares += 1
+        elif decision == "SELL" and shares > 0:
+            cash += closes[t]
+            shares -= 1
+    assert stats["final_value"] == pytest.approx(cash + shares * closes[-1])
+    assert len(fills) == stats["trades"]
+    assert len(result["equity"]) == len(closes)
+
+
+def test_multi_symbol_equity_curve(store):
+    result = run_event_backtest(["AAA", "BBB"], qty=2, slippage_bps=10, store=store)
+    assert len(result["equity"]) == 120  # one point per distinct timestamp
+    assert set(result["fills"]["symbol"]) <= {"AAA", "BBB"}
+    assert result["stats"]["events"] == 180
@@ -0,0 +1,131 @@
+# tests/test_execution.py
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from trading.execute import make_client_order_id, place_order
+from trading.execution import OrderExecutor, TokenBucket
+
+
+class FakeBroker:
+    """Local stand-in for TradingClient: slow submits, unique client order ids."""
+
+    def __init__(self, latency=0.05, fail_first=()):
+        self.latency = latency
+        self.fail_first = set(fail_first)
+        self.orders = {}
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def submit_order(self, request):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.latency)
+            with self._lock:
+                if request.client_order_id in self.orders:
+                    raise Exception('{"code":40010001,"message":"client_order_id must be unique"}')
+                order = SimpleNamespace(id=f"order-{len(self.orders)}", symbol=request.symbol,
+                                        qty=request.qty, client_order_id=request.client_order_id)
+                self.orders[request.client_order_id] = order
+                if request.symbol in self.fail_first:
+                    # Accepted by the broker, but the response is lost
+                    self.fail_first.discard(request.symbol)
+                    raise ConnectionError("connection reset")
+            return order
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def get_order_by_client_id(self, client_order_id):
+        return self.orders[client_order_id]
+
+
+def _orders(n):
+    return [{"symbol": f"S{i:03d}", "qty": 1, "side": "buy"} for i in range(n)]
+
+
+def test_client_order_ids_are_deterministic():
+    assert make_client_order_id("aapl", "BUY", 5, "t1") == make_client_order_id("AAPL", "buy", 5, "t1")
+    assert make_client_order_id("AAPL", "buy", 5, "t1") != make_client_order_id("AAPL", "buy", 5, "t2")
+
+
+def test_identical_orders_in_a_batch_get_distinct_ids():
+    broker = FakeBroker(latency=0)
+    executor = OrderExecutor(broker, rate=1000, burst=1000, retries=0)
+    order = {"symbol": "AAPL", "qty": 1, "side": "buy"}
+    results = executor.rebalance([order, dict(order)], tag="t")
+
+    assert [r["status"] for r in results] == ["submitted"] * 2
+    assert len(broker.orders) == 2
+    with pytest.raises(ValueError, match="duplicate"):
+        executor.rebalance([dict(order, client_order_id="x"), dict(order, client_order_id="x")])
+
+
+def test_rebalance_inside_running_loop():
+    broker = FakeBroker(latency=0)
+    executor = OrderExecutor(broker, rate=1000, burst=1000)
+
+    async def notebook_cell():
+        return executor.rebalance(_orders(2), tag="t")
+
+    results = asyncio.run(notebook_cell())
+    assert [r["status"] for r in results] == ["submitted"] * 2
+
+
+def test_place_order_uses_given_client():
+    broker = FakeBroker(latency=0)
+    order = place_order("AAPL", 2, "buy", client=broker, client_order_id="abc")
+    assert order.client_order_id == "abc" and broker.orders["abc"].qty == 2
+    # Same id again returns the existing order instead of failing
+    assert place_order("AAPL", 2, "buy", client=broker, client_order_id="abc") is order
+
+
+def test_batch_is_concurrent_and_bounded():
+    broker = FakeBroker(latency=0.05)
+    executor = OrderExecutor(broker, max_in_flight=10, rate=1000, burst=1000)
+    started = time.perf_counter()
+    results = executor.rebalance(_orders(40), tag="rebalance-1")
+    elapsed = time.perf_counter() - started
+
+    assert all(r["status"] == "submitted" for r in results)
+    assert broker.max_in_flight <= 10
+    assert elapsed < 40 * 0.05 / 2  # far from serial
+    assert executor.stats()["orders"] == 40
+
+
+def test_retry_after_lost_response_does_not_duplicate():
+    broker = FakeBroker(latency=0, fail_first={"S001"})
+    executor = OrderExecutor(broker, rate=1000, burst=1000, backoff=0)
+    results = executor.rebalance(_orders(3), tag="t")
+
+    assert [r["status"] for r in results] == ["submitted"] * 3
+    assert results[1]["attempts"] == 2
+    assert len(broker.orders) == 3
+
+    # Re-running the same batch finds the existing orders
+    again = executor.rebalance(_orders(3), tag="t")
+    assert [r["order_id"] for r in again] == [r["order_id"] for r in results]
+    assert len(broker.orders) == 3
+
+
+def test_token_bucket_paces_requests():
+    now = [0.0]
+
+    async def fake_sleep(seconds):
+        now[0] += seconds
+
+    async def run():
+        bucket = TokenBucket(rate=10, capacity=2, clock=lambda: now[0], sleep=fake_sleep)
+        for _ in range(12):
+            await bucket.acquire()
+
+    asyncio.run(run())
+    assert now[0] == pytest.approx(1.0)
@@ -0,0 +1,51 @@
+# tests/test_indicators.py
+import numpy as np
+import pandas as pd
+
+from data.indicators import FEATURES, IndicatorEngine, RollingMean, RollingStd
+from data.prepare_dataset import prepare_stock_dataset
+
+
+def _stream(closes):
+    engine = IndicatorEngine()
+    rows = [engine.update(c) for c in closes]
+    return pd.DataFrame(rows), engine
+
+
+def test_bit_compatible_with_prepare_dataset():
+    raw = pd.read_csv("data/AAPL_5y.csv")
+    prepared = prepare_stock_dataset(raw.copy())
+    streamed, _ = _stream(raw.sort_values("timestamp")["close"].to_numpy())
+
+    for name in FEATURES:
+        np.testing.assert_array_equal(
+            streamed.loc[prepared.index, name].to_numpy(), prepared[name].to_numpy(), err_msg=name
+        )
+
+
+def test_rolling_windows_match_pandas_with_nans_and_flat_runs():
+    rng = np.random.default_rng(7)
+    values = rng.normal(0, 1e-3, 2000) + 50
+    values[100:140] = 50.0                  # flat run (same-value special case)
+    values[[5, 300, 301, 999]] = np.nan      # gaps
+    values[1500:1600] *= 1e6                 # scale jump (variance recompute path)
+    series = pd.Series(values)
+
+    for window in (1, 5, 20):
+        mean = RollingMean(window)
+        std = RollingStd(window)
+        means = [mean.update(v) for v in values]
+        stds = [std.update(v) for v in values]
+        np.testing.assert_array_equal(means, series.rolling(window).mean().to_numpy())
+        np.testing.assert_array_equal(stds, series.rolling(window).std().to_numpy())
+
+
+def test_preview_does_not_mutate_state():
+    closes = pd.read_csv("data/AAPL_5y.csv")["close"].to_numpy()
+    engine = IndicatorEngine.from_history(closes[:-1])
+    before = engine.snapshot()
+
+    preview = engine.preview(closes[-1])
+    assert engine.snapshot() == before
+    assert preview == engine.update(closes[-1])
+    assert engine.ready()
@@ -0,0 +1,124 @@
+# tests/test_inference.py
+import os
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from inference.client import InferenceClient
+from inference.server import MicroBatcher, SignalModels, serve
+from training.model_registry import ModelRegistry
+from training.observations import ObservationBuilder
+
+
+def _features(symbol):
+    if symbol == "NONE":
+        raise FileNotFoundError(symbol)
+    if symbol == "BOOM":
+        raise RuntimeError("corrupt feature file")
+    if symbol == "NAN":
+        return pd.DataFrame({"close": [100.0], "return": [np.nan]})
+    base = {"AAPL": 1.0, "MSFT": -1.0}.get(symbol, 0.5)
+    return pd.DataFrame({"close": [100.0, 101.0], "return": [0.0, base]})
+
+
+@pytest.fixture
+def models(tmp_path):
+    registry = ModelRegistry(str(tmp_path / "registry"))
+    X = np.array([[1.0], [2.0], [3.0]])
+    registry.register("linear", LinearRegression().fit(X, X[:, 0] * 0.01), ["return"])
+    return SignalModels(registry, rl_dir=str(tmp_path / "rl"), feature_loader=_features)
+
+
+def test_signal_models_batch_predict(models):
+    signals = models.predict(["AAPL", "MSFT", "NONE"])
+    assert signals["AAPL"]["ml"]["linear"] == pytest.approx(0.01)
+    assert signals["AAPL"]["ml_signal"] == "BUY"
+    assert signals["MSFT"]["ml_signal"] == "SELL"
+    assert "error" in signals["NONE"]
+
+
+def test_signal_models_isolate_failing_symbols(models):
+    signals = models.predict(["AAPL", "BOOM", "NAN", "MSFT"])
+    assert "error" in signals["BOOM"] and "error" in signals["NAN"]
+    assert signals["AAPL"]["ml_signal"] == "BUY"
+    assert signals["MSFT"]["ml_signal"] == "SELL"
+
+
+def test_batcher_merges_concurrent_requests():
+    calls = []
+    release = threading.Event()
+
+    def predict(symbols):
+        calls.append(list(symbols))
+        release.wait(1)
+        return {s: len(s) for s in symbols}
+
+    batcher = MicroBatcher(predict, max_wait=0.05)
+    results = {}
+
+    def worker(symbol):
+        results[symbol] = batcher.submit([symbol])
+
+    threads = [threading.Thread(target=worker, args=(s,)) for s in ["A", "BB", "CCC", "DDDD"]]
+    for t in threads:
+        t.start()
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert results["CCC"] == {"CCC": 3}
+    assert sum(len(c) for c in calls) == 4 and len(calls) < 4
+    stats = batcher.stats()
+    assert stats["requests"] == 4 and stats["p99_ms"] >= stats["p50_ms"]
+
+
+def test_http_round_trip(models):
+    server, _ = serve(models, port=0)
+    try:
+        client = InferenceClient(f"http://127.0.0.1:{server.server_address[1]}")
+        assert client.healthy()
+        signals = client.predict(["aapl", "MSFT"])
+        assert set(signals) == {"AAPL", "MSFT"}
+        assert signals["MSFT"]["ml"]["linear"] == pytest.approx(-0.01)
+        assert client.stats()["requests"] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class FakeAgent:
+    """PPO stand-in: BUY when the newest close rose, records observations."""
+
+    def __init__(self, shape):
+        self.observation_space = SimpleNamespace(shape=shape)
+        self.seen = []
+
+    def predict(self, obs, deterministic=True):
+        self.seen.append(obs)
+        return (obs[:, -1] > obs[:, 0]).astype(int), None
+
+
+def test_rl_observations_follow_saved_builder(models, tmp_path, monkeypatch):
+    import inference.server as server
+
+    rl_dir = tmp_path / "rl"
+    rl_dir.mkdir()
+    agents = {"aapl": FakeAgent((2,)), "msft": FakeAgent((1,))}
+    for name in agents:
+        (rl_dir / f"ppo_{name}_final.zip").write_bytes(b"")
+    ObservationBuilder(["close"], lookback=2).save(str(rl_dir / "ppo_aapl_final.zip"))
+    ObservationBuilder(["close", "return"]).save(str(rl_dir / "ppo_msft_final.zip"))  # shape (2,)
+
+    monkeypatch.setattr(server, "USE_RL", True)
+    monkeypatch.setattr(server, "PPO", SimpleNamespace(load=lambda path: agents[os.path.basename(path)[4:8]]),
+                        raising=False)
+    signals = models.predict(["AAPL", "MSFT"])
+
+    np.testing.assert_array_equal(agents["aapl"].seen[0], [[100.0, 101.0]])  # last 2 closes
+    assert signals["AAPL"]["rl"] == "BUY"
+    # Trained on one shape, configured for another: rejected at load, not fed garbage
+    assert models.rl_agent("MSFT") is None and signals["MSFT"]["rl"] is None
@@ -0,0 +1,161 @@
+# tests/test_journal.py
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import trading.execute as execute
+from data.bar_store import BarStore
+from trading.journal import TradeJournal, apply_fill
+from trading.sim_broker import SimulatedBroker
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return TradeJournal(str(tmp_path / "journal.db"))
+
+
+def _replay(fills):
+    """Average-cost P/L from scratch, kept as the oracle."""
+    qty, cost, realized = 0.0, 0.0, 0.0
+    for side, n, price in fills:
+        for _ in range(int(n)):  # one share at a time
+            if side == "buy":
+                if qty >= 0:
+                    cost += price
+                else:
+                    realized += cost / -qty - price
+                    cost -= cost / -qty
+                qty += 1
+            else:
+                if qty <= 0:
+                    cost += price
+                else:
+                    realized += price - cost / qty
+                    cost -= cost / qty
+                qty -= 1
+    return qty, (cost / abs(qty) if qty else 0.0), realized
+
+
+def test_incremental_pnl_matches_replay(journal):
+    rng = np.random.default_rng(0)
+    fills = [("buy" if rng.random() < 0.5 else "sell", int(rng.integers(1, 5)), float(rng.uniform(90, 110)))
+             for _ in range(200)]
+    for i, (side, qty, price) in enumerate(fills):
+        journal.record("aapl", side, qty, price, ts=pd.Timestamp("2024-01-01") + pd.Timedelta(minutes=i))
+
+    position = journal.positions().iloc[0]
+    qty, avg, realized = _replay(fills)
+    assert position["symbol"] == "AAPL"
+    assert position["qty"] == qty
+    assert position["avg_price"] == pytest.approx(avg)
+    assert position["realized_pl"] == pytest.approx(realized)
+    assert position["fills"] == 200
+
+    pnl = journal.pnl({"AAPL": 100.0}).iloc[0]
+    assert pnl["unrealized_pl"] == pytest.approx(qty * (100.0 - avg))
+
+
+def test_apply_fill_flip():
+    assert apply_fill(2, 10.0, 0.0, "sell", 5, 12.0) == (-3, 12.0, 4.0)
+
+
+def test_queries_by_symbol_and_time(journal):
+    for i in range(10):
+        journal.record("AAA" if i % 2 else "BBB", "buy", 1, 10 + i, ts=pd.Timestamp("2024-01-01") + pd.Timedelta(days=i))
+
+    recent = journal.fills("AAA", start="2024-01-05")
+    assert list(recent["price"]) == [15.0, 17.0, 19.0]
+    assert list(journal.fills(limit=2)["price"]) == [18.0, 19.0]
+    assert len(journal.fills(after_id=7)) == 3
+
+    plan = journal._conn().execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM fills WHERE symbol = ? AND ts >= ?", ("AAA", 0)
+    ).fetchall()
+    assert "fills_symbol_ts" in str(plan)
+
+
+def test_duplicate_orders_and_persistence(journal):
+    assert journal.record("AAPL", "buy", 1, 100, order_id="o-1") is not None
+    assert journal.record("AAPL", "buy", 1, 100, order_id="o-1") is None
+    journal.close()
+
+    reopened = TradeJournal(journal.path)
+    assert len(reopened.fills()) == 1
+    assert reopened.positions().iloc[0]["qty"] == 1
+
+
+def _order(status, filled_qty, avg=None, id="abc", qty="3"):
+    return SimpleNamespace(id=id, symbol="AAPL", side="buy", qty=qty, status=status,
+                           filled_qty=filled_qty, filled_avg_price=avg,
+                           submitted_at=pd.Timestamp("2024-01-02", tz="UTC"), client_order_id="bot-1")
+
+
+def test_orders_are_journaled_as_they_fill(journal):
+    # Alpaca returns market orders unfilled from submit: pending, not a fill
+    assert journal.record_order(_order("accepted", "0"), price=101.5, source="main") is None
+    assert journal.fills().empty and journal.positions().empty
+    assert journal.orders(open_only=True)["ref_price"].tolist() == [101.5]
+
+    journal.record_order(_order("partially_filled", "1", "100"))
+    journal.record_order(_order("partially_filled", "1", "100"))  # same state again: no-op
+    journal.record_order(_order("filled", "3", "102"))
+
+    fills = journal.fills()
+    assert fills["qty"].tolist() == [1.0, 2.0]
+    assert fills["price"].tolist() == [100.0, 103.0]  # 3 @ 102 avg, first 1 @ 100
+    assert set(fills["source"]) == {"main"}
+    position = journal.positions().iloc[0]
+    assert (position["qty"], position["avg_price"]) == (3.0, pytest.approx(102.0))
+    assert journal.orders(open_only=True).empty
+
+
+def test_rejected_orders_never_count(journal):
+    journal.record_order(_order("new", "0"), price=100.0)
+    journal.record_order(_order("rejected", "0"))
+    assert journal.fills().empty and journal.positions().empty
+    assert journal.orders()["status"].tolist() == ["rejected"]
+
+
+def test_sync_orders_polls_open_orders(journal):
+    class Broker:
+        def __init__(self):
+            self.state = {"a": _order("new", "0", id="a"), "b": _order("new", "0", id="b")}
+            self.polled = []
+
+        def get_order_by_id(self, order_id):
+            self.polled.append(order_id)
+            if order_id == "b":
+                raise ConnectionError("timeout")
+            return self.state[order_id]
+
+    broker = Broker()
+    for order in broker.state.values():
+        journal.record_order(order, price=100.0)
+    assert journal.sync_orders(broker) == 0
+
+    broker.state["a"] = _order("filled", "3", "99", id="a")
+    assert journal.sync_orders(broker) == 1
+    assert journal.positions().iloc[0]["qty"] == 3
+    broker.polled.clear()
+    journal.sync_orders(broker)
+    assert broker.polled == ["b"]  # filled orders are not polled again
+
+
+def test_attached_journal_records_concurrent_submits(journal, tmp_path):
+    store = BarStore(str(tmp_path / "store"))
+    close = np.full(5, 100.0)
+    store.write("AAPL", pd.DataFrame({"timestamp": pd.date_range("2024-01-01", periods=5), "close": close}))
+    broker = SimulatedBroker(store, initial_cash=1e6, slippage_bps=0)
+
+    listener = journal.attach(source="test")
+    try:
+        with ThreadPoolExecutor(4) as pool:
+            list(pool.map(lambda i: execute.submit_order("AAPL", 1, "buy", client=broker), range(40)))
+    finally:
+        execute.remove_fill_listener(listener)
+
+    assert len(journal.fills("AAPL")) == 40
+    assert journal.positions().iloc[0]["qty"] == 40
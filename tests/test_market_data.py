@@ -0,0 +1,75 @@
+# tests/test_market_data.py
+from types import SimpleNamespace
+
+import pytest
+from alpaca.data.timeframe import TimeFrame
+
+from data.market_data import get_latest_prices
+
+
+class FakeDataClient:
+    """Stands in for StockHistoricalDataClient.get_stock_bars."""
+
+    def __init__(self, closes):
+        self.closes = closes
+        self.requests = []
+        self.timeframes = []
+
+    def get_stock_bars(self, request):
+        symbols = request.symbol_or_symbols
+        self.requests.append(symbols)
+        self.timeframes.append(request.timeframe)
+        data = {
+            s: [SimpleNamespace(close=c - 1), SimpleNamespace(close=c)]
+            for s, c in self.closes.items() if s in symbols
+        }
+        return SimpleNamespace(data=data)
+
+
+def test_get_latest_prices_chunks_and_reports_missing():
+    fake = FakeDataClient({"AAPL": 190.0, "MSFT": 410.0, "NVDA": 120.0})
+    prices, missing = get_latest_prices(
+        ["AAPL", "MSFT", "XXXX", "NVDA", "AAPL"], chunk_size=2, client=fake
+    )
+
+    assert prices == {"AAPL": 190.0, "MSFT": 410.0, "NVDA": 120.0}
+    assert missing == ["XXXX"]
+    assert fake.requests == [["AAPL", "MSFT"], ["XXXX", "NVDA"]]
+
+
+def test_get_latest_prices_raw_bars_and_errors():
+    class RawClient:
+        def get_stock_bars(self, request):
+            if "BAD" in request.symbol_or_symbols:
+                raise RuntimeError("rate limited")
+            return {"AAPL": [{"c": 1.0}, {"c": 2.5}]}
+
+    prices, missing = get_latest_prices(["AAPL", "BAD"], chunk_size=1, client=RawClient())
+    assert prices == {"AAPL": 2.5}
+    assert missing == ["BAD"]
+
+
+def test_get_latest_prices_minute_uses_latest_bar():
+    class LatestClient:
+        def get_stock_latest_bar(self, request):
+            return {s: SimpleNamespace(close=10.0) for s in request.symbol_or_symbols if s != "XXXX"}
+
+    prices, missing = get_latest_prices(["AAPL", "XXXX"], client=LatestClient(), timeframe="minute")
+    assert prices == {"AAPL": 10.0}
+    assert missing == ["XXXX"]
+
+
+def test_get_latest_prices_hour_requests_hourly_bars():
+    fake = FakeDataClient({"AAPL": 190.0})
+    prices, _ = get_latest_prices(["AAPL"], client=fake, timeframe="hour")
+    assert prices == {"AAPL": 190.0}
+    assert fake.timeframes[0].value == TimeFrame.Hour.value
+
+
+def test_unknown_timeframe_rejected():
+    from data.market_data import get_cached_prices
+
+    with pytest.raises(ValueError, match="unknown timeframe"):
+        get_latest_prices(["AAPL"], client=FakeDataClient({}), timeframe="week")
+    with pytest.raises(ValueError, match="unknown timeframe"):
+        get_cached_prices(["AAPL"], timeframe="1Min")
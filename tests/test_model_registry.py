@@ -0,0 +1,54 @@
+# tests/test_model_registry.py
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+
+from training.model_registry import ModelRegistry, clear_cache, load_artifact
+
+
+def _frame():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(200, 3)), columns=["a", "b", "c"])
+    df["y"] = 2 * df["a"] - df["c"]
+    return df
+
+
+def test_register_versions_and_predict(tmp_path):
+    df = _frame()
+    registry = ModelRegistry(str(tmp_path))
+    scaler = StandardScaler().fit(df[["a", "b", "c"]])
+    model = LinearRegression().fit(scaler.transform(df[["a", "b", "c"]]), df["y"])
+
+    assert registry.register("linear", model, ["a", "b", "c"], "y", scaler, {"MAE": 0.1}) == 1
+    assert registry.register("linear", model, ["a", "b", "c"], "y", scaler) == 2
+    assert registry.versions("linear") == [1, 2] and registry.names() == ["linear"]
+    assert registry.meta("linear", 1)["metrics"] == {"MAE": 0.1}
+
+    loaded = registry.load("linear")
+    assert loaded.version == 2
+    # Columns out of order are re-selected by the stored feature list
+    np.testing.assert_allclose(
+        loaded.predict(df[["c", "b", "a"]]),
+        model.predict(scaler.transform(df[["a", "b", "c"]]))
+    )
+
+
+def test_forest_is_cached_per_file_version(tmp_path):
+    clear_cache()
+    df = _frame()
+    registry = ModelRegistry(str(tmp_path))
+    forest = RandomForestRegressor(n_estimators=5, random_state=0).fit(df[["a", "b", "c"]].to_numpy(), df["y"])
+    registry.register("forest", forest, ["a", "b", "c"])
+
+    loaded = registry.load("forest")
+    np.testing.assert_array_equal(loaded.predict(df), forest.predict(df[["a", "b", "c"]].to_numpy()))
+    assert registry.load("forest").model is loaded.model
+
+    # Rewriting the artifact invalidates the cache
+    path = os.path.join(str(tmp_path), "forest", "v0001", "model.joblib")
+    os.utime(path, ns=(0, 0))
+    assert load_artifact(path) is not loaded.model
@@ -0,0 +1,70 @@
+# tests/test_observations.py
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "training"))
+gym = pytest.importorskip("gym")
+
+from env import TradingEnv  # noqa: E402
+from training.observations import FEATURE_COLUMNS, ObservationBuilder  # noqa: E402
+from training.vec_env import VecTradingEnv  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def df():
+    return pd.read_csv("data/prepared_AAPL.csv")
+
+
+def test_default_is_price_only(df):
+    obs = TradingEnv(df).reset()
+    assert obs.shape == (1,) and obs[0] == np.float32(df["close"][0])
+
+
+def test_lookback_windows_are_views(df):
+    builder = ObservationBuilder(FEATURE_COLUMNS, lookback=8)
+    padded = builder.padded(df)
+    windows = builder.windows(padded)
+    assert windows.shape == (len(df), 8 * len(FEATURE_COLUMNS))
+    assert np.shares_memory(windows, padded)
+
+    expected = df[FEATURE_COLUMNS].to_numpy(dtype=np.float32)
+    np.testing.assert_array_equal(windows[100], expected[93:101].ravel())
+    # Early steps repeat the first bar
+    np.testing.assert_array_equal(windows[0], np.tile(expected[0], 8))
+
+
+def test_env_state_and_vec_env_agree(df):
+    builder = ObservationBuilder(["close", "ma_5", "rsi_14"], lookback=4, include_state=True)
+    single = TradingEnv(df, builder)
+    vec = VecTradingEnv([df], n_envs=1, observation=builder)
+    assert single.observation_space.shape == vec.observation_space.shape == (14,)
+
+    obs_single = single.reset()
+    obs_vec = vec.reset()
+    np.testing.assert_array_equal(obs_single, obs_vec[0])
+
+    for action in [1, 1, 0, 2, 1, 2, 0]:
+        obs_single, _, _, _ = single.step(action)
+        obs_vec, _, _, _ = vec.step(np.array([action]))
+        np.testing.assert_array_equal(obs_single, obs_vec[0])
+    assert obs_single[-2] == single.shares
+    assert obs_single[-1] == np.float32(single.balance / 10000)
+
+
+def test_env_observations_are_not_aliased(df):
+    builder = ObservationBuilder(["close", "ma_5"], lookback=2, include_state=True)
+    env = TradingEnv(df, builder)
+    first = env.reset()
+    kept = first.copy()
+    second, _, _, _ = env.step(1)
+    assert second is not first
+    np.testing.assert_array_equal(first, kept)
+
+
+def test_missing_feature_raises(df):
+    with pytest.raises(KeyError):
+        TradingEnv(df, ObservationBuilder(["close", "sentiment"]))
@@ -0,0 +1,39 @@
+# tests/test_pipeline.py
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from data.bar_store import BarStore
+from data.pipeline import read_dataset, run_pipeline
+from data.prepare_dataset import prepare_stock_dataset
+
+
+def test_pipeline_builds_partitioned_dataset(tmp_path):
+    bar_root = str(tmp_path / "bars")
+    feature_root = str(tmp_path / "features")
+
+    raw = pd.read_csv("data/AAPL_5y.csv")
+    bars = BarStore(bar_root)
+    bars.write("AAPL", raw)
+    shifted = raw.copy()
+    shifted["close"] = shifted["close"] * 1.5
+    bars.write("MSFT", shifted)
+
+    timings = run_pipeline(["AAPL", "MSFT", "NOPE"], workers=2,
+                           bar_root=bar_root, feature_root=feature_root)
+
+    assert timings["symbol"].tolist() == ["AAPL", "MSFT"]
+    summary = timings.attrs["summary"]
+    assert set(summary["failed"]) == {"NOPE"}
+    with open(os.path.join(feature_root, "1Day", "_last_run.json")) as f:
+        assert json.load(f)["prepared"] == 2
+
+    dataset = read_dataset(feature_root=feature_root)
+    assert set(dataset["symbol"]) == {"AAPL", "MSFT"}
+
+    expected = prepare_stock_dataset(raw.copy())
+    aapl = dataset[dataset["symbol"] == "AAPL"]
+    np.testing.assert_array_equal(aapl["ma_20"].to_numpy(), expected["ma_20"].to_numpy())
+    assert len(aapl) == timings.loc[0, "rows"]
@@ -0,0 +1,78 @@
+# tests/test_portfolio.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.portfolio import (
+    equal_weights, load_price_matrix, rebalance_mask, run_portfolio_backtest, sma_weights, synthetic_prices
+)
+from data.bar_store import BarStore
+
+
+def _reference(prices, weights, initial_cash, cost_bps, mask):
+    """Bar-by-bar share accounting, kept as the oracle."""
+    raw = prices.to_numpy()
+    filled = prices.ffill().fillna(1.0).to_numpy()
+    target = np.where(np.isnan(raw), 0.0, weights.to_numpy())
+    shares = np.zeros(raw.shape[1])
+    cash = float(initial_cash)
+    equity = []
+    for t in range(len(raw)):
+        value = cash + shares @ filled[t]
+        if mask[t]:
+            wanted = target[t] * value
+            traded = np.abs(wanted - shares * filled[t]).sum()
+            value -= traded * cost_bps / 10_000
+            shares = target[t] * value / filled[t]
+            cash = value - shares @ filled[t]
+        equity.append(cash + shares @ filled[t])
+    return np.array(equity)
+
+
+def _prices_with_gaps():
+    prices = synthetic_prices(n_symbols=6, years=1, seed=1)
+    prices.iloc[:30, 2] = np.nan     # listed late
+    prices.iloc[200:, 4] = np.nan    # delisted
+    prices.iloc[100:103, 1] = np.nan  # missing days
+    return prices
+
+
+@pytest.mark.parametrize("rebalance", [1, 5, "M"])
+def test_matches_share_accounting(rebalance):
+    prices = _prices_with_gaps()
+    weights = sma_weights(prices, 10)
+    result = run_portfolio_backtest(prices, weights, 10000, cost_bps=10, rebalance=rebalance)
+    expected = _reference(prices, weights, 10000, 10, rebalance_mask(prices.index, rebalance))
+    np.testing.assert_allclose(result["equity"].to_numpy(), expected, rtol=1e-10)
+
+
+def test_weights_drift_between_rebalances():
+    prices = pd.DataFrame({"A": [10.0, 20.0, 20.0], "B": [10.0, 10.0, 10.0]},
+                          index=pd.bdate_range("2024-01-01", periods=3))
+    result = run_portfolio_backtest(prices, equal_weights(prices), 100, rebalance=2)
+    weights = result["weights"].to_numpy()
+    np.testing.assert_allclose(weights[1], [2 / 3, 1 / 3])
+    np.testing.assert_allclose(weights[2], [0.5, 0.5])
+    np.testing.assert_allclose(result["equity"], [100, 150, 150])
+    assert result["turnover"].iloc[2] == pytest.approx(1 / 3)
+
+
+def test_costs_reduce_equity():
+    prices = synthetic_prices(n_symbols=20, years=2)
+    weights = sma_weights(prices, 20)
+    free = run_portfolio_backtest(prices, weights, cost_bps=0)
+    paid = run_portfolio_backtest(prices, weights, cost_bps=20)
+    assert paid["stats"]["final_value"] < free["stats"]["final_value"]
+    assert paid["stats"]["costs"] > 0
+    assert free["stats"]["trades"] == paid["stats"]["trades"]
+
+
+def test_load_price_matrix_aligns_dates(tmp_path):
+    store = BarStore(str(tmp_path))
+    for symbol, start, n in (("AAA", "2024-01-01", 10), ("BBB", "2024-01-05", 10)):
+        close = np.arange(n, dtype=float) + 1
+        store.write(symbol, pd.DataFrame({"timestamp": pd.date_range(start, periods=n, freq="D"), "close": close}))
+    prices = load_price_matrix(["AAA", "BBB"], store)
+    assert prices.shape == (14, 2)
+    assert prices["BBB"].isna().sum() == 4
+    assert prices.loc["2024-01-05", "BBB"] == 1.0
@@ -0,0 +1,98 @@
+# tests/test_positions.py
+import numpy as np
+import pandas as pd
+import pytest
+
+import trading.execute as execute
+from data.bar_store import BarStore
+from trading.journal import TradeJournal
+from trading.positions import PositionBook
+from trading.sim_broker import SimulatedBroker
+
+
+def _random_fills(n=500, symbols=("AAA", "BBB", "CCC"), seed=0):
+    rng = np.random.default_rng(seed)
+    return [(symbols[rng.integers(len(symbols))], "buy" if rng.random() < 0.5 else "sell",
+             int(rng.integers(1, 10)), float(rng.uniform(50, 150))) for _ in range(n)]
+
+
+def test_matches_journal_positions(tmp_path):
+    journal = TradeJournal(str(tmp_path / "journal.db"))
+    book = PositionBook()
+    for symbol, side, qty, price in _random_fills():
+        journal.record(symbol, side, qty, price)
+        book.on_fill(symbol, side, qty, price)
+
+    expected = journal.positions().set_index("symbol")
+    snapshot = book.snapshot().set_index("symbol").loc[expected.index]
+    np.testing.assert_allclose(snapshot["qty"], expected["qty"])
+    np.testing.assert_allclose(snapshot["avg_price"], expected["avg_price"])
+    np.testing.assert_allclose(snapshot["realized_pl"], expected["realized_pl"])
+
+
+def test_running_totals_follow_ticks():
+    book = PositionBook(capacity=2)  # forces growth
+    fills = _random_fills(symbols=tuple(f"S{i}" for i in range(10)))
+    for symbol, side, qty, price in fills:
+        book.on_fill(symbol, side, qty, price)
+    rng = np.random.default_rng(1)
+    for _ in range(1000):
+        book.mark(f"S{rng.integers(10)}", float(rng.uniform(50, 150)))
+
+    snapshot = book.snapshot()
+    assert len(snapshot) == 10
+    np.testing.assert_allclose(snapshot["unrealized_pl"], snapshot["qty"] * (snapshot["price"] - snapshot["avg_price"]))
+    totals = book.totals()
+    assert totals["unrealized_pl"] == pytest.approx(snapshot["unrealized_pl"].sum())
+    assert totals["realized_pl"] == pytest.approx(snapshot["realized_pl"].sum())
+
+
+def test_position_query():
+    book = PositionBook()
+    book.on_fill("aapl", "buy", 10, 100.0)
+    book.on_fill("AAPL", "sell", 4, 110.0)
+    book.mark("AAPL", 105.0)
+    position = book.position("AAPL")
+    assert (position["qty"], position["avg_price"]) == (6.0, 100.0)
+    assert position["realized_pl"] == pytest.approx(40.0)
+    assert position["unrealized_pl"] == pytest.approx(30.0)
+    assert book.position("MSFT") is None
+    assert book.snapshot(open_only=True)["symbol"].tolist() == ["AAPL"]
+
+
+def test_fed_by_execute_and_journal_sync(tmp_path):
+    store = BarStore(str(tmp_path / "store"))
+    store.write("AAPL", pd.DataFrame({"timestamp": pd.date_range("2024-01-01", periods=3),
+                                      "close": [100.0, 100.0, 100.0]}))
+    broker = SimulatedBroker(store, initial_cash=1e6, slippage_bps=0)
+    journal = TradeJournal(str(tmp_path / "journal.db"))
+
+    live = PositionBook()
+    listeners = [live.attach(), journal.attach()]
+    try:
+        for _ in range(3):
+            execute.submit_order("AAPL", 2, "buy", client=broker)
+    finally:
+        for listener in listeners:
+            execute.remove_fill_listener(listener)
+    assert live.position("AAPL")["qty"] == 6
+
+    # A second process catches up from the journal, incrementally
+    other = PositionBook()
+    assert other.sync(journal) == 3
+    assert other.sync(journal) == 0
+    journal.record("AAPL", "sell", 1, 120.0)
+    assert other.sync(journal) == 1
+    assert other.position("AAPL")["qty"] == 5
+    assert other.position("AAPL")["realized_pl"] == pytest.approx(20.0)
+
+
+def test_sync_tracks_ids_not_timestamps(tmp_path):
+    journal = TradeJournal(str(tmp_path / "journal.db"))
+    journal.record("AAPL", "buy", 1, 100.0, ts="2024-01-02")
+    journal.record("AAPL", "buy", 1, 100.0, ts="2024-01-01")  # recorded late, earlier ts
+
+    book = PositionBook()
+    assert book.sync(journal) == 2
+    assert book.sync(journal) == 0
+    assert book.position("AAPL")["qty"] == journal.positions()["qty"][0] == 2
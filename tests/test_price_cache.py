@@ -0,0 +1,90 @@
+# tests/test_price_cache.py
+import threading
+import time
+
+from data.price_cache import PriceCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_hits_and_misses():
+    clock = FakeClock()
+    cache = PriceCache(ttls={"day": 10, "minute": 1}, clock=clock)
+    calls = []
+
+    def loader(symbols):
+        calls.append(list(symbols))
+        return {s: 1.0 for s in symbols}, []
+
+    cache.get_many(["AAPL", "MSFT"], loader)
+    cache.get_many(["AAPL", "MSFT", "NVDA"], loader)
+    cache.get_many(["AAPL"], loader, timeframe="minute")
+    assert calls == [["AAPL", "MSFT"], ["NVDA"], ["AAPL"]]
+
+    clock.now = 5
+    cache.get_many(["AAPL"], loader, timeframe="minute")   # minute TTL expired
+    cache.get_many(["AAPL"], loader)                       # day still fresh
+    assert calls[-1] == ["AAPL"] and len(calls) == 4
+
+    stats = cache.stats()
+    assert stats["hits"] == 3
+    assert stats["misses"] == 5
+
+
+def test_missing_values_are_not_cached():
+    cache = PriceCache()
+    calls = []
+
+    def loader(symbols):
+        calls.append(list(symbols))
+        return {}, list(symbols)
+
+    assert cache.get_many(["XXXX"], loader) == ({}, ["XXXX"])
+    assert cache.get("XXXX", lambda s: None) is None
+    assert calls == [["XXXX"]]
+
+
+def test_lru_eviction():
+    cache = PriceCache(max_entries=2)
+    loader = lambda symbols: ({s: 1.0 for s in symbols}, [])
+    cache.get_many(["A", "B"], loader)
+    cache.get_many(["A"], loader)          # A is now most recent
+    cache.get_many(["C"], loader)          # evicts B
+    assert cache.stats()["evictions"] == 1
+    before = cache.misses
+    cache.get_many(["A"], loader)
+    cache.get_many(["B"], loader)
+    assert cache.misses == before + 1
+
+
+def test_concurrent_requests_are_coalesced():
+    cache = PriceCache()
+    calls = []
+    release = threading.Event()
+
+    def slow_loader(symbol):
+        calls.append(symbol)
+        release.wait(1)
+        return 42.0
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get("AAPL", slow_loader)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert calls == ["AAPL"]
+    assert results == [42.0] * 8
+    assert cache.stats()["coalesced"] == 7
@@ -0,0 +1,123 @@
+# tests/test_scheduler.py
+import asyncio
+import threading
+import time
+
+from trading.scheduler import TradingScheduler
+
+
+class FakeApi:
+    """Blocking fake price feed / broker that tracks concurrency."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+        self.orders = []
+        self.lock = threading.Lock()
+
+    def _enter(self):
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+
+    def _exit(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def fetch_price(self, symbol):
+        self._enter()
+        time.sleep(self.delay)
+        self._exit()
+        return None if symbol == "MISSING" else 100.0
+
+    def place_order(self, symbol, qty, side):
+        self._enter()
+        time.sleep(self.delay)
+        self._exit()
+        self.orders.append((symbol, qty, side))
+        return {"symbol": symbol}
+
+
+def test_cycle_is_concurrent_and_bounded():
+    api = FakeApi()
+    symbols = [f"S{i}" for i in range(20)] + ["MISSING"]
+    scheduler = TradingScheduler(
+        symbols, api.fetch_price, lambda s, p: "BUY", api.place_order,
+        max_in_flight=5
+    )
+    asyncio.run(scheduler.run(max_cycles=1))
+
+    cycle = scheduler.metrics[-1]
+    assert cycle["symbols"] == 21
+    assert cycle["orders"] == 20
+    assert api.peak <= 5
+    # 41 blocking calls of 50 ms, 5 at a time -> well under the serial 2 s
+    assert cycle["elapsed"] < 1.0
+    assert len(api.orders) == 20
+
+
+def test_async_decide_runs_concurrently():
+    api = FakeApi()
+
+    async def decide(symbol, price):
+        await asyncio.sleep(0.05)  # e.g. awaiting a model server
+        return "SELL"
+
+    scheduler = TradingScheduler([f"S{i}" for i in range(10)], api.fetch_price, decide, api.place_order)
+    asyncio.run(scheduler.run(max_cycles=1))
+
+    cycle = scheduler.metrics[-1]
+    assert cycle["orders"] == 10 and cycle["errors"] == 0
+    assert cycle["elapsed"] < 0.5
+    assert api.orders[0][2] == "sell"
+
+
+def test_per_symbol_intervals_and_stop():
+    api = FakeApi(delay=0)
+    scheduler = TradingScheduler(
+        ["FAST", "SLOW"], api.fetch_price, lambda s, p: "HOLD", api.place_order,
+        interval=10, intervals={"FAST": 0.05}
+    )
+
+    async def scenario():
+        task = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(0.3)
+        scheduler.stop()
+        await asyncio.wait_for(task, timeout=1)
+
+    asyncio.run(scenario())
+    # SLOW ran only in the first cycle, FAST kept being rescheduled
+    assert scheduler.metrics[0]["symbols"] == 2
+    assert scheduler.cycles > 2
+    assert all(m["symbols"] == 1 for m in list(scheduler.metrics)[1:])
+
+
+def test_batched_price_fetch():
+    api = FakeApi(delay=0)
+    calls = []
+
+    def fetch_prices(symbols):
+        calls.append(list(symbols))
+        return {s: 100.0 for s in symbols if s != "MISSING"}, ["MISSING"]
+
+    scheduler = TradingScheduler(
+        ["A", "B", "MISSING"], None, lambda s, p: "SELL", api.place_order,
+        fetch_prices=fetch_prices, before_cycle=lambda symbols: calls.append(["before"] + symbols)
+    )
+    results = asyncio.run(scheduler.run_cycle(["A", "B", "MISSING"]))
+
+    assert sorted(calls) == [["A", "B", "MISSING"], ["before", "A", "B", "MISSING"]]
+    assert [r["order"] is not None for r in results] == [True, True, False]
+
+
+def test_loop_default_executor_survives_run():
+    api = FakeApi(delay=0)
+
+    async def main():
+        scheduler = TradingScheduler(["A"], api.fetch_price, lambda s, p: "HOLD", api.place_order)
+        await scheduler.run(max_cycles=1)
+        # Later to_thread calls (stream sources, inference) still work
+        return await asyncio.to_thread(lambda: "ok")
+
+    assert asyncio.run(main()) == "ok"
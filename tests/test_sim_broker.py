@@ -0,0 +1,58 @@
+# tests/test_sim_broker.py
+import numpy as np
+import pandas as pd
+import pytest
+
+import trading.execute as execute
+from data.bar_store import BarStore
+from trading.execute import place_order
+from trading.sim_broker import SimulatedBroker
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = BarStore(str(tmp_path))
+    close = np.arange(10, dtype=float) + 100
+    store.write("AAPL", pd.DataFrame({
+        "timestamp": pd.date_range("2024-01-01", periods=10, freq="D"),
+        "open": close, "high": close, "low": close, "close": close, "volume": np.ones(10),
+    }))
+    return store
+
+
+def test_fills_at_bar_close_with_slippage(store):
+    broker = SimulatedBroker(store, initial_cash=1000, slippage_bps=10)
+    broker.advance("2024-01-03 12:00")
+    order = place_order("AAPL", 2, "buy", client=broker)
+    assert order.filled_avg_price == pytest.approx(102 * 1.001)
+
+    broker.advance(None)  # latest bar
+    place_order("AAPL", 1, "sell", client=broker)
+    assert broker.positions["AAPL"][0] == 1
+
+    account = broker.get_account()
+    expected_cash = 1000 - 2 * 102 * 1.001 + 109 * 0.999
+    assert float(account.cash) == pytest.approx(expected_cash)
+    assert float(account.equity) == pytest.approx(expected_cash + 109)
+
+
+def test_rejections_and_idempotent_ids(store):
+    broker = SimulatedBroker(store, initial_cash=150)
+    assert place_order("AAPL", 5, "buy", client=broker) is None   # not enough cash
+    assert place_order("AAPL", 1, "sell", client=broker) is None  # nothing to sell
+
+    first = place_order("AAPL", 1, "buy", client=broker, client_order_id="cycle-1")
+    again = place_order("AAPL", 1, "buy", client=broker, client_order_id="cycle-1")
+    assert again is first and len(broker.orders) == 1
+
+
+def test_pushed_prices_override_bars(store):
+    broker = SimulatedBroker(store, slippage_bps=0)
+    broker.set_price("AAPL", 250)
+    assert place_order("AAPL", 1, "buy", client=broker).filled_avg_price == 250
+
+
+def test_env_selects_simulated_broker(monkeypatch):
+    monkeypatch.setattr(execute, "BROKER", "sim")
+    monkeypatch.setattr(execute, "client", None)
+    assert isinstance(execute.get_trading_client(), SimulatedBroker)
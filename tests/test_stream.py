@@ -0,0 +1,162 @@
+# tests/test_stream.py
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.bar_store import BarStore
+from data.stream import MarketStream, ReplaySource, RingBuffer, market_holidays
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = BarStore(str(tmp_path))
+    for symbol, start, n in (("AAA", "2024-01-01 14:30", 50), ("BBB", "2024-01-01 14:40", 30)):
+        close = np.arange(n, dtype=float) + (100 if symbol == "AAA" else 200)
+        store.write(symbol, pd.DataFrame({
+            "timestamp": pd.date_range(start, periods=n, freq="min"),
+            "open": close, "high": close, "low": close, "close": close, "volume": np.ones(n),
+        }), timeframe="1Min")
+    return store
+
+
+def _bar(symbol, ts, close):
+    return SimpleNamespace(symbol=symbol, timestamp=pd.Timestamp(ts, tz="UTC"),
+                           open=close, high=close, low=close, close=close, volume=1.0)
+
+
+def test_ring_buffer_wraps():
+    buffer = RingBuffer(capacity=4)
+    for i in range(10):
+        buffer.append(i, i, i, i, float(i), 1)
+    assert len(buffer) == 4
+    np.testing.assert_array_equal(buffer.closes(), [6, 7, 8, 9])
+    np.testing.assert_array_equal(buffer.latest(2)["timestamp"], [8, 9])
+    assert buffer.last_timestamp == 9
+
+
+def test_replay_in_time_order(store):
+    stream = MarketStream(["AAA", "BBB"], timeframe="1Min")
+    seen = []
+    asyncio.run(stream.run(ReplaySource(["AAA", "BBB"], store, timeframe="1Min"),
+                           lambda bar: seen.append((bar.timestamp, bar.symbol))))
+    assert len(seen) == 80
+    assert seen == sorted(seen)
+    np.testing.assert_array_equal(stream.buffers["BBB"].closes(3), [227, 228, 229])
+    stats = stream.stats()
+    assert stats["handled"] == 80 and stats["gaps"] == 0 and "p99_ms" in stats
+
+
+def test_duplicates_and_gaps():
+    async def go():
+        stream = MarketStream(["AAA"], timeframe="1Min")
+        await stream.publish(_bar("AAA", "2024-01-02 15:00", 1))
+        await stream.publish(_bar("AAA", "2024-01-02 15:00", 1))  # duplicate
+        await stream.publish(_bar("AAA", "2024-01-02 15:01", 2))
+        await stream.publish(_bar("AAA", "2024-01-02 15:05", 3))  # 3 bars missing
+        await stream.publish(_bar("AAA", "2024-01-03 14:30", 4))  # overnight: not a gap
+        return stream
+
+    stream = asyncio.run(go())
+    assert stream.counts["duplicates"] == 1
+    assert stream.counts["gaps"] == 1
+    assert len(stream.buffers["AAA"]) == 4
+
+
+def test_intraday_sessions_are_exchange_local():
+    async def go():
+        stream = MarketStream(["AAA"], timeframe="1Min")
+        # After-hours on Tue Jan 2 (EST = UTC-5) runs past 00:00 UTC: still one session
+        await stream.publish(_bar("AAA", "2024-01-02 23:50", 1))
+        await stream.publish(_bar("AAA", "2024-01-03 00:10", 2))  # 20 min missing
+        await stream.publish(_bar("AAA", "2024-01-03 09:00", 3))  # Wed pre-market: next session
+        await stream.publish(_bar("AAA", "2024-01-03 20:59", 4))  # rest of Wed missing, same session
+        await stream.publish(_bar("AAA", "2024-01-05 14:30", 5))  # all of Thu missing
+        return stream
+
+    stream = asyncio.run(go())
+    gaps = [pd.Timestamp(new) for _, _, new in stream.gaps]
+    assert gaps == [pd.Timestamp("2024-01-03 00:10"), pd.Timestamp("2024-01-03 20:59"),
+                    pd.Timestamp("2024-01-05 14:30")]
+
+
+def test_daily_gaps_skip_weekends():
+    async def go():
+        stream = MarketStream(["AAA"], timeframe="1Day")
+        for day in ("2024-01-04", "2024-01-05", "2024-01-08", "2024-01-10"):  # Thu, Fri, Mon, Wed
+            await stream.publish(_bar("AAA", day, 1))
+        return stream
+
+    assert asyncio.run(go()).counts["gaps"] == 1
+
+
+def test_daily_gaps_skip_market_holidays():
+    holidays = market_holidays([2024, 2025])
+    assert np.datetime64("2024-03-29") in holidays  # Good Friday
+    assert np.datetime64("2025-11-27") in holidays  # Thanksgiving
+
+    async def go():
+        stream = MarketStream(["AAA", "BBB"], timeframe="1Day")
+        for day in ("2024-11-27", "2024-11-29", "2024-12-02"):  # around Thanksgiving
+            await stream.publish(_bar("AAA", day, 1))
+        # Christmas and New Year across the year end, then Fri Jan 3 missing
+        for day in ("2024-12-24", "2024-12-26", "2024-12-27", "2024-12-30", "2024-12-31",
+                    "2025-01-02", "2025-01-06"):
+            await stream.publish(_bar("BBB", day, 1))
+        return stream
+
+    stream = asyncio.run(go())
+    assert stream.counts["gaps"] == 1
+    assert stream.gaps[0][0] == "BBB" and pd.Timestamp(stream.gaps[0][2]) == pd.Timestamp("2025-01-06")
+
+
+def test_backpressure_blocks_source(store):
+    stream = MarketStream(["AAA", "BBB"], timeframe="1Min", queue_size=2)
+    ahead = []
+
+    async def slow(bar):
+        ahead.append(stream.counts["queued"] - stream.counts["handled"])
+        await asyncio.sleep(0.001)
+
+    asyncio.run(stream.run(ReplaySource(["AAA", "BBB"], store, timeframe="1Min"), slow))
+    assert stream.counts["handled"] == 80 and stream.counts["dropped"] == 0
+    assert max(ahead) <= 3
+
+
+def test_drop_oldest_keeps_buffers_complete(store):
+    stream = MarketStream(["AAA", "BBB"], timeframe="1Min", queue_size=2, overflow="drop_oldest")
+
+    async def slow(bar):
+        await asyncio.sleep(0.001)
+
+    asyncio.run(stream.run(ReplaySource(["AAA", "BBB"], store, timeframe="1Min"), slow))
+    assert stream.counts["dropped"] > 0
+    assert stream.counts["handled"] + stream.counts["dropped"] == 80
+    # The ring buffers still hold every published bar
+    assert len(stream.buffers["AAA"]) + len(stream.buffers["BBB"]) == 80
+
+
+@pytest.mark.parametrize("queue_size", [1000, 2])
+def test_max_bars_stops_source(store, queue_size):
+    stream = MarketStream(["AAA", "BBB"], timeframe="1Min", queue_size=queue_size)
+    source = ReplaySource(["AAA", "BBB"], store, timeframe="1Min")
+    asyncio.run(stream.run(source, lambda bar: None, max_bars=10))
+    assert stream.counts["handled"] == 10
+    assert source.stopped
+    assert stream.counts["received"] < 80
+
+
+def test_source_errors_propagate():
+    class Broken:
+        stopped = False
+
+        async def run(self, stream):
+            raise RuntimeError("socket closed")
+
+        def stop(self):
+            self.stopped = True
+
+    with pytest.raises(RuntimeError, match="socket closed"):
+        asyncio.run(MarketStream(["AAA"]).run(Broken(), lambda bar: None))
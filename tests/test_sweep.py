@@ -0,0 +1,32 @@
+# tests/test_sweep.py
+import pandas as pd
+
+from backtest.backtest_sma import backtest_sma
+from backtest.sweep import load_close_series, run_sweep
+from data.bar_store import BarStore
+
+
+def test_sweep_matches_backtest_sma(tmp_path):
+    windows = [5, 20, 50]
+    ranges = [(None, None), ("2022-01-01", "2023-06-30")]
+    results = run_sweep(["AAPL"], windows, ranges, max_workers=2, store=BarStore(str(tmp_path)))
+
+    assert len(results) == len(windows) * len(ranges)
+    assert results["sharpe"].is_monotonic_decreasing
+
+    df = pd.read_csv("data/AAPL_5y.csv", parse_dates=["timestamp"])
+    for _, row in results.iterrows():
+        frame = df
+        if not pd.isna(row["start"]):
+            frame = df[(df["timestamp"] >= row["start"]) & (df["timestamp"] <= row["end"])]
+        expected = backtest_sma(frame, window=row["window"])
+        assert row["bars"] == len(frame)
+        assert row["final_value"] == expected["portfolio"].iloc[-1]
+
+
+def test_sweep_in_process_with_preloaded_series(tmp_path):
+    timestamps, close = load_close_series("AAPL", store=BarStore(str(tmp_path)))
+    series = {"AAPL": (timestamps, close), "COPY": (timestamps, close.copy())}
+    results = run_sweep(["AAPL", "COPY"], [10], max_workers=1, series=series)
+    assert set(results["symbol"]) == {"AAPL", "COPY"}
+    assert results["final_value"].iloc[0] == results["final_value"].iloc[1]
@@ -0,0 +1,46 @@
+# tests/test_train_rl_bot.py
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("gym")
+
+import training.train_rl_bot as train_rl_bot  # noqa: E402
+
+
+def _configs(monkeypatch, argv):
+    captured = {}
+
+    def fake_run_all(configs, cpu_budget):
+        captured["configs"] = configs
+        return []
+
+    monkeypatch.setattr(train_rl_bot, "run_all", fake_run_all)
+    train_rl_bot.main(argv)
+    return captured["configs"]
+
+
+def test_single_run_keeps_legacy_name(monkeypatch, tmp_path):
+    (config,) = _configs(monkeypatch, ["--models-dir", str(tmp_path)])
+    assert config["name"] == "ppo_aapl"
+    assert config["n_envs"] == 1 and config["vec"] == "native"
+
+
+def test_grid_of_seeds_and_learning_rates(monkeypatch, tmp_path):
+    configs = _configs(monkeypatch, ["--symbols", "AAPL", "MSFT", "--seeds", "0", "1",
+                                 "--learning-rates", "0.0003", "0.001", "--models-dir", str(tmp_path)])
+    names = [c["name"] for c in configs]
+    assert len(names) == len(set(names)) == 4
+    assert "ppo_aapl_msft_s1_lr0.001" in names
+
+
+def test_native_vec_env_over_symbols():
+    frames = {
+        "A": pd.DataFrame({"close": np.linspace(10, 20, 50)}),
+        "B": pd.DataFrame({"close": np.linspace(30, 40, 80)}),
+    }
+    env = train_rl_bot.build_vec_env(frames, n_envs=4, vec="native", episode_length=20, seed=1)
+    obs = env.reset()
+    assert obs.shape == (4, 1)
+    obs, rewards, dones, infos = env.step(np.zeros(4, dtype=np.int64))
+    assert rewards.shape == (4,) and not dones.any()
@@ -0,0 +1,77 @@
+# tests/test_vec_env.py
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "training"))
+gym = pytest.importorskip("gym")
+
+from env import TradingEnv  # noqa: E402
+from training.vec_env import VecTradingEnv  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def df():
+    return pd.read_csv("data/prepared_AAPL.csv")
+
+
+def test_env_matches_dataframe_lookups(df):
+    env = TradingEnv(df)
+    obs = env.reset()
+    assert obs.dtype == np.float32 and obs.shape == (1,)
+
+    rng = np.random.default_rng(0)
+    done, step = False, 0
+    while not done:
+        action = int(rng.integers(3))
+        price = df["close"][step]
+        shares = env.shares
+        obs, reward, done, _ = env.step(action)
+        step += 1
+        assert obs[0] == np.float32(df["close"][step])
+        assert reward == (price if action == 2 and shares > 0 else 0)
+    assert step == len(df) - 1
+
+
+def test_vec_env_matches_single_env(df):
+    single = TradingEnv(df)
+    vec = VecTradingEnv([df], n_envs=1)
+
+    single_obs = single.reset()
+    vec_obs = vec.reset()
+    rng = np.random.default_rng(1)
+    for _ in range(len(df) - 1):
+        np.testing.assert_array_equal(vec_obs[0], single_obs)
+        action = int(rng.integers(3))
+        single_obs, reward, done, _ = single.step(action)
+        vec_obs, rewards, dones, infos = vec.step(np.array([action]))
+
+        assert rewards[0] == np.float32(reward)
+        assert dones[0] == done
+        if not done:
+            assert vec.balance[0] == single.balance and vec.shares[0] == single.shares
+        else:
+            np.testing.assert_array_equal(infos[0]["terminal_observation"], single_obs)
+            assert vec.current_step[0] == 0  # auto-reset
+
+
+def test_multi_series_random_starts(df):
+    prices = df["close"].to_numpy()
+    vec = VecTradingEnv([prices, prices[:100] * 2], n_envs=6, random_start=True,
+                        episode_length=20, seed=3)
+    obs = vec.reset()
+    assert obs.shape == (6, 1)
+    assert vec.series.tolist() == [0, 1, 0, 1, 0, 1]
+
+    starts = vec.current_step.copy()
+    episodes = 0
+    for _ in range(60):
+        obs, rewards, dones, infos = vec.step(np.ones(6, dtype=np.int64))
+        episodes += dones.sum()
+        assert (vec.current_step < vec.lengths[vec.series]).all()
+    assert episodes >= 12
+    assert len(set(starts.tolist())) > 1
+    assert vec.get_attr("balance", [0])[0] == vec.balance[0]
@@ -0,0 +1,44 @@
+# tests/test_walk_forward.py
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import mean_absolute_error
+from sklearn.preprocessing import StandardScaler
+
+from training.walk_forward import make_folds, run_walk_forward
+
+
+def test_expanding_and_rolling_folds():
+    folds = make_folds(100, n_folds=4, test_size=10)
+    assert folds[0] == (0, 60, 60, 70)
+    assert folds[-1] == (0, 90, 90, 100)
+
+    rolling = make_folds(100, n_folds=4, mode="rolling", test_size=10, train_size=30)
+    assert rolling[0] == (30, 60, 60, 70)
+    assert all(end - start == 30 for start, end, _, _ in rolling)
+
+    with pytest.raises(ValueError):
+        make_folds(10, n_folds=50)
+
+
+def test_walk_forward_matches_manual_fits():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(300, 3)), columns=["a", "b", "c"])
+    df["target"] = df["a"] * 0.5 - df["b"] + rng.normal(scale=0.1, size=300)
+
+    metrics = run_walk_forward(df, ["a", "b", "c"], "target", ["LinearRegression"],
+                               n_folds=5, mode="rolling", train_size=100, max_workers=2)
+    assert list(metrics["fold"]) == [0, 1, 2, 3, 4]
+
+    row = metrics.iloc[3]
+    train = df.iloc[row["train_start"]:row["train_end"]]
+    test = df.iloc[row["test_start"]:row["test_end"]]
+    scaler = StandardScaler().fit(train[["a", "b", "c"]])
+    model = LinearRegression().fit(scaler.transform(train[["a", "b", "c"]]), train["target"])
+    expected = mean_absolute_error(test["target"], model.predict(scaler.transform(test[["a", "b", "c"]])))
+    assert row["MAE"] == pytest.approx(expected)
+
+    summary = metrics.attrs["summary"]
+    assert summary["tasks"] == 5 and summary["workers"] == 2
+    assert "LinearRegression" in summary["models"]
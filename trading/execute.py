@@ -1,7 +1,8 @@
 # trading/execute.py
 from dotenv import load_dotenv
+import hashlib
 import os
-import time
+import threading
 
 # Alpaca SDK imports
 from alpaca.trading.client import TradingClient
@@ -15,25 +16,113 @@ API_KEY = os.getenv("APCA_API_KEY_ID")
 API_SECRET = os.getenv("APCA_API_SECRET_KEY")
 BASE_URL = os.getenv("APCA_API_BASE_URL", "https://paper-api.alpaca.markets")
 
-# Initialize the Alpaca client
-client = TradingClient(API_KEY, API_SECRET, paper=True)  # paper=True for paper trading
+# "alpaca" (paper endpoint) or "sim" (in-process simulated broker on local bars)
+BROKER = os.getenv("TRADING_BROKER", "alpaca")
+
+# Shared Alpaca trading client (one HTTP session for the whole process),
+# created on first use
+client = None
+_client_lock = threading.Lock()
+
+
+def get_trading_client():
+    """Return the shared trading client, creating it on first use."""
+    global client
+    if client is None:
+        with _client_lock:
+            if client is None:
+                if BROKER == "sim":
+                    from trading.sim_broker import SimulatedBroker
+                    client = SimulatedBroker()
+                else:
+                    client = TradingClient(API_KEY, API_SECRET, paper=True)  # paper=True for paper trading
+    return client
+
+
+# ----------------------------
+# Client Order IDs
+# ----------------------------
+def make_client_order_id(symbol, side, qty, tag, index=None):
+    """
+    Deterministic client order id for one order of a batch/cycle (`tag`).
+    Retrying the same order reuses the id, so the broker rejects the
+    duplicate instead of filling it twice. `index` (the order's position
+    in its batch) keeps identical orders of one batch apart.
+    """
+    key = f"{tag}|{symbol.upper()}|{side.lower()}|{qty}"
+    if index is not None:
+        key += f"|{index}"
+    return "bot-" + hashlib.sha1(key.encode()).hexdigest()[:24]
+
+
+def _is_duplicate_id(error):
+    message = str(error).lower()
+    return "client_order_id" in message and ("unique" in message or "duplicate" in message)
+
+
+# ----------------------------
+# Fill Listeners
+# ----------------------------
+# Called as listener(order, price) for every order submitted through this
+# module (e.g. TradeJournal.attach); `price` is the caller's reference
+# price, for brokers that report the fill price later
+_fill_listeners = []
+
+
+def add_fill_listener(listener):
+    _fill_listeners.append(listener)
+
+
+def remove_fill_listener(listener):
+    if listener in _fill_listeners:
+        _fill_listeners.remove(listener)
+
+
+def _notify(order, price):
+    for listener in list(_fill_listeners):
+        try:
+            listener(order, price)
+        except Exception as e:
+            print(f"⚠ Fill listener failed: {e}")
+
+
+def submit_order(symbol, qty, side, client=None, client_order_id=None, price=None):
+    """
+    Submit a market order and return it; errors are raised.
+
+    If the broker already has an order with this client_order_id (an earlier
+    attempt went through), that order is returned instead. Fill listeners
+    are notified of new orders; `price` is passed on to them.
+    """
+    client = client or get_trading_client()
+    order_request = MarketOrderRequest(
+        symbol=symbol,
+        qty=qty,
+        side=OrderSide.BUY if side.lower() == "buy" else OrderSide.SELL,
+        time_in_force=TimeInForce.GTC,  # Good Till Cancelled
+        client_order_id=client_order_id
+    )
+    try:
+        order = client.submit_order(order_request)
+    except Exception as e:
+        if client_order_id and _is_duplicate_id(e):
+            return client.get_order_by_client_id(client_order_id)
+        raise
+    if _fill_listeners:
+        _notify(order, price)
+    return order
+
 
 # ----------------------------
 # Place Market Order
 # ----------------------------
-def place_order(symbol, qty, side):
+def place_order(symbol, qty, side, client=None, client_order_id=None, price=None):
     """
     Place a market order (BUY or SELL) for a given symbol and quantity.
+    `price` is the reference price journaled if the broker has no fill price yet.
     """
     try:
-        order_request = MarketOrderRequest(
-            symbol=symbol,
-            qty=qty,
-            side=OrderSide.BUY if side.lower() == "buy" else OrderSide.SELL,
-            time_in_force=TimeInForce.GTC  # Good Till Cancelled
-        )
-
-        order = client.submit_order(order_request)
+        order = submit_order(symbol, qty, side, client, client_order_id, price)
         print(f"{side.upper()} order for {qty} {symbol} placed. id={order.id}")
         return order
 
@@ -44,12 +133,12 @@ def place_order(symbol, qty, side):
 # ----------------------------
 # Get Account Info
 # ----------------------------
-def get_account():
+def get_account(client=None):
     """
     Fetch account details like equity, cash, buying power.
     """
     try:
-        account = client.get_account()
+        account = (client or get_trading_client()).get_account()
         print(f"Account status: {account.status}")
         print(f"Buying Power: {account.buying_power}")
         print(f"Cash: {account.cash}")
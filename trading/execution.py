@@ -0,0 +1,143 @@
+# trading/execution.py
+import asyncio
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from trading.execute import get_trading_client, make_client_order_id, submit_order
+
+
+class TokenBucket:
+    """Async rate limiter: `rate` tokens per second, bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic, sleep=asyncio.sleep):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = self.clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1 - 1e-9:  # tolerate float rounding in the refill
+                    self.tokens = max(self.tokens - 1, 0.0)
+                    return
+                await self.sleep((1 - self.tokens) / self.rate)
+
+
+class OrderExecutor:
+    """
+    Submits a batch of orders (e.g. a whole rebalance) concurrently.
+
+    At most `max_in_flight` submits run at once, paced by a token bucket
+    (Alpaca allows ~200 requests/minute). Every order gets a deterministic
+    client order id from the batch tag, so failed submits are retried
+    safely: a retry of an order that actually went through returns the
+    existing order instead of a second fill. Per-order submit latency is
+    recorded in the results and in `self.latencies`.
+    """
+
+    def __init__(self, client=None, max_in_flight=8, rate=3.0, burst=10,
+                 retries=2, backoff=0.5, latency_history=10000):
+        self.client = client
+        self.max_in_flight = max_in_flight
+        self.rate = rate
+        self.burst = burst
+        self.retries = retries
+        self.backoff = backoff
+        self.latencies = deque(maxlen=latency_history)
+
+    async def _submit(self, order, client_order_id, semaphore, bucket, client, pool):
+        symbol, qty, side = order["symbol"], order["qty"], order["side"]
+        result = {"symbol": symbol, "qty": qty, "side": side, "client_order_id": client_order_id,
+                  "order_id": None, "status": "failed", "attempts": 0, "latency": None, "error": None}
+
+        async with semaphore:
+            for attempt in range(self.retries + 1):
+                await bucket.acquire()
+                result["attempts"] = attempt + 1
+                started = time.perf_counter()
+                try:
+                    placed = await asyncio.get_running_loop().run_in_executor(
+                        pool, submit_order, symbol, qty, side, client, client_order_id
+                    )
+                    result["latency"] = time.perf_counter() - started
+                    result["order_id"] = str(placed.id)
+                    result["status"] = "submitted"
+                    result["error"] = None
+                    break
+                except Exception as e:
+                    result["latency"] = time.perf_counter() - started
+                    result["error"] = str(e)
+                    if attempt < self.retries:
+                        await asyncio.sleep(self.backoff * (2 ** attempt))
+
+        self.latencies.append(result["latency"])
+        return result
+
+    async def submit_batch(self, orders, tag=None):
+        """
+        Submit `orders` ({"symbol", "qty", "side"} dicts) concurrently.
+        `tag` identifies the batch for idempotent ids; resubmitting the same
+        tag only retries what the broker does not already have.
+        Returns one result dict per order, in order.
+        """
+        tag = tag or uuid.uuid4().hex
+        ids = [
+            order.get("client_order_id")
+            or make_client_order_id(order["symbol"], order["side"], order["qty"], tag, index=i)
+            for i, order in enumerate(orders)
+        ]
+        if len(set(ids)) != len(ids):
+            raise ValueError("duplicate client_order_id in batch")
+        client = self.client or get_trading_client()
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+        bucket = TokenBucket(self.rate, self.burst)
+
+        started = time.perf_counter()
+        # One thread per in-flight submit (the default executor may be smaller)
+        with ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="orders") as pool:
+            results = await asyncio.gather(*(
+                self._submit(order, client_order_id, semaphore, bucket, client, pool)
+                for order, client_order_id in zip(orders, ids)
+            ))
+        elapsed = time.perf_counter() - started
+
+        failed = sum(r["status"] != "submitted" for r in results)
+        print(f"📤 {len(results) - failed}/{len(results)} orders submitted in {elapsed:.2f}s"
+              + (f" ({failed} failed)" if failed else ""))
+        return list(results)
+
+    def rebalance(self, orders, tag=None):
+        """
+        Blocking wrapper around submit_batch for scripts and the dashboard.
+        Called from inside a running event loop (e.g. a notebook), the batch
+        runs on its own loop in a worker thread; from a coroutine, await
+        submit_batch() instead.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.submit_batch(orders, tag))
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="rebalance") as pool:
+            return pool.submit(asyncio.run, self.submit_batch(orders, tag)).result()
+
+    def stats(self):
+        latencies = np.array([x for x in self.latencies if x is not None])
+        if not len(latencies):
+            return {"orders": 0}
+        return {
+            "orders": len(latencies),
+            "p50": float(np.percentile(latencies, 50)),
+            "p99": float(np.percentile(latencies, 99)),
+            "max": float(latencies.max()),
+        }
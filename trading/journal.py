@@ -0,0 +1,357 @@
+# trading/journal.py
+import argparse
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+JOURNAL_PATH = os.getenv("TRADE_JOURNAL", os.path.join("data", "journal.db"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fills (
+    id INTEGER PRIMARY KEY,
+    ts INTEGER NOT NULL,                -- ns since epoch (UTC)
+    symbol TEXT NOT NULL,
+    side TEXT NOT NULL,                 -- 'buy' / 'sell'
+    qty REAL NOT NULL,
+    price REAL,
+    order_id TEXT,                      -- one row per (partial) fill of an order
+    client_order_id TEXT,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS fills_symbol_ts ON fills (symbol, ts);
+CREATE INDEX IF NOT EXISTS fills_ts ON fills (ts);
+CREATE INDEX IF NOT EXISTS fills_order_id ON fills (order_id);
+CREATE TABLE IF NOT EXISTS orders (
+    order_id TEXT PRIMARY KEY,
+    client_order_id TEXT,
+    ts INTEGER NOT NULL,                -- submitted, ns since epoch (UTC)
+    symbol TEXT NOT NULL,
+    side TEXT NOT NULL,
+    qty REAL NOT NULL,                  -- requested
+    ref_price REAL,                     -- price the decision was made at
+    status TEXT,
+    filled_qty REAL NOT NULL,           -- journaled as fills so far
+    filled_avg_price REAL,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS orders_status ON orders (status);
+CREATE TABLE IF NOT EXISTS positions (
+    symbol TEXT PRIMARY KEY,
+    qty REAL NOT NULL,
+    avg_price REAL NOT NULL,
+    realized_pl REAL NOT NULL,
+    fills INTEGER NOT NULL,
+    last_fill_id INTEGER NOT NULL
+);
+"""
+
+FILL_COLUMNS = ["id", "ts", "symbol", "side", "qty", "price", "order_id", "client_order_id", "source"]
+ORDER_COLUMNS = ["order_id", "client_order_id", "ts", "symbol", "side", "qty", "ref_price", "status",
+                 "filled_qty", "filled_avg_price", "source"]
+
+# Broker order statuses after which nothing more fills
+FINAL_STATUSES = ("filled", "canceled", "expired", "rejected", "replaced")
+
+
+def _ns(value):
+    return None if value is None else pd.Timestamp(value).value
+
+
+def _side(side):
+    """'buy'/'sell' from an OrderSide enum or a plain string."""
+    return str(getattr(side, "value", side)).lower()
+
+
+def _status(order):
+    status = getattr(order, "status", None)
+    return None if status is None else str(getattr(status, "value", status)).lower()
+
+
+def apply_fill(qty, avg_price, realized_pl, side, fill_qty, price):
+    """
+    Average-cost position update for one fill (shorts allowed).
+    Returns the new (qty, avg_price, realized_pl).
+    """
+    signed = fill_qty if side == "buy" else -fill_qty
+    if qty == 0 or (qty > 0) == (signed > 0):
+        # Opening or adding: blend the entry price
+        avg_price = (abs(qty) * avg_price + fill_qty * price) / (abs(qty) + fill_qty)
+        return qty + signed, avg_price, realized_pl
+
+    closed = min(fill_qty, abs(qty))
+    realized_pl += closed * (price - avg_price) * (1 if qty > 0 else -1)
+    new_qty = qty + signed
+    if new_qty == 0:
+        avg_price = 0.0
+    elif (new_qty > 0) != (qty > 0):
+        avg_price = price  # flipped: the remainder opened at this price
+    return new_qty, avg_price, realized_pl
+
+
+def fill_from_order(order):
+    """
+    (symbol, side, filled qty, average fill price, ts) of a broker order as
+    reported so far: qty 0 and price None until it fills (Alpaca returns
+    market orders unfilled from submit).
+    """
+    fill_price = getattr(order, "filled_avg_price", None)
+    filled_qty = float(getattr(order, "filled_qty", None) or 0)
+    ts = getattr(order, "filled_at", None) or getattr(order, "submitted_at", None)
+    return (order.symbol.upper(), _side(order.side), filled_qty,
+            float(fill_price) if fill_price is not None else None, ts)
+
+
+class TradeJournal:
+    """
+    Durable, append-only trade/fill journal in SQLite (WAL mode).
+
+    Fills are only ever inserted. Each insert updates a per-symbol
+    positions row (quantity, average cost, realized P/L) in the same
+    transaction, so P/L never rescans history. Fills are indexed by
+    (symbol, ts) and ts, so "last day's trades" reads only those rows.
+
+    Broker orders go into an orders table when submitted and only become
+    fills as the broker reports them filled: record_order() journals the
+    quantity filled since the last update of that order (at the broker's
+    price), so recording the same order state twice is a no-op, partial
+    fills add up and rejected or cancelled orders never count.
+    sync_orders() polls the broker for orders still open. WAL lets the
+    dashboard read while the bot writes; each thread gets its own
+    connection.
+    """
+
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")  # durable at checkpoints, safe with WAL
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ----------------------------
+    # Writes
+    # ----------------------------
+    def _insert_fill(self, conn, ts, symbol, side, qty, price, order_id, client_order_id, source):
+        """Insert one fill and apply it to its position (inside a transaction)."""
+        fill_id = conn.execute(
+            "INSERT INTO fills (ts, symbol, side, qty, price, order_id, client_order_id, source) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (ts, symbol, side, qty, None if price is None else float(price),
+             None if order_id is None else str(order_id), client_order_id, source)
+        ).lastrowid
+        if price is not None:
+            row = conn.execute(
+                "SELECT qty, avg_price, realized_pl, fills FROM positions WHERE symbol = ?", (symbol,)
+            ).fetchone() or (0.0, 0.0, 0.0, 0)
+            position = apply_fill(row[0], row[1], row[2], side, qty, float(price))
+            conn.execute(
+                "INSERT OR REPLACE INTO positions VALUES (?, ?, ?, ?, ?, ?)",
+                (symbol, *position, row[3] + 1, fill_id)
+            )
+        return fill_id
+
+    def record(self, symbol, side, qty, price, ts=None, order_id=None, client_order_id=None, source=None):
+        """
+        Append one fill; returns its id (None if order_id was already
+        journaled). Fills without a price are kept but not counted in
+        positions.
+        """
+        symbol, side, qty = symbol.upper(), _side(side), float(qty)
+        ts = _ns(ts) if ts is not None else time.time_ns()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if order_id is not None and conn.execute(
+                    "SELECT 1 FROM fills WHERE order_id = ?", (str(order_id),)).fetchone():
+                conn.execute("ROLLBACK")
+                return None
+            fill_id = self._insert_fill(conn, ts, symbol, side, qty, price, order_id, client_order_id, source)
+            conn.execute("COMMIT")
+            return fill_id
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def record_order(self, order, price=None, source=None):
+        """
+        Journal a broker order's current state (Alpaca Order or
+        SimulatedBroker order). New orders are added with their reference
+        `price`; quantity filled since the last update becomes a fill at the
+        broker's price. Returns the new fill's id, or None if nothing new
+        filled.
+        """
+        symbol, side, filled_qty, avg_price, filled_at = fill_from_order(order)
+        order_id, status = str(order.id), _status(order)
+        client_order_id = getattr(order, "client_order_id", None)
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT filled_qty, filled_avg_price, source FROM orders WHERE order_id = ?", (order_id,)
+            ).fetchone()
+            if row is None:
+                submitted = getattr(order, "submitted_at", None)
+                conn.execute(
+                    f"INSERT INTO orders ({', '.join(ORDER_COLUMNS)}) VALUES ({', '.join('?' * len(ORDER_COLUMNS))})",
+                    (order_id, client_order_id, _ns(submitted) if submitted is not None else time.time_ns(),
+                     symbol, side, float(order.qty), price, status, 0.0, None, source)
+                )
+                row = (0.0, None, source)
+            journaled_qty, journaled_avg, source = row
+
+            fill_id = None
+            if avg_price is not None and filled_qty > journaled_qty:
+                # The new fills' price, from the broker's running average
+                qty = filled_qty - journaled_qty
+                fill_price = (filled_qty * avg_price - journaled_qty * (journaled_avg or 0.0)) / qty
+                ts = _ns(filled_at) if filled_at is not None else time.time_ns()
+                fill_id = self._insert_fill(conn, ts, symbol, side, qty, fill_price,
+                                            order_id, client_order_id, source)
+                journaled_qty, journaled_avg = filled_qty, avg_price
+            conn.execute(
+                "UPDATE orders SET status = ?, filled_qty = ?, filled_avg_price = ? WHERE order_id = ?",
+                (status, journaled_qty, journaled_avg, order_id)
+            )
+            conn.execute("COMMIT")
+            return fill_id
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def sync_orders(self, client=None):
+        """
+        Poll the broker for every journaled order that is still open and
+        journal what filled since; returns the number of new fills.
+        """
+        open_ids = self.orders(open_only=True)["order_id"].tolist()
+        if not open_ids:
+            return 0
+        if client is None:
+            from trading.execute import get_trading_client
+            client = get_trading_client()
+
+        new_fills = 0
+        for order_id in open_ids:
+            try:
+                new_fills += self.record_order(client.get_order_by_id(order_id)) is not None
+            except Exception as e:
+                print(f"⚠ Could not refresh order {order_id}: {e}")
+        return new_fills
+
+    def attach(self, source=None):
+        """Journal every order trading.execute submits from now on."""
+        from trading.execute import add_fill_listener
+
+        def listener(order, price=None):
+            self.record_order(order, price, source)
+
+        add_fill_listener(listener)
+        return listener
+
+    # ----------------------------
+    # Reads
+    # ----------------------------
+    def fills(self, symbol=None, start=None, end=None, limit=None, after_id=None):
+        """
+        Fills as a DataFrame, oldest first, filtered by symbol, time range
+        and/or id (after_id: only fills newer than a previous read).
+        """
+        clauses, params = [], []
+        if symbol is not None:
+            clauses.append("symbol = ?")
+            params.append(symbol.upper())
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(_ns(start))
+        if end is not None:
+            clauses.append("ts <= ?")
+            params.append(_ns(end))
+        if after_id is not None:
+            clauses.append("id > ?")
+            params.append(int(after_id))
+        query = f"SELECT {', '.join(FILL_COLUMNS)} FROM fills"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        if limit is not None:
+            # Newest `limit` rows, returned oldest first
+            query = f"SELECT * FROM ({query} ORDER BY ts DESC, id DESC LIMIT {int(limit)}) ORDER BY ts, id"
+        else:
+            query += " ORDER BY ts, id"
+
+        frame = pd.DataFrame(self._conn().execute(query, params).fetchall(), columns=FILL_COLUMNS)
+        frame["ts"] = pd.to_datetime(frame["ts"].astype(np.int64), utc=True)
+        return frame
+
+    def orders(self, open_only=False):
+        """Journaled broker orders, oldest first (open_only: not yet final)."""
+        query = f"SELECT {', '.join(ORDER_COLUMNS)} FROM orders"
+        params = ()
+        if open_only:
+            query += f" WHERE status IS NULL OR status NOT IN ({', '.join('?' * len(FINAL_STATUSES))})"
+            params = FINAL_STATUSES
+        frame = pd.DataFrame(self._conn().execute(query + " ORDER BY ts", params).fetchall(),
+                             columns=ORDER_COLUMNS)
+        frame["ts"] = pd.to_datetime(frame["ts"].astype(np.int64), utc=True)
+        return frame
+
+    def positions(self):
+        """Per-symbol quantity, average cost and realized P/L (one row per symbol)."""
+        rows = self._conn().execute(
+            "SELECT symbol, qty, avg_price, realized_pl, fills FROM positions ORDER BY symbol"
+        ).fetchall()
+        return pd.DataFrame(rows, columns=["symbol", "qty", "avg_price", "realized_pl", "fills"])
+
+    def pnl(self, prices):
+        """
+        positions() plus unrealized and total P/L at `prices` ({symbol: price});
+        symbols without a price get NaN unrealized P/L.
+        """
+        frame = self.positions()
+        price = frame["symbol"].map(lambda s: prices.get(s, np.nan)).astype(np.float64)
+        frame["price"] = price
+        frame["unrealized_pl"] = frame["qty"] * (price - frame["avg_price"])
+        frame["total_pl"] = frame["realized_pl"] + frame["unrealized_pl"].fillna(0.0)
+        return frame
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the trade journal.")
+    parser.add_argument("--path", default=JOURNAL_PATH)
+    parser.add_argument("--symbol")
+    parser.add_argument("--since", help="e.g. 2024-06-01 or 1d (relative)")
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    start = args.since
+    if start and start[-1] in "dh" and start[:-1].isdigit():
+        start = pd.Timestamp.now(tz="UTC") - pd.Timedelta(start)
+
+    journal = TradeJournal(args.path)
+    print(journal.fills(args.symbol, start=start, limit=args.limit).to_string(index=False))
+    print(journal.positions().to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# trading/positions.py
+import threading
+
+import numpy as np
+import pandas as pd
+
+from trading.journal import apply_fill, fill_from_order
+
+SNAPSHOT_COLUMNS = ["symbol", "qty", "avg_price", "price", "market_value",
+                    "realized_pl", "unrealized_pl", "total_pl", "fills"]
+
+
+class PositionBook:
+    """
+    Live per-symbol positions and P/L in flat NumPy arrays (one slot per
+    symbol, grown by doubling).
+
+    Fills (on_fill / on_order, or attach() to trading.execute's fill
+    listeners) and price ticks (mark) are O(1): they touch one slot and
+    adjust running portfolio totals, so P/L never recomputes from the fill
+    log. Average-cost accounting, shorts allowed; a symbol is marked at
+    its last fill price until a tick arrives. sync() catches up from a
+    TradeJournal (only fills it has not seen yet).
+    """
+
+    def __init__(self, capacity=64):
+        self.index = {}
+        self.symbols = []
+        self.qty = np.zeros(capacity)
+        self.avg_price = np.zeros(capacity)
+        self.price = np.full(capacity, np.nan)
+        self.realized = np.zeros(capacity)
+        self.unrealized = np.zeros(capacity)
+        self.fills = np.zeros(capacity, dtype=np.int64)
+        self.total_realized = 0.0
+        self.total_unrealized = 0.0
+        self.last_fill_id = 0
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    def _slot(self, symbol):
+        i = self.index.get(symbol)
+        if i is None:
+            i = len(self.symbols)
+            if i == len(self.qty):
+                self._grow(2 * i)
+            self.index[symbol] = i
+            self.symbols.append(symbol)
+        return i
+
+    def _grow(self, capacity):
+        for name in ("qty", "avg_price", "realized", "unrealized", "fills"):
+            values = getattr(self, name)
+            grown = np.zeros(capacity, dtype=values.dtype)
+            grown[:len(values)] = values
+            setattr(self, name, grown)
+        price = np.full(capacity, np.nan)
+        price[:len(self.symbols)] = self.price[:len(self.symbols)]
+        self.price = price
+
+    def _revalue(self, i):
+        unrealized = self.qty[i] * (self.price[i] - self.avg_price[i]) if self.qty[i] else 0.0
+        self.total_unrealized += unrealized - self.unrealized[i]
+        self.unrealized[i] = unrealized
+
+    # ----------------------------
+    # Updates
+    # ----------------------------
+    def on_fill(self, symbol, side, qty, price):
+        """Apply one fill (side 'buy'/'sell')."""
+        with self._lock:
+            i = self._slot(symbol.upper())
+            qty_i, avg_i, realized_i = apply_fill(
+                self.qty[i], self.avg_price[i], self.realized[i], side, float(qty), float(price)
+            )
+            self.total_realized += realized_i - self.realized[i]
+            self.qty[i], self.avg_price[i], self.realized[i] = qty_i, avg_i, realized_i
+            self.fills[i] += 1
+            if np.isnan(self.price[i]):
+                self.price[i] = price
+            self._revalue(i)
+
+    def on_order(self, order, price=None):
+        """
+        Fill listener: apply what a just-submitted broker order has filled
+        (brokers that fill later reach the book through a journal's sync).
+        """
+        symbol, side, qty, fill_price, _ = fill_from_order(order)
+        if qty > 0 and fill_price is not None:
+            self.on_fill(symbol, side, qty, fill_price)
+
+    def mark(self, symbol, price):
+        """Price tick: revalue one symbol."""
+        with self._lock:
+            i = self._slot(symbol.upper())
+            self.price[i] = price
+            self._revalue(i)
+
+    def mark_many(self, prices):
+        for symbol, price in prices.items():
+            if price is not None:
+                self.mark(symbol, price)
+
+    def attach(self):
+        """Apply every order trading.execute submits from now on."""
+        from trading.execute import add_fill_listener
+        add_fill_listener(self.on_order)
+        return self.on_order
+
+    def sync(self, journal):
+        """
+        Apply journal fills newer than the last one synced; returns how
+        many. Safe to call from several threads.
+        """
+        with self._sync_lock:
+            # Ids, not timestamps, say what was synced: a fill recorded late
+            # with an earlier ts still has a higher id
+            new = journal.fills(after_id=self.last_fill_id).sort_values("id", kind="stable")
+            priced = new[new["price"].notna()]
+            for symbol, side, qty, price in zip(priced["symbol"], priced["side"], priced["qty"], priced["price"]):
+                self.on_fill(symbol, side, qty, price)
+            if len(new):
+                self.last_fill_id = int(new["id"].max())
+            return len(priced)
+
+    # ----------------------------
+    # Queries
+    # ----------------------------
+    def position(self, symbol):
+        """One symbol's state as a dict (None if it never traded or ticked)."""
+        i = self.index.get(symbol.upper())
+        if i is None:
+            return None
+        return {
+            "symbol": self.symbols[i],
+            "qty": float(self.qty[i]),
+            "avg_price": float(self.avg_price[i]),
+            "price": float(self.price[i]),
+            "realized_pl": float(self.realized[i]),
+            "unrealized_pl": float(self.unrealized[i]),
+            "total_pl": float(self.realized[i] + self.unrealized[i]),
+            "fills": int(self.fills[i]),
+        }
+
+    def totals(self):
+        """Portfolio realized / unrealized / total P/L (running sums, O(1))."""
+        return {
+            "realized_pl": float(self.total_realized),
+            "unrealized_pl": float(self.total_unrealized),
+            "total_pl": float(self.total_realized + self.total_unrealized),
+        }
+
+    def snapshot(self, open_only=False):
+        """All symbols as a DataFrame (a copy of the arrays)."""
+        with self._lock:
+            n = len(self.symbols)
+            qty, price = self.qty[:n].copy(), self.price[:n].copy()
+            frame = pd.DataFrame({
+                "symbol": list(self.symbols),
+                "qty": qty,
+                "avg_price": self.avg_price[:n].copy(),
+                "price": price,
+                "market_value": qty * price,
+                "realized_pl": self.realized[:n].copy(),
+                "unrealized_pl": self.unrealized[:n].copy(),
+                "fills": self.fills[:n].copy(),
+            })
+        frame["total_pl"] = frame["realized_pl"] + frame["unrealized_pl"]
+        frame = frame[SNAPSHOT_COLUMNS]
+        return frame[frame["qty"] != 0].reset_index(drop=True) if open_only else frame
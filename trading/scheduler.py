@@ -0,0 +1,174 @@
+# trading/scheduler.py
+import asyncio
+import functools
+import inspect
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class TradingScheduler:
+    """
+    Asyncio trading loop for a whole watchlist.
+
+    Each cycle processes every symbol that is due (fetch price -> decide ->
+    place order) concurrently, with at most `max_in_flight` blocking API
+    calls running at once. Symbols are rescheduled on their own interval.
+    If `fetch_prices` is given (symbols -> (prices, missing)), a cycle's
+    prices are fetched in one batched call instead of one call per symbol.
+    `decide` may be a coroutine function (e.g. one awaiting a model server).
+    `before_cycle(symbols)`, if given, runs once per cycle alongside the
+    price fetch (e.g. one model-server request for every due symbol).
+    Per-cycle latency metrics are kept in `self.metrics`.
+    """
+
+    def __init__(self, watchlist, fetch_price, decide, place_order,
+                 interval=60, intervals=None, max_in_flight=10, qty=1,
+                 metrics_history=1000, fetch_prices=None, before_cycle=None):
+        self.watchlist = list(dict.fromkeys(watchlist))
+        self.fetch_price = fetch_price
+        self.fetch_prices = fetch_prices
+        self.before_cycle = before_cycle
+        self.decide = decide
+        self.place_order = place_order
+        self.interval = interval
+        self.intervals = dict(intervals or {})
+        self.max_in_flight = max_in_flight
+        self.qty = qty
+
+        self.metrics = deque(maxlen=metrics_history)
+        self.cycles = 0
+        self._next_due = {}
+        self._stop_event = None
+        self._semaphore = None
+        self._executor = None  # private pool; the loop's default executor is left alone
+
+    # ----------------------------
+    # Lifecycle
+    # ----------------------------
+    def stop(self):
+        """Ask the loop to exit after the cycle in flight finishes."""
+        if self._stop_event is not None:
+            self._stop_event.set()
+
+    async def run(self, max_cycles=None):
+        """Run cycles until stop() is called (or max_cycles is reached)."""
+        self._stop_event = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="trading")
+
+        now = time.monotonic()
+        self._next_due = {symbol: now for symbol in self.watchlist}
+
+        try:
+            while not self._stop_event.is_set():
+                due = [s for s in self.watchlist if self._next_due[s] <= time.monotonic()]
+                if due:
+                    await self.run_cycle(due)
+                    if max_cycles is not None and self.cycles >= max_cycles:
+                        break
+
+                wait = max(0.0, min(self._next_due.values()) - time.monotonic())
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            print(f"🛑 Scheduler stopped after {self.cycles} cycles.")
+
+    # ----------------------------
+    # One sweep over due symbols
+    # ----------------------------
+    async def run_cycle(self, symbols):
+        """Process `symbols` concurrently and record the cycle's metrics."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        started = time.perf_counter()
+        prices, _ = await asyncio.gather(self._fetch_prices(symbols), self._before_cycle(symbols))
+        fetch_elapsed = time.perf_counter() - started
+
+        results = await asyncio.gather(*(self._process_symbol(s, prices) for s in symbols))
+        elapsed = time.perf_counter() - started
+
+        now = time.monotonic()
+        for symbol in symbols:
+            self._next_due[symbol] = now + self.intervals.get(symbol, self.interval)
+
+        latencies = np.array([r["latency"] for r in results])
+        self.cycles += 1
+        cycle = {
+            "cycle": self.cycles,
+            "symbols": len(symbols),
+            "elapsed": elapsed,
+            "fetch": fetch_elapsed,
+            "p50": float(np.percentile(latencies, 50)),
+            "p99": float(np.percentile(latencies, 99)),
+            "max": float(latencies.max()),
+            "orders": sum(1 for r in results if r["order"] is not None),
+            "errors": sum(1 for r in results if r["error"] is not None),
+        }
+        self.metrics.append(cycle)
+        print(
+            f"⏱ Cycle {cycle['cycle']}: {cycle['symbols']} symbols in {elapsed:.3f}s "
+            f"(p50 {cycle['p50']:.3f}s, p99 {cycle['p99']:.3f}s), "
+            f"{cycle['orders']} orders, {cycle['errors']} errors"
+        )
+        return results
+
+    async def _fetch_prices(self, symbols):
+        """One batched price fetch (None without fetch_prices: per-symbol fetches)."""
+        if self.fetch_prices is None:
+            return None
+        try:
+            prices, _ = await self._call(self.fetch_prices, symbols)
+            return prices
+        except Exception as e:
+            print(f"Error fetching prices for {len(symbols)} symbols: {e}")
+            return {}
+
+    async def _before_cycle(self, symbols):
+        if self.before_cycle is None:
+            return
+        try:
+            await self._call(self.before_cycle, symbols)
+        except Exception as e:
+            print(f"Error in before_cycle for {len(symbols)} symbols: {e}")
+
+    async def _call(self, func, *args, **kwargs):
+        """Run a blocking API call in the pool, bounded by the semaphore."""
+        call = functools.partial(func, *args, **kwargs)
+        async with self._semaphore:
+            # Outside run() (e.g. a bare run_cycle) the loop's default pool is used
+            return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+
+    async def _process_symbol(self, symbol, prices=None):
+        started = time.perf_counter()
+        result = {"symbol": symbol, "price": None, "decision": "HOLD",
+                  "order": None, "error": None, "latency": 0.0}
+        try:
+            if prices is not None:
+                price = prices.get(symbol)
+            else:
+                price = await self._call(self.fetch_price, symbol)
+            result["price"] = price
+            if price is None:
+                print(f"Skipping {symbol} this cycle due to missing price.")
+            else:
+                decision = self.decide(symbol, price)
+                if inspect.isawaitable(decision):
+                    decision = await decision
+                result["decision"] = decision
+                if decision in ("BUY", "SELL"):
+                    result["order"] = await self._call(
+                        self.place_order, symbol, qty=self.qty, side=decision.lower()
+                    )
+        except Exception as e:
+            print(f"Error processing {symbol}: {e}")
+            result["error"] = e
+        result["latency"] = time.perf_counter() - started
+        return result
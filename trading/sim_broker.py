@@ -0,0 +1,223 @@
+# trading/sim_broker.py
+import argparse
+import itertools
+import threading
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from data.bar_store import DEFAULT_TIMEFRAME, ensure_bars
+
+
+def _side(side):
+    """'buy'/'sell' from an OrderSide enum or a plain string."""
+    return str(getattr(side, "value", side)).lower()
+
+
+class SimulatedBroker:
+    """
+    In-process stand-in for Alpaca's TradingClient.
+
+    Implements the calls the bot makes (submit_order, get_account,
+    get_order_by_client_id, get_order_by_id, get_orders,
+    get_all_positions). Market orders
+    fill immediately at the close of the latest stored bar at the broker's
+    clock (`advance()`; default: the last bar), or at a price pushed with
+    `set_price()`, moved against the order by `slippage_bps`. `latency`
+    seconds are slept per submit to mimic a network round-trip.
+    Client order ids must be unique, as on Alpaca.
+    """
+
+    def __init__(self, store=None, timeframe=DEFAULT_TIMEFRAME, initial_cash=10000,
+                 slippage_bps=5.0, latency=0.0, data_dir="data", sleep=time.sleep):
+        self.store = store
+        self.timeframe = timeframe
+        self.data_dir = data_dir
+        self.slippage = slippage_bps / 10_000
+        self.latency = latency
+        self.sleep = sleep
+
+        self.cash = float(initial_cash)
+        self.positions = {}          # symbol -> [qty, avg_entry_price]
+        self.orders = []
+        self.by_client_id = {}
+        self.now = None              # int64 ns; None = latest bar
+        self._bars = {}              # symbol -> (timestamps, close) memmap views
+        self._prices = {}            # symbol -> pushed price (overrides bars)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    # ----------------------------
+    # Market data
+    # ----------------------------
+    def advance(self, timestamp):
+        """Move the broker clock; fills use the last bar at or before it."""
+        self.now = pd.Timestamp(timestamp).value if timestamp is not None else None
+        self._prices.clear()
+
+    def set_price(self, symbol, price):
+        """Fill `symbol` at `price` until the clock moves (event-driven use)."""
+        self._prices[symbol.upper()] = float(price)
+
+    def _bar_prices(self, symbol):
+        if symbol not in self._bars:
+            store = ensure_bars(symbol, self.timeframe, self.store, self.data_dir)
+            bars = store.read(symbol, self.timeframe, columns=["close"])
+            self._bars[symbol] = (bars["timestamp"], bars["close"])
+        return self._bars[symbol]
+
+    def price(self, symbol):
+        symbol = symbol.upper()
+        if symbol in self._prices:
+            return self._prices[symbol]
+        timestamps, close = self._bar_prices(symbol)
+        i = len(close) if self.now is None else int(np.searchsorted(timestamps, self.now, side="right"))
+        if i == 0:
+            raise ValueError(f"no {symbol} bar at or before {pd.Timestamp(self.now)}")
+        return float(close[i - 1])
+
+    # ----------------------------
+    # Orders
+    # ----------------------------
+    def submit_order(self, order_data):
+        if self.latency:
+            self.sleep(self.latency)
+
+        symbol = order_data.symbol.upper()
+        side = _side(order_data.side)
+        qty = float(order_data.qty)
+        client_order_id = getattr(order_data, "client_order_id", None)
+        price = self.price(symbol)
+        fill = price * (1 + self.slippage) if side == "buy" else price * (1 - self.slippage)
+
+        with self._lock:
+            if client_order_id and client_order_id in self.by_client_id:
+                raise Exception('{"code":40010001,"message":"client_order_id must be unique"}')
+
+            position = self.positions.setdefault(symbol, [0.0, 0.0])
+            if side == "buy":
+                if qty * fill > self.cash:
+                    raise Exception(f"insufficient buying power for {qty} {symbol}")
+                position[1] = (position[0] * position[1] + qty * fill) / (position[0] + qty)
+                position[0] += qty
+                self.cash -= qty * fill
+            else:
+                if qty > position[0]:
+                    raise Exception(f"insufficient qty available for order (requested: {qty}, "
+                                    f"available: {position[0]})")
+                position[0] -= qty
+                self.cash += qty * fill
+                if position[0] == 0:
+                    del self.positions[symbol]
+
+            now = datetime.now(timezone.utc) if self.now is None else pd.Timestamp(self.now, tz="UTC")
+            order = SimpleNamespace(
+                id=f"sim-{next(self._ids)}",
+                client_order_id=client_order_id,
+                symbol=symbol,
+                qty=qty,
+                side=side,
+                status="filled",
+                filled_qty=qty,
+                filled_avg_price=fill,
+                submitted_at=now,
+                filled_at=now,
+            )
+            self.orders.append(order)
+            if client_order_id:
+                self.by_client_id[client_order_id] = order
+        return order
+
+    def get_order_by_client_id(self, client_order_id):
+        return self.by_client_id[client_order_id]
+
+    def get_order_by_id(self, order_id):
+        return next(order for order in self.orders if order.id == str(order_id))
+
+    def get_orders(self, filter=None):
+        return list(self.orders)
+
+    # ----------------------------
+    # Account
+    # ----------------------------
+    def get_all_positions(self):
+        positions = []
+        for symbol, (qty, avg_price) in list(self.positions.items()):
+            price = self.price(symbol)
+            positions.append(SimpleNamespace(
+                symbol=symbol,
+                qty=str(qty),
+                avg_entry_price=str(avg_price),
+                current_price=str(price),
+                market_value=str(qty * price),
+                unrealized_pl=str(qty * (price - avg_price)),
+            ))
+        return positions
+
+    def get_account(self):
+        market_value = sum(float(p.market_value) for p in self.get_all_positions())
+        equity = self.cash + market_value
+        # Alpaca returns numbers as strings
+        return SimpleNamespace(
+            status="ACTIVE",
+            cash=str(self.cash),
+            equity=str(equity),
+            portfolio_value=str(equity),
+            buying_power=str(self.cash),
+        )
+
+
+# -----------------------------
+# BENCHMARK
+# -----------------------------
+
+def main(argv=None):
+    from trading.execute import place_order
+    from trading.execution import OrderExecutor
+
+    parser = argparse.ArgumentParser(description="Load-test order submission against the simulated broker.")
+    parser.add_argument("--symbols", nargs="+", default=["AAPL"])
+    parser.add_argument("--orders", type=int, default=10_000)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated round-trip per order")
+    parser.add_argument("--slippage-bps", type=float, default=5.0)
+    parser.add_argument("--max-in-flight", type=int, default=32)
+    args = parser.parse_args(argv)
+
+    orders = [
+        {"symbol": args.symbols[i % len(args.symbols)], "qty": 1, "side": "buy" if i % 2 == 0 else "sell"}
+        for i in range(args.orders)
+    ]
+
+    broker = SimulatedBroker(initial_cash=1e12, slippage_bps=args.slippage_bps, latency=args.latency_ms / 1000)
+    for symbol in args.symbols:
+        broker.price(symbol)  # map bars before timing
+
+    # Serial place_order loop (what main.py does per symbol)
+    started = time.perf_counter()
+    latencies = []
+    for order in orders:
+        t0 = time.perf_counter()
+        broker.submit_order(SimpleNamespace(symbol=order["symbol"], qty=order["qty"], side=order["side"]))
+        latencies.append(time.perf_counter() - t0)
+    serial = time.perf_counter() - started
+    print(f"🔁 serial:     {args.orders / serial:,.0f} orders/s "
+          f"(p50 {np.percentile(latencies, 50) * 1e6:.0f}µs, p99 {np.percentile(latencies, 99) * 1e6:.0f}µs)")
+
+    # Concurrent batch through the execution pipeline
+    executor = OrderExecutor(broker, max_in_flight=args.max_in_flight, rate=1e9, burst=1e9)
+    started = time.perf_counter()
+    executor.rebalance(orders)
+    batch = time.perf_counter() - started
+    stats = executor.stats()
+    print(f"📤 concurrent: {args.orders / batch:,.0f} orders/s "
+          f"(p50 {stats['p50'] * 1e6:.0f}µs, p99 {stats['p99'] * 1e6:.0f}µs, {args.max_in_flight} in flight)")
+
+    place_order(args.symbols[0], 1, "buy", client=broker)
+    print(f"💰 {broker.get_account()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,17 +3,29 @@ import numpy as np
 import pandas as pd
 from gym import spaces
 
+from training.observations import ObservationBuilder
+
 
 class TradingEnv(gym.Env):
-    def __init__(self, df):
+    def __init__(self, df, observation=None):
         super(TradingEnv, self).__init__()
 
         self.df = df.reset_index(drop=True)
         self.current_step = 0
 
-        # Price only (you can add indicators later)
+        # Extract prices and features once: float64 prices for accounting,
+        # a float32 feature matrix for observations, so steps never touch pandas
+        self.prices = np.ascontiguousarray(self.df["close"].to_numpy(dtype=np.float64))
+        self.n_steps = len(self.prices)
+
+        # Price only by default; pass an ObservationBuilder for indicators,
+        # a lookback window and position/cash state
+        self.observation = observation or ObservationBuilder()
+        self.obs_matrix = self.observation.padded(self.df)
+        self.obs_windows = self.observation.windows(self.obs_matrix)
+
         self.observation_space = spaces.Box(
-            low=-np.inf, high=np.inf, shape=(1,), dtype=np.float32
+            low=-np.inf, high=np.inf, shape=self.observation.shape, dtype=np.float32
         )
 
         # Actions: 0 = hold, 1 = buy, 2 = sell
@@ -23,10 +35,13 @@ class TradingEnv(gym.Env):
         self.shares = 0
 
     def _get_obs(self):
-        return np.array([self.df["close"][self.current_step]])
+        # Strided view of the (never modified) feature matrix; with state, a
+        # fresh array per call, since callers such as SB3's VecEnvs keep
+        # observations (terminal_observation) across reset()
+        return self.observation.observe(self.obs_windows, self.current_step, self.shares, self.balance)
 
     def step(self, action):
-        price = self.df["close"][self.current_step]
+        price = float(self.prices[self.current_step])
 
         reward = 0
 
@@ -40,7 +55,7 @@ class TradingEnv(gym.Env):
             reward = price  # Profit = reward
 
         self.current_step += 1
-        done = self.current_step >= len(self.df) - 1
+        done = self.current_step >= self.n_steps - 1
 
         return self._get_obs(), reward, done, {}
 
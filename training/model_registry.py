@@ -0,0 +1,176 @@
+# training/model_registry.py
+import argparse
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+
+import joblib
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REGISTRY_DIR = os.path.join(ROOT_DIR, "training", "models", "registry")
+
+MODEL_FILE = "model.joblib"
+META_FILE = "meta.json"
+
+# Process-wide cache of loaded artifacts: (path, mtime_ns, mmap_mode) -> object
+_ARTIFACTS = {}
+_ARTIFACTS_LOCK = threading.Lock()
+
+
+def load_artifact(path, mmap_mode="r"):
+    """
+    joblib.load with a process-wide cache keyed by path and modification time.
+
+    With mmap_mode="r", numpy arrays stored in the artifact are mapped from
+    disk instead of read into memory (scikit-learn trees still copy their
+    node arrays while unpickling, so for forests the cache is the big win).
+    Rewriting the file invalidates the cache entry.
+    """
+    key = (os.path.abspath(path), os.stat(path).st_mtime_ns, mmap_mode)
+    with _ARTIFACTS_LOCK:
+        if key in _ARTIFACTS:
+            return _ARTIFACTS[key]
+    artifact = joblib.load(path, mmap_mode=mmap_mode)
+    with _ARTIFACTS_LOCK:
+        # Drop stale versions of the same file
+        for stale in [k for k in _ARTIFACTS if k[0] == key[0]]:
+            del _ARTIFACTS[stale]
+        _ARTIFACTS[key] = artifact
+    return artifact
+
+
+def clear_cache():
+    with _ARTIFACTS_LOCK:
+        _ARTIFACTS.clear()
+
+
+class RegisteredModel:
+    """A loaded model plus the feature list and scaler it was trained with."""
+
+    def __init__(self, name, version, model, meta):
+        self.name = name
+        self.version = version
+        self.model = model
+        self.meta = meta
+        self.features = meta["features"]
+        scaler = meta.get("scaler")
+        self.mean = np.asarray(scaler["mean"], dtype=np.float64) if scaler else None
+        self.scale = np.asarray(scaler["scale"], dtype=np.float64) if scaler else None
+
+    def transform(self, frame):
+        """Select the model's features (in order) and apply its scaler."""
+        X = frame[self.features].to_numpy(dtype=np.float64)
+        if self.mean is not None:
+            X = (X - self.mean) / self.scale
+        return X
+
+    def predict(self, frame):
+        return self.model.predict(self.transform(frame))
+
+
+# -----------------------------
+# REGISTRY
+# -----------------------------
+
+class ModelRegistry:
+    """
+    Versioned model artifacts on disk:
+
+        <root>/<name>/v0001/model.joblib   uncompressed (so it can be memory-mapped)
+        <root>/<name>/v0001/meta.json      features, target, scaler, metrics, params
+    """
+
+    def __init__(self, root=REGISTRY_DIR):
+        self.root = root
+
+    def _dir(self, name, version):
+        return os.path.join(self.root, name, f"v{version:04d}")
+
+    def names(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(n for n in os.listdir(self.root) if self.versions(n))
+
+    def versions(self, name):
+        directory = os.path.join(self.root, name)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(
+            int(d[1:]) for d in os.listdir(directory)
+            if d.startswith("v") and d[1:].isdigit()
+            and os.path.exists(os.path.join(directory, d, META_FILE))
+        )
+
+    def latest_version(self, name):
+        versions = self.versions(name)
+        return versions[-1] if versions else None
+
+    def register(self, name, model, features, target=None, scaler=None, metrics=None, params=None):
+        """Save `model` as the next version of `name`. Returns the version number."""
+        version = (self.latest_version(name) or 0) + 1
+        directory = self._dir(name, version)
+        tmp_dir = directory + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        joblib.dump(model, os.path.join(tmp_dir, MODEL_FILE))
+        meta = {
+            "name": name,
+            "version": version,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "model_class": type(model).__name__,
+            "features": list(features),
+            "target": target,
+            "scaler": None if scaler is None else {
+                "mean": np.asarray(scaler.mean_).tolist(),
+                "scale": np.asarray(scaler.scale_).tolist(),
+            },
+            "metrics": {k: float(v) for k, v in (metrics or {}).items()},
+            "params": params or {},
+        }
+        with open(os.path.join(tmp_dir, META_FILE), "w") as f:
+            json.dump(meta, f, indent=2)
+
+        os.replace(tmp_dir, directory)
+        return version
+
+    def meta(self, name, version=None):
+        version = version or self.latest_version(name)
+        if version is None:
+            raise FileNotFoundError(f"No registered model named {name}")
+        with open(os.path.join(self._dir(name, version), META_FILE)) as f:
+            return json.load(f)
+
+    def load(self, name, version=None, mmap_mode="r"):
+        """Load a version (default: latest) through the process-wide cache."""
+        meta = self.meta(name, version)
+        model = load_artifact(os.path.join(self._dir(name, meta["version"]), MODEL_FILE), mmap_mode)
+        return RegisteredModel(name, meta["version"], model, meta)
+
+    def load_latest(self, mmap_mode="r"):
+        """{name: RegisteredModel} for the latest version of every model."""
+        return {name: self.load(name, mmap_mode=mmap_mode) for name in self.names()}
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Versioned ML model registry.")
+    parser.add_argument("--root", default=REGISTRY_DIR)
+    args = parser.parse_args(argv)
+
+    registry = ModelRegistry(args.root)
+    for name in registry.names():
+        for version in registry.versions(name):
+            meta = registry.meta(name, version)
+            metrics = ", ".join(f"{k}={v:.6f}" for k, v in meta["metrics"].items())
+            print(f"{name} v{version} ({meta['model_class']}, {meta['created']}) {metrics}")
+
+
+if __name__ == "__main__":
+    main()
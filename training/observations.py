@@ -0,0 +1,121 @@
+# training/observations.py
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Columns produced by data/prepare_dataset.py that make sense as inputs
+FEATURE_COLUMNS = ["close", "return", "ma_5", "ma_20", "ma_50", "rsi_14", "volatility_10"]
+
+# Appended after the window when include_state=True
+STATE_FEATURES = ["shares", "cash"]
+
+
+def config_path(model_path):
+    """ppo_x_final.zip -> ppo_x_final.obs.json"""
+    root, ext = os.path.splitext(model_path)
+    return (root if ext == ".zip" else model_path) + ".obs.json"
+
+
+class ObservationBuilder:
+    """
+    Describes what an agent sees: the last `lookback` bars of `features`,
+    flattened oldest-first, optionally followed by [shares, cash / initial].
+
+    Features are extracted once into a float32 matrix, front-padded with the
+    first row so early steps still get a full window. Windows are strided
+    views into that matrix (no copy); with state, observe() copies the
+    window and state into `out` or a new array. TradingEnv takes a new one
+    per step, since callers such as SB3 keep observations (e.g.
+    terminal_observation); VecTradingEnv gathers all envs into one batch
+    array. The default (close, lookback 1, no state) is the original
+    shape-(1,) price observation.
+    """
+
+    def __init__(self, features=("close",), lookback=1, include_state=False,
+                 initial_balance=10000):
+        if lookback < 1:
+            raise ValueError("lookback must be at least 1")
+        self.features = list(features)
+        self.lookback = int(lookback)
+        self.include_state = include_state
+        self.initial_balance = initial_balance
+
+    # ----------------------------
+    # Saved next to PPO checkpoints
+    # ----------------------------
+    def to_config(self):
+        return {"features": self.features, "lookback": self.lookback,
+                "include_state": self.include_state, "initial_balance": self.initial_balance}
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(**config)
+
+    def save(self, model_path):
+        """Write the config beside a saved model (see config_path)."""
+        with open(config_path(model_path), "w") as f:
+            json.dump(self.to_config(), f, indent=2)
+
+    @classmethod
+    def load(cls, model_path):
+        """Builder a model was trained with; the default one if none was saved."""
+        path = config_path(model_path)
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            return cls.from_config(json.load(f))
+
+    @property
+    def window_size(self):
+        return self.lookback * len(self.features)
+
+    @property
+    def size(self):
+        return self.window_size + (len(STATE_FEATURES) if self.include_state else 0)
+
+    @property
+    def shape(self):
+        return (self.size,)
+
+    def feature_matrix(self, data):
+        """(n_bars, n_features) float32 matrix; a plain price array counts as 'close'."""
+        if not isinstance(data, pd.DataFrame):
+            data = pd.DataFrame({"close": np.asarray(data, dtype=np.float64)})
+        missing = [f for f in self.features if f not in data.columns]
+        if missing:
+            raise KeyError(f"missing observation features: {missing}")
+        return np.ascontiguousarray(data[self.features].to_numpy(dtype=np.float32))
+
+    def padded(self, data):
+        """Feature matrix with lookback - 1 copies of the first row in front."""
+        matrix = self.feature_matrix(data)
+        if self.lookback == 1:
+            return matrix
+        return np.ascontiguousarray(np.pad(matrix, ((self.lookback - 1, 0), (0, 0)), mode="edge"))
+
+    def windows(self, padded):
+        """(n_bars, window_size) view: row t is bars t-lookback+1 .. t, flattened."""
+        n_features = len(self.features)
+        flat = padded.reshape(-1)
+        return np.lib.stride_tricks.sliding_window_view(flat, self.window_size)[::n_features]
+
+    def observe(self, windows, step, shares=0, balance=None, out=None):
+        """
+        Observation for one step. Without state this is a read-only view;
+        with state it is written into `out` (allocated if not given).
+        """
+        if not self.include_state:
+            return windows[step]
+        if out is None:
+            out = np.empty(self.size, dtype=np.float32)
+        out[:self.window_size] = windows[step]
+        self.write_state(out, shares, balance)
+        return out
+
+    def write_state(self, out, shares, balance):
+        """Fill the trailing state columns of `out` (1-D or one row per env)."""
+        balance = self.initial_balance if balance is None else balance
+        out[..., self.window_size] = shares
+        out[..., self.window_size + 1] = np.divide(balance, self.initial_balance)
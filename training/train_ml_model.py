@@ -1,6 +1,9 @@
-import pandas as pd
-import numpy as np
+import argparse
 import os
+import sys
+
+import numpy as np
+import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import mean_absolute_error, r2_score
@@ -15,27 +18,16 @@ except ImportError:
     print("⚠ XGBoost not installed. Skipping XGB model.")
     USE_XGB = False
 
-# Create model directory if missing
-os.makedirs("models/ml", exist_ok=True)
-
-# -------------------------
-# 1. LOAD PREPARED DATA
-# -------------------------
-import os
-
 # Get project root
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATA_PATH = os.path.join(ROOT_DIR, "data", "prepared_AAPL.csv")
-
-df = pd.read_csv(DATA_PATH)
-print("✅ Loaded dataset from:", DATA_PATH)
-
+sys.path.append(ROOT_DIR)
+from data.bar_store import BarStore, FEATURE_STORE_DIR, load_features
+from training.model_registry import ModelRegistry
 
-# Drop NaN rows created by indicators
-df.dropna(inplace=True)
+FEATURE_STORE_PATH = os.path.join(ROOT_DIR, FEATURE_STORE_DIR)
 
 # -------------------------
-# 2. FEATURE SELECTION
+# FEATURES & MODELS
 # -------------------------
 FEATURES = [
     "close", "high", "low", "open", "volume",
@@ -45,94 +37,159 @@ FEATURES = [
 
 TARGET = "future_return"
 
-X = df[FEATURES]
-y = df[TARGET]
+# name -> registry name; only LinearRegression is trained on scaled features
+REGISTRY_NAMES = {
+    "LinearRegression": "linear_regression",
+    "RandomForest": "random_forest",
+}
+if USE_XGB:
+    REGISTRY_NAMES["XGBoost"] = "xgboost"
+
+SCALED_MODELS = {"LinearRegression"}
+
+
+def make_model(name, n_jobs=None):
+    """Fresh, unfitted model. `n_jobs` caps the threads tree models may use."""
+    if name == "LinearRegression":
+        return LinearRegression()
+    if name == "RandomForest":
+        return RandomForestRegressor(
+            n_estimators=200,
+            random_state=42,
+            n_jobs=n_jobs
+        )
+    if name == "XGBoost":
+        return XGBRegressor(
+            n_estimators=400,
+            learning_rate=0.05,
+            max_depth=6,
+            subsample=0.9,
+            colsample_bytree=0.9,
+            objective="reg:squarederror",
+            tree_method="hist",
+            n_jobs=n_jobs
+        )
+    raise ValueError(f"Unknown model: {name}")
 
-# -------------------------
-# 3. TRAIN / TEST SPLIT
-# -------------------------
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, shuffle=False
-)
 
 # -------------------------
-# 4. SCALING
+# 1. LOAD PREPARED DATA
 # -------------------------
-scaler = StandardScaler()
-X_train_scaled = scaler.fit_transform(X_train)
-X_test_scaled = scaler.transform(X_test)
+def load_dataset(symbol="AAPL"):
+    df = load_features(symbol, store=BarStore(FEATURE_STORE_PATH), data_dir=os.path.join(ROOT_DIR, "data"))
+    print("✅ Loaded dataset from:", FEATURE_STORE_PATH)
 
-# Save scaler
-pd.DataFrame(scaler.mean_).to_csv("models/ml/scaler_mean.csv", index=False)
-pd.DataFrame(scaler.scale_).to_csv("models/ml/scaler_scale.csv", index=False)
+    # Drop NaN rows created by indicators
+    return df.dropna()
 
-print("✓ Scaler saved")
 
 # -------------------------
-# 5. TRAIN MODELS
+# 2. SINGLE SPLIT TRAINING
 # -------------------------
-results = {}
-
-# Linear Regression
-lin_model = LinearRegression()
-lin_model.fit(X_train_scaled, y_train)
-pred_lin = lin_model.predict(X_test_scaled)
-
-results["LinearRegression"] = {
-    "MAE": mean_absolute_error(y_test, pred_lin),
-    "R2": r2_score(y_test, pred_lin)
-}
-
-# Save model
-import joblib
-joblib.dump(lin_model, "models/ml/linear_regression.pkl")
-
-
-# Random Forest
-rf = RandomForestRegressor(
-    n_estimators=200,
-    random_state=42
-)
-rf.fit(X_train, y_train)   # RF does NOT need scaled data
-pred_rf = rf.predict(X_test)
-
-results["RandomForest"] = {
-    "MAE": mean_absolute_error(y_test, pred_rf),
-    "R2": r2_score(y_test, pred_rf)
-}
-
-joblib.dump(rf, "models/ml/random_forest.pkl")
-
-
-# XGBoost (optional)
-if USE_XGB:
-    xgb = XGBRegressor(
-        n_estimators=400,
-        learning_rate=0.05,
-        max_depth=6,
-        subsample=0.9,
-        colsample_bytree=0.9,
-        objective="reg:squarederror",
-        tree_method="hist"
+def train_and_save(df, registry=None, symbol="AAPL"):
+    """
+    Original 80/20 chronological split: fit and report every model, then
+    register each one (with its features, scaler and test metrics).
+    """
+    registry = registry or ModelRegistry()
+
+    X = df[FEATURES].to_numpy(dtype=np.float64)
+    y = df[TARGET].to_numpy(dtype=np.float64)
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, shuffle=False
     )
 
-    xgb.fit(X_train, y_train)
-    pred_xgb = xgb.predict(X_test)
-
-    results["XGBoost"] = {
-        "MAE": mean_absolute_error(y_test, pred_xgb),
-        "R2": r2_score(y_test, pred_xgb)
-    }
+    # Scaling
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
+
+    results = {}
+    for name, registry_name in REGISTRY_NAMES.items():
+        model = make_model(name)
+        scaled = name in SCALED_MODELS
+        if scaled:
+            model.fit(X_train_scaled, y_train)
+            pred = model.predict(X_test_scaled)
+        else:
+            model.fit(X_train, y_train)   # trees do NOT need scaled data
+            pred = model.predict(X_test)
+
+        results[name] = {
+            "MAE": mean_absolute_error(y_test, pred),
+            "R2": r2_score(y_test, pred)
+        }
+        version = registry.register(
+            registry_name, model, FEATURES, TARGET,
+            scaler=scaler if scaled else None,
+            metrics=results[name],
+            params={"symbol": symbol.upper(), "train_rows": len(X_train), "test_rows": len(X_test)}
+        )
+        print(f"✓ {name} registered as {registry_name} v{version}")
+
+    print("\n📊 MODEL PERFORMANCE:")
+    for model, metrics in results.items():
+        print(f"\n--- {model} ---")
+        print(f"MAE: {metrics['MAE']:.6f}")
+        print(f"R2 : {metrics['R2']:.6f}")
+
+    print(f"\n🎉 ML models trained and saved in {registry.root}/")
+    return results
 
-    joblib.dump(xgb, "models/ml/xgboost.pkl")
 
 # -------------------------
-# 6. PRINT RESULTS
+# 3. WALK-FORWARD EVALUATION
 # -------------------------
-print("\n📊 MODEL PERFORMANCE:")
-for model, metrics in results.items():
-    print(f"\n--- {model} ---")
-    print(f"MAE: {metrics['MAE']:.6f}")
-    print(f"R2 : {metrics['R2']:.6f}")
-
-print("\n🎉 ML models trained and saved in models/ml/")
+def evaluate_walk_forward(df, args):
+    from training.walk_forward import run_walk_forward
+
+    metrics = run_walk_forward(
+        df, FEATURES, TARGET,
+        models=args.models or list(REGISTRY_NAMES),
+        n_folds=args.folds,
+        mode=args.mode,
+        test_size=args.test_size,
+        train_size=args.train_size,
+        max_workers=args.workers
+    )
+    summary = metrics.attrs["summary"]
+
+    print("\n📊 WALK-FORWARD FOLDS:")
+    print(metrics.to_string(index=False))
+    print("\n📊 MEAN OVER FOLDS:")
+    print(pd.DataFrame(summary["models"]).T.to_string())
+    print(f"\n⏱ {summary['tasks']} fits in {summary['wall_s']:.2f}s wall "
+          f"(cache {summary['cache_s']:.2f}s, fit {summary['fit_s']:.2f}s, "
+          f"predict {summary['predict_s']:.2f}s worker time; "
+          f"{summary['workers']} workers x {summary['n_jobs']} threads)")
+
+    if args.out:
+        metrics.to_csv(args.out, index=False)
+        print(f"💾 Fold metrics saved to {args.out}")
+    return metrics
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train / evaluate the ML return models.")
+    parser.add_argument("--symbol", default="AAPL")
+    parser.add_argument("--walk-forward", action="store_true",
+                        help="evaluate on rolling folds instead of training on one split")
+    parser.add_argument("--folds", type=int, default=50)
+    parser.add_argument("--mode", choices=["expanding", "rolling"], default="expanding")
+    parser.add_argument("--test-size", type=int, default=None, help="bars per test fold")
+    parser.add_argument("--train-size", type=int, default=None,
+                        help="initial (expanding) or fixed (rolling) training bars")
+    parser.add_argument("--models", nargs="+", choices=list(REGISTRY_NAMES), default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", help="optional CSV path for the fold metrics")
+    args = parser.parse_args(argv)
+
+    df = load_dataset(args.symbol)
+    if args.walk_forward:
+        return evaluate_walk_forward(df, args)
+    return train_and_save(df, symbol=args.symbol)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,13 @@
+import os
+import sys
+
 import pandas as pd
 from stable_baselines3 import PPO
-from env import TradingEnv
+
+# Add project root to Python path
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+from training.env import TradingEnv
 
 # Load Apple historical data
 df = pd.read_csv("data/AAPL.csv")
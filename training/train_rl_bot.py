@@ -1,58 +1,210 @@
 # training/train_rl_bot.py
 
+import argparse
+import itertools
 import os
-import pandas as pd
-from stable_baselines3 import PPO
-from stable_baselines3.common.callbacks import CheckpointCallback
-from env import TradingEnv
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
 
-# ----------------------------
-# 1️⃣ Load Prepared Dataset
-# ----------------------------
-DATA_PATH = os.path.join("data", "prepared_AAPL.csv")
-if not os.path.exists(DATA_PATH):
-    raise FileNotFoundError(f"{DATA_PATH} not found. Please prepare your dataset first.")
+import numpy as np
 
-df = pd.read_csv(DATA_PATH)
-print(f"✅ Loaded dataset: {DATA_PATH}, shape: {df.shape}")
-
-# ----------------------------
-# 2️⃣ Create RL Environment
-# ----------------------------
-env = TradingEnv(df)
+# Add project root to Python path
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+from data.bar_store import load_features
+from training.observations import FEATURE_COLUMNS, ObservationBuilder
 
-# ----------------------------
-# 3️⃣ Create Model Directory
-# ----------------------------
 RL_MODELS_DIR = os.path.join("training", "models", "rl")
-os.makedirs(RL_MODELS_DIR, exist_ok=True)
-print(f"✅ RL models folder: {RL_MODELS_DIR}")
+
 
 # ----------------------------
-# 4️⃣ Setup Checkpoint Callback
+# 1️⃣ Environments
 # ----------------------------
-checkpoint_callback = CheckpointCallback(
-    save_freq=5000,                   # save every 5k steps
-    save_path=RL_MODELS_DIR,
-    name_prefix="ppo_aapl"
-)
+def _make_env(df, observation=None):
+    """Single TradingEnv for one subprocess (module-level so it pickles)."""
+    from training.env import TradingEnv
+    return TradingEnv(df, observation)
+
+
+def build_vec_env(frames, n_envs=1, vec="native", episode_length=None, seed=0, observation=None):
+    """
+    Vectorized training environment over one or more symbols.
+
+    vec="native": one VecTradingEnv stepping all episodes as arrays, with
+                  random start offsets when n_envs > 1.
+    vec="subproc": SubprocVecEnv of TradingEnvs, one process per env, each
+                   on a random start window of one symbol.
+    """
+    if vec == "native":
+        from training.vec_env import VecTradingEnv
+        return VecTradingEnv(
+            list(frames.values()), n_envs=n_envs, random_start=n_envs > 1,
+            episode_length=episode_length, seed=seed, observation=observation
+        )
+
+    from stable_baselines3.common.vec_env import SubprocVecEnv
+
+    rng = np.random.default_rng(seed)
+    symbols = list(frames)
+    env_fns = []
+    for i in range(n_envs):
+        df = frames[symbols[i % len(symbols)]]
+        length = episode_length or len(df)
+        start = int(rng.integers(0, max(len(df) - length, 0) + 1)) if n_envs > 1 else 0
+        env_fns.append(partial(_make_env, df.iloc[start:start + length + 1], observation))
+    return SubprocVecEnv(env_fns)
+
 
 # ----------------------------
-# 5️⃣ Initialize RL Model
+# 2️⃣ One Training Run
 # ----------------------------
-model = PPO("MlpPolicy", env, verbose=1)
+def train_run(config):
+    """
+    Train one PPO agent. `config` is a plain dict (so it can be shipped to a
+    worker process); returns a summary dict with the saved model path.
+    """
+    import torch
+    from stable_baselines3 import PPO
+    from stable_baselines3.common.callbacks import CheckpointCallback
+
+    torch.set_num_threads(config["threads"])
+
+    frames = {symbol: load_features(symbol) for symbol in config["symbols"]}
+    observation = ObservationBuilder(config["features"], config["lookback"], config["state"])
+    env = build_vec_env(frames, config["n_envs"], config["vec"],
+                        config["episode_length"], config["seed"], observation)
+
+    models_dir = config["models_dir"]
+    os.makedirs(models_dir, exist_ok=True)
+    checkpoint_callback = CheckpointCallback(
+        save_freq=max(config["checkpoint_every"] // config["n_envs"], 1),  # counted per env step
+        save_path=models_dir,
+        name_prefix=config["name"]
+    )
+
+    model = PPO(
+        "MlpPolicy", env, verbose=config["verbose"], seed=config["seed"],
+        learning_rate=config["learning_rate"], n_steps=config["n_steps"]
+    )
+
+    started = time.perf_counter()
+    print(f"🚀 {config['name']}: {config['timesteps']} timesteps on "
+          f"{config['n_envs']} {config['vec']} envs ({', '.join(frames)})")
+    model.learn(total_timesteps=config["timesteps"], callback=checkpoint_callback)
+    elapsed = time.perf_counter() - started
+
+    final_path = os.path.join(models_dir, f"{config['name']}_final")
+    model.save(final_path)
+    observation.save(final_path)  # the inference server rebuilds observations from it
+    env.close()
+
+    return {
+        "name": config["name"],
+        "seed": config["seed"],
+        "learning_rate": config["learning_rate"],
+        "path": final_path + ".zip",
+        "seconds": elapsed,
+        "fps": config["timesteps"] / elapsed if elapsed else float("nan"),
+    }
+
 
 # ----------------------------
-# 6️⃣ Start Training
+# 3️⃣ Concurrent Runs Within a CPU Budget
 # ----------------------------
-TIMESTEPS = 50_000  # adjust as needed
+def build_configs(args):
+    """One config per (seed, learning rate) combination."""
+    tag = "_".join(s.lower() for s in args.symbols)
+    grid = list(itertools.product(args.seeds, args.learning_rates))
+    configs = []
+    for seed, lr in grid:
+        # A lone default run keeps the historic ppo_<symbol> naming
+        name = f"ppo_{tag}" if len(grid) == 1 else f"ppo_{tag}_s{seed}_lr{lr:g}"
+        configs.append({
+            "name": name,
+            "symbols": args.symbols,
+            "seed": seed,
+            "learning_rate": lr,
+            "n_steps": args.n_steps,
+            "n_envs": args.n_envs,
+            "vec": args.vec,
+            "episode_length": args.episode_length,
+            "features": args.features,
+            "lookback": args.lookback,
+            "state": args.state,
+            "timesteps": args.timesteps,
+            "checkpoint_every": args.checkpoint_every,
+            "models_dir": args.models_dir,
+            "threads": 1,
+            "verbose": args.verbose,
+        })
+    return configs
+
+
+def run_all(configs, cpu_budget):
+    """
+    Run configs concurrently without oversubscribing `cpu_budget` cores.
+    A subproc run needs one core per env plus one for the learner; a native
+    run needs one. Leftover cores go to torch threads.
+    """
+    per_run = configs[0]["n_envs"] + 1 if configs[0]["vec"] == "subproc" else 1
+    parallel = max(1, min(len(configs), cpu_budget // per_run))
+    threads = max(1, (cpu_budget - parallel * (per_run - 1)) // parallel)
+    for config in configs:
+        config["threads"] = threads
+
+    print(f"🧮 {len(configs)} runs, {parallel} at a time, {per_run} process(es) "
+          f"+ {threads} torch thread(s) each (budget {cpu_budget} CPUs)")
+
+    if parallel == 1:
+        return [train_run(config) for config in configs]
+
+    results = []
+    with ProcessPoolExecutor(max_workers=parallel) as pool:
+        futures = {pool.submit(train_run, config): config["name"] for config in configs}
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f"❌ {futures[future]} failed: {e}")
+    return results
 
-print(f"🚀 Starting RL training for {TIMESTEPS} timesteps...")
-model.learn(total_timesteps=TIMESTEPS, callback=checkpoint_callback)
 
 # ----------------------------
-# 7️⃣ Save Final Model
+# 4️⃣ Start Training
 # ----------------------------
-FINAL_MODEL_PATH = os.path.join(RL_MODELS_DIR, "ppo_aapl_final")
-model.save(FINAL_MODEL_PATH)
-print(f"🎉 RL training complete! Model saved at: {FINAL_MODEL_PATH}.zip")
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train PPO agents across symbols and seeds.")
+    parser.add_argument("--symbols", nargs="+", default=["AAPL"])
+    parser.add_argument("--timesteps", type=int, default=50_000)  # adjust as needed
+    parser.add_argument("--n-envs", type=int, default=1, help="parallel environments per run")
+    parser.add_argument("--vec", choices=["native", "subproc"], default="native")
+    parser.add_argument("--episode-length", type=int, default=None,
+                        help="random start windows of this many steps (default: full history)")
+    parser.add_argument("--features", nargs="+", default=["close"], choices=FEATURE_COLUMNS,
+                        help="observation columns")
+    parser.add_argument("--lookback", type=int, default=1, help="bars of each feature per observation")
+    parser.add_argument("--state", action="store_true", help="append shares and cash to observations")
+    parser.add_argument("--seeds", nargs="+", type=int, default=[0])
+    parser.add_argument("--learning-rates", nargs="+", type=float, default=[3e-4])
+    parser.add_argument("--n-steps", type=int, default=2048, help="PPO rollout length per env")
+    parser.add_argument("--cpu-budget", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--checkpoint-every", type=int, default=5000)  # save every 5k steps
+    parser.add_argument("--models-dir", default=RL_MODELS_DIR)
+    parser.add_argument("--verbose", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.models_dir, exist_ok=True)
+    print(f"✅ RL models folder: {args.models_dir}")
+
+    results = run_all(build_configs(args), args.cpu_budget)
+
+    for result in sorted(results, key=lambda r: r["name"]):
+        print(f"🎉 {result['name']}: {result['seconds']:.1f}s "
+              f"({result['fps']:.0f} steps/s) → {result['path']}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+# training/vec_env.py
+import numpy as np
+import pandas as pd
+from gymnasium import spaces
+
+from training.observations import ObservationBuilder
+
+# stable-baselines3's VecEnv base class; a minimal stand-in keeps the
+# array logic usable (and testable) where stable-baselines3 isn't installed
+try:
+    from stable_baselines3.common.vec_env import VecEnv
+except ImportError:
+    class VecEnv:
+        def __init__(self, num_envs, observation_space, action_space):
+            self.num_envs = num_envs
+            self.observation_space = observation_space
+            self.action_space = action_space
+
+        def step(self, actions):
+            self.step_async(actions)
+            return self.step_wait()
+
+
+class VecTradingEnv(VecEnv):
+    """
+    Natively vectorized TradingEnv: N episodes stepped in one array operation.
+
+    Each environment replays one price series (different symbols and/or
+    start offsets) with the same rules and rewards as TradingEnv. State
+    (step, balance, shares) lives in arrays; finished episodes are reset
+    automatically, with the last observation in info["terminal_observation"],
+    as stable-baselines3's VecEnv interface expects.
+    """
+
+    def __init__(self, series, n_envs=None, random_start=False, episode_length=None,
+                 initial_balance=10000, seed=None, observation=None):
+        self.observation = observation or ObservationBuilder(initial_balance=initial_balance)
+        features = [self.observation.padded(s) for s in series]
+        series = [self._to_prices(s) for s in series]
+        n_envs = n_envs or len(series)
+
+        # Pad every series into one (n_series, max_len) matrix
+        lengths = np.array([len(s) for s in series], dtype=np.int64)
+        if (lengths < 2).any():
+            raise ValueError("every series needs at least 2 prices")
+        self.prices = np.zeros((len(series), lengths.max()), dtype=np.float64)
+        for i, s in enumerate(series):
+            self.prices[i, :len(s)] = s
+        self.lengths = lengths
+
+        # Feature rows of every series in one flat float32 buffer; env e's
+        # window at step t starts at series_offset + t * n_features
+        n_features = len(self.observation.features)
+        self.row_stride = (lengths.max() + self.observation.lookback - 1) * n_features
+        self.features = np.zeros(len(series) * self.row_stride, dtype=np.float32)
+        for i, f in enumerate(features):
+            self.features[i * self.row_stride:i * self.row_stride + f.size] = f.ravel()
+        self._window_offsets = np.arange(self.observation.window_size, dtype=np.int64)
+
+        self.random_start = random_start
+        self.episode_length = episode_length
+        self.initial_balance = initial_balance
+        self.rng = np.random.default_rng(seed)
+
+        # Env i replays series i % n_series
+        self.series = np.arange(n_envs, dtype=np.int64) % len(series)
+        self.current_step = np.zeros(n_envs, dtype=np.int64)
+        self.end = np.zeros(n_envs, dtype=np.int64)
+        self.balance = np.zeros(n_envs, dtype=np.float64)
+        self.shares = np.zeros(n_envs, dtype=np.int64)
+        self._actions = np.zeros(n_envs, dtype=np.int64)
+        self._obs = np.zeros((n_envs, self.observation.size), dtype=np.float32)
+        self._gather = np.zeros((n_envs, self.observation.window_size), dtype=np.int64)
+        self.render_mode = None
+
+        super().__init__(
+            n_envs,
+            spaces.Box(low=-np.inf, high=np.inf, shape=self.observation.shape, dtype=np.float32),
+            spaces.Discrete(3),
+        )
+
+    @staticmethod
+    def _to_prices(series):
+        if isinstance(series, pd.DataFrame):
+            series = series["close"]
+        return np.ascontiguousarray(np.asarray(series, dtype=np.float64))
+
+    # ----------------------------
+    # Episode bookkeeping
+    # ----------------------------
+    def _reset_envs(self, idx):
+        lengths = self.lengths[self.series[idx]]
+        if self.random_start:
+            # Leave at least one step (or a full episode) after the start
+            span = lengths - 1 if self.episode_length is None else lengths - self.episode_length
+            start = (self.rng.random(len(idx)) * np.maximum(span, 1)).astype(np.int64)
+        else:
+            start = np.zeros(len(idx), dtype=np.int64)
+
+        self.current_step[idx] = start
+        self.end[idx] = lengths if self.episode_length is None else np.minimum(
+            start + self.episode_length + 1, lengths
+        )
+        self.balance[idx] = self.initial_balance
+        self.shares[idx] = 0
+
+    def _fill_obs(self):
+        # Gather every env's window straight from the flat feature buffer
+        # into the preallocated observation array (index buffer reused too)
+        start = self.series * self.row_stride + self.current_step * len(self.observation.features)
+        np.add(start[:, None], self._window_offsets, out=self._gather)
+        np.take(self.features, self._gather, out=self._obs[:, :self.observation.window_size],
+                mode="clip")
+        if self.observation.include_state:
+            self.observation.write_state(self._obs, self.shares, self.balance)
+        return self._obs
+
+    # ----------------------------
+    # VecEnv interface
+    # ----------------------------
+    def reset(self):
+        self._reset_envs(np.arange(self.num_envs))
+        return self._fill_obs().copy()
+
+    def step_async(self, actions):
+        self._actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+
+    def step_wait(self):
+        price = self.prices[self.series, self.current_step]
+
+        buy = self._actions == 1
+        sell = (self._actions == 2) & (self.shares > 0)
+
+        self.shares += buy
+        self.shares -= sell
+        self.balance += np.where(sell, price, 0.0) - np.where(buy, price, 0.0)
+        rewards = np.where(sell, price, 0.0).astype(np.float32)
+
+        self.current_step += 1
+        dones = self.current_step >= self.end - 1
+        obs = self._fill_obs().copy()
+
+        infos = [{} for _ in range(self.num_envs)]
+        if dones.any():
+            done_idx = np.flatnonzero(dones)
+            for i in done_idx:
+                infos[i]["terminal_observation"] = obs[i].copy()
+            self._reset_envs(done_idx)
+            obs[done_idx] = self._fill_obs()[done_idx]
+
+        return obs, rewards, dones, infos
+
+    def close(self):
+        pass
+
+    def seed(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+        return [seed] * self.num_envs
+
+    def _indices(self, indices):
+        if indices is None:
+            return range(self.num_envs)
+        if isinstance(indices, int):
+            return [indices]
+        return indices
+
+    def get_attr(self, attr_name, indices=None):
+        value = getattr(self, attr_name)
+        if isinstance(value, np.ndarray) and value.shape[:1] == (self.num_envs,):
+            return [value[i] for i in self._indices(indices)]
+        return [value for _ in self._indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        current = getattr(self, attr_name)
+        if isinstance(current, np.ndarray) and current.shape[:1] == (self.num_envs,):
+            for i in self._indices(indices):
+                current[i] = value
+        else:
+            setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        method = getattr(self, method_name)
+        return [method(*method_args, **method_kwargs) for _ in self._indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._indices(indices)]
+
+    def get_images(self):
+        return [None for _ in range(self.num_envs)]
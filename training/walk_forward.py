@@ -0,0 +1,177 @@
+# training/walk_forward.py
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error, r2_score
+from sklearn.preprocessing import StandardScaler
+
+from training.train_ml_model import SCALED_MODELS, make_model
+
+# Per-worker read-only feature views, filled by _init_worker
+_DATA = {}
+
+# Rough relative fit cost, used to start the slowest fits first
+_COST = {"LinearRegression": 1, "RandomForest": 50, "XGBoost": 20}
+
+
+# -----------------------------
+# FOLDS
+# -----------------------------
+
+def make_folds(n_rows, n_folds=50, mode="expanding", test_size=None, train_size=None):
+    """
+    Chronological folds as (train_start, train_end, test_start, test_end) row bounds.
+
+    expanding: every fold trains on everything before its test block.
+    rolling:   every fold trains on the `train_size` bars before it.
+    Test blocks are consecutive and end at the last row.
+    """
+    if mode not in ("expanding", "rolling"):
+        raise ValueError(f"Unknown walk-forward mode: {mode}")
+    if test_size is None:
+        train_size = train_size or n_rows // 3
+        test_size = (n_rows - train_size) // n_folds
+    if test_size < 1:
+        raise ValueError(f"{n_rows} rows are not enough for {n_folds} folds")
+
+    first_test = n_rows - n_folds * test_size
+    if first_test < 2:
+        raise ValueError(f"{n_rows} rows are not enough for {n_folds} folds of {test_size}")
+    train_size = train_size or first_test
+
+    folds = []
+    for k in range(n_folds):
+        test_start = first_test + k * test_size
+        train_start = 0 if mode == "expanding" else max(0, test_start - train_size)
+        folds.append((train_start, test_start, test_start, test_start + test_size))
+    return folds
+
+
+# -----------------------------
+# FEATURE CACHE
+# -----------------------------
+
+def cache_features(df, features, target, directory):
+    """Write X / y once as .npy files that every fold maps instead of re-slicing pandas."""
+    X = np.lib.format.open_memmap(
+        os.path.join(directory, "X.npy"), mode="w+", dtype=np.float64, shape=(len(df), len(features))
+    )
+    X[:] = df[features].to_numpy(dtype=np.float64)
+    y = np.lib.format.open_memmap(
+        os.path.join(directory, "y.npy"), mode="w+", dtype=np.float64, shape=(len(df),)
+    )
+    y[:] = df[target].to_numpy(dtype=np.float64)
+    X.flush()
+    y.flush()
+    del X, y
+
+
+def _init_worker(directory):
+    """Map the cached features read-only once per worker process."""
+    _DATA["X"] = np.load(os.path.join(directory, "X.npy"), mmap_mode="r")
+    _DATA["y"] = np.load(os.path.join(directory, "y.npy"), mmap_mode="r")
+
+
+# -----------------------------
+# FOLD TASK
+# -----------------------------
+
+def _run_fold(task):
+    """Fit one model on one fold; returns its metrics and timings."""
+    fold, name, (train_start, train_end, test_start, test_end), n_jobs = task
+    X, y = _DATA["X"], _DATA["y"]
+    X_train, y_train = X[train_start:train_end], y[train_start:train_end]
+    X_test, y_test = X[test_start:test_end], y[test_start:test_end]
+
+    t0 = time.perf_counter()
+    model = make_model(name, n_jobs=n_jobs)
+    if name in SCALED_MODELS:
+        # Scaler is fit on the training fold only
+        scaler = StandardScaler()
+        X_train = scaler.fit_transform(X_train)
+        X_test = scaler.transform(X_test)
+    model.fit(X_train, y_train)
+    t1 = time.perf_counter()
+    pred = model.predict(X_test)
+    t2 = time.perf_counter()
+
+    return {
+        "fold": fold,
+        "model": name,
+        "train_start": train_start,
+        "train_end": train_end,
+        "test_start": test_start,
+        "test_end": test_end,
+        "MAE": mean_absolute_error(y_test, pred),
+        "R2": r2_score(y_test, pred) if len(y_test) > 1 else np.nan,
+        "fit_s": t1 - t0,
+        "predict_s": t2 - t1,
+    }
+
+
+# -----------------------------
+# HARNESS
+# -----------------------------
+
+def run_walk_forward(df, features, target, models, n_folds=50, mode="expanding",
+                     test_size=None, train_size=None, max_workers=None):
+    """
+    Walk-forward evaluation of `models` over chronological folds.
+
+    Every (fold, model) fit is an independent task on a process pool. Workers
+    share the feature matrix as read-only memmaps, and CPUs left over after
+    the pool is sized go to each model's own n_jobs, so the machine is not
+    oversubscribed. Returns the per-fold metrics table; attrs["summary"] has
+    per-model means and the wall-clock breakdown.
+    """
+    started = time.perf_counter()
+    folds = make_folds(len(df), n_folds, mode, test_size, train_size)
+
+    cpus = os.cpu_count() or 1
+    n_tasks = len(folds) * len(models)
+    workers = max(1, min(max_workers or cpus, n_tasks))
+    n_jobs = max(1, cpus // workers)
+
+    # Slowest fits first so the pool does not finish on one long straggler
+    tasks = [(k, name, bounds, n_jobs) for k, bounds in enumerate(folds) for name in models]
+    tasks.sort(key=lambda t: -_COST.get(t[1], 1) * (t[2][1] - t[2][0]))
+
+    directory = tempfile.mkdtemp(prefix="walk_forward_")
+    try:
+        cache_features(df, features, target, directory)
+        cached = time.perf_counter()
+        if workers == 1:
+            _init_worker(directory)
+            rows = [_run_fold(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(directory,)
+            ) as pool:
+                rows = list(pool.map(_run_fold, tasks))
+    finally:
+        _DATA.clear()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    metrics = pd.DataFrame(rows).sort_values(["fold", "model"]).reset_index(drop=True)
+    wall = time.perf_counter() - started
+
+    metrics.attrs["summary"] = {
+        "folds": len(folds),
+        "tasks": n_tasks,
+        "mode": mode,
+        "workers": workers,
+        "n_jobs": n_jobs,
+        "cache_s": cached - started,
+        "fit_s": float(metrics["fit_s"].sum()),
+        "predict_s": float(metrics["predict_s"].sum()),
+        "wall_s": wall,
+        "models": metrics.groupby("model")[["MAE", "R2", "fit_s"]].mean().to_dict(orient="index"),
+    }
+    return metrics